@@ -12,6 +12,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from src.train_lstm import AdvancedTrafficLSTM
 from src.novelty_engine import HybridNoveltyEngine
+from src.categorical import encode_column
 
 def run_batch_inference(csv_path):
     print(f"Loading dataset: {csv_path}")
@@ -76,16 +77,11 @@ def run_batch_inference(csv_path):
         # We need to encode origin/dest first.
         
         if 'origin' in encoders and 'origin' in df.columns:
-             # Handle unseen labels by mapping to a default or skipping
-             # Using map with fillna
-             known_classes = set(encoders['origin'].classes_)
-             df['origin'] = df['origin'].apply(lambda x: x if x in known_classes else list(known_classes)[0])
-             df['origin'] = encoders['origin'].transform(df['origin'])
+             # Unseen labels map to the default code (first class)
+             df['origin'] = encode_column(encoders['origin'], df['origin'])
              
         if 'destination' in encoders and 'destination' in df.columns:
-             known_classes = set(encoders['destination'].classes_)
-             df['destination'] = df['destination'].apply(lambda x: x if x in known_classes else list(known_classes)[0])
-             df['destination'] = encoders['destination'].transform(df['destination'])
+             df['destination'] = encode_column(encoders['destination'], df['destination'])
 
         try:
             X_nov = df[nov_cols].values
@@ -96,10 +92,7 @@ def run_batch_inference(csv_path):
 
     # 3. Encode Categorical (Weather)
     if 'WeatherCondition' in encoders and 'WeatherCondition' in df.columns:
-        le = encoders['WeatherCondition']
-        known_classes = set(le.classes_)
-        df['WeatherCondition'] = df['WeatherCondition'].astype(str).apply(lambda x: x if x in known_classes else list(known_classes)[0])
-        df['WeatherCondition'] = le.transform(df['WeatherCondition'])
+        df['WeatherCondition'] = encode_column(encoders['WeatherCondition'], df['WeatherCondition'].astype(str))
         
     # Scale Features
     X_input = df[feature_cols].values
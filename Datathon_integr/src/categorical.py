@@ -0,0 +1,83 @@
+"""
+Categorical Encoding
+Vectorized label/congestion encoding shared by data loading, batch
+prediction, live prediction and the what-if simulator.
+
+Lookups go through small per-unique tables (pd.factorize / pd.Index
+hash lookups) instead of per-row Python calls. Labels unseen at training
+time map to code 0, the first class.
+"""
+import numpy as np
+import pandas as pd
+
+# Text congestion levels -> 0 (free flow), 1 (moderate), 2 (heavy)
+CONGESTION_CODES = {
+    '0': 0, 'low': 0, 'fast': 0, 'free flow': 0,
+    '1': 1, 'medium': 1, 'normal': 1, 'moderate': 1,
+    '2': 2, 'high': 2, 'slow': 2, 'heavy': 2, 'congestion': 2,
+}
+
+
+def _congestion_code(val):
+    # Scalar rule, applied once per unique value
+    if pd.isna(val): return -1
+    if isinstance(val, (int, float, np.integer, np.floating, np.bool_)): return int(val)
+    return CONGESTION_CODES.get(str(val).lower(), 0)
+
+
+def map_congestion(values):
+    """
+    Map congestion labels ('Fast', 'Normal', 'Slow', 'congestion', 0/1/2, ...)
+    to 0, 1, 2. Missing values become -1, unknown text 0.
+
+    Returns:
+        int64 numpy array
+    """
+    codes, uniques = pd.factorize(pd.Series(values, copy=False))
+    table = np.array([_congestion_code(u) for u in uniques] + [-1], dtype=np.int64)
+    # factorize marks missing values with -1, which indexes the trailing -1
+    return table[codes]
+
+
+def bin_congestion_index(values, moderate=1.0, heavy=1.5):
+    """
+    Threshold bins for congestion_index (fallback when quantile binning
+    fails): > heavy -> 2, > moderate -> 1, else 0.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    return np.where(x > heavy, 2, np.where(x > moderate, 1, 0))
+
+
+def encode_column(encoder, values, unseen=0):
+    """
+    Transform a column with a fitted LabelEncoder in one hash lookup.
+    Labels the encoder has not seen map to `unseen` instead of raising.
+
+    Returns:
+        int64 numpy array of codes
+    """
+    classes = pd.Index(encoder.classes_)
+    values = pd.Index(values)
+    if classes.dtype == object and values.dtype != object:
+        values = values.astype(str)
+    codes = classes.get_indexer(values).astype(np.int64)
+    codes[codes < 0] = unseen
+    return codes
+
+
+def encode_label(encoders, col, value, unseen=0):
+    """
+    Encode a single categorical value with a fitted LabelEncoder.
+    Unseen values map to the first class (code 0), as in training.
+    Columns without an encoder pass the value through.
+    """
+    le = encoders.get(col)
+    if le is None:
+        return value
+    return int(encode_column(le, [value], unseen=unseen)[0])
+
+
+def is_known(encoders, col, value):
+    """True when `col` has an encoder and it was fitted on `value`."""
+    le = encoders.get(col)
+    return le is not None and pd.Index(le.classes_).get_indexer([value])[0] >= 0
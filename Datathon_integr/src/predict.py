@@ -12,6 +12,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from src.osm_loader import get_road_network_stats
 from src.scraper import get_live_weather, get_city_events, get_event_impact_score
 from src.novelty_engine import HybridNoveltyEngine
+from src.categorical import encode_column, encode_label, is_known
 from src.train_lstm import AdvancedTrafficLSTM
 from src.sensor_interface import TrafficSensorNetwork, GPSDataStream
 
@@ -106,20 +107,16 @@ def predict_live(city="Mumbai, India", source=None, dest=None):
         
         # Inject Source/Dest if model expects them
         if 'origin' in encoders and source:
-            try:
-                row['origin'] = encoders['origin'].transform([source])[0]
-            except:
+            if not is_known(encoders, 'origin', source):
                 print(f"   [WARN] Unknown Source '{source}'. Using default.")
-                row['origin'] = 0
+            row['origin'] = encode_label(encoders, 'origin', source)
         elif 'origin' in feature_cols:
              row['origin'] = 0 # Default
 
         if 'destination' in encoders and dest:
-            try:
-                row['destination'] = encoders['destination'].transform([dest])[0]
-            except:
+            if not is_known(encoders, 'destination', dest):
                 print(f"   [WARN] Unknown Destination '{dest}'. Using default.")
-                row['destination'] = 0
+            row['destination'] = encode_label(encoders, 'destination', dest)
         elif 'destination' in feature_cols:
              row['destination'] = 0
 
@@ -158,8 +155,7 @@ def predict_live(city="Mumbai, India", source=None, dest=None):
     if 'WeatherCondition' in encoders:
         le = encoders['WeatherCondition']
         # Handle unseen
-        df_seq['WeatherCondition'] = df_seq['WeatherCondition'].apply(lambda x: x if x in le.classes_ else le.classes_[0])
-        df_seq['WeatherCondition'] = le.transform(df_seq['WeatherCondition'])
+        df_seq['WeatherCondition'] = encode_column(le, df_seq['WeatherCondition'])
         
     # Scale
     # Pass DataFrame to keep feature names and avoid warning
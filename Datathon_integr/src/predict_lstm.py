@@ -12,6 +12,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from src.osm_loader import get_road_network_stats
 from src.scraper import get_live_weather, get_city_events, get_event_impact_score
 from src.novelty_engine import HybridNoveltyEngine
+from src.categorical import encode_column
 from src.train_lstm import AdvancedTrafficLSTM
 
 def predict_live(city="Mumbai, India"):
@@ -126,8 +127,7 @@ def predict_live(city="Mumbai, India"):
     if 'WeatherCondition' in encoders:
         le = encoders['WeatherCondition']
         # Handle unseen
-        df_seq['WeatherCondition'] = df_seq['WeatherCondition'].apply(lambda x: x if x in le.classes_ else le.classes_[0])
-        df_seq['WeatherCondition'] = le.transform(df_seq['WeatherCondition'])
+        df_seq['WeatherCondition'] = encode_column(le, df_seq['WeatherCondition'])
         
     # Scale
     X_input = df_seq[feature_cols].values
@@ -25,6 +25,7 @@ def run_what_if_scenario(model, scaler, label_encoders, current_params, modifica
     """
     import torch
     import numpy as np
+    from src.categorical import encode_label, is_known
     
     # Make a copy of current params
     modified_params = current_params.copy()
@@ -45,17 +46,12 @@ def run_what_if_scenario(model, scaler, label_encoders, current_params, modifica
     # Create DataFrame
     df = pd.DataFrame([modified_params])
     
-    # Encode categoricals - FIX: properly extract scalar values
+    # Encode categoricals (unknown values use the default code 0)
     for col in ['WeatherCondition', 'origin', 'destination']:
         if col in df.columns and col in label_encoders:
-            try:
-                # Transform returns array, extract first element
-                encoded_array = label_encoders[col].transform(df[col])
-                df[col] = int(encoded_array[0])
-            except (ValueError, KeyError, IndexError):
-                # Unknown value - use default (0)
-                df[col] = 0
+            if not is_known(label_encoders, col, modified_params.get(col)):
                 print(f"   (Note: '{modified_params.get(col)}' not in training data, using default)")
+            df[col] = encode_label(label_encoders, col, modified_params.get(col))
 
 
     # Scale features - use only the features the scaler was trained on (7 features)
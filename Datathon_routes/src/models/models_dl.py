@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 import os
+import sys
 import joblib
 import json
 import tensorflow as tf
@@ -10,6 +11,9 @@ from tensorflow.keras.optimizers import Adam
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import time
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.windowing import build_windows
+
 # Paths
 PROCESSED_DATA_DIR = r'data/processed'
 MODELS_DIR = r'models'
@@ -20,11 +24,9 @@ tf.random.set_seed(42)
 np.random.seed(42)
 
 def create_sequences(X, y, time_steps=1):
-    Xs, ys = [], []
-    for i in range(len(X) - time_steps):
-        Xs.append(X.iloc[i:(i + time_steps)].values)
-        ys.append(y.iloc[i + time_steps])
-    return np.array(Xs), np.array(ys)
+    # Window i is X[i:i+time_steps] with target y[i+time_steps]
+    Xs, ys = build_windows(X.values, y.values, time_steps)
+    return np.ascontiguousarray(Xs), ys
 
 def build_lstm(input_shape):
     model = Sequential([
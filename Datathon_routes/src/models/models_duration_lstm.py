@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 import os
+import sys
 import joblib
 import json
 import time
@@ -10,6 +11,9 @@ from tensorflow.keras.layers import LSTM, Dense, Dropout, Bidirectional
 from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.windowing import build_windows
+
 # Paths
 RAW_DATA_PATH = r'data/raw/mumbai_multi_route_traffic_INTELLIGENCE_READY.csv'
 PROCESSED_DATA_DIR = r'data/processed'
@@ -25,10 +29,6 @@ FEATURES_TO_USE = [
 TARGET = 'block_duration_hours'
 
 def create_sequences(df, seq_length, features):
-    X = []
-    y = []
-    indices = []
-    
     # Group by route to ensure sequences don't cross routes
     # We only want sequences where the LAST step is a Block Start
     
@@ -39,32 +39,14 @@ def create_sequences(df, seq_length, features):
     feature_data = df[features].values
     target_data = df[TARGET].values
     block_start_mask = df['is_block_start'].values
-    route_ids = df['route_id'].values
-    
-    # Iterate through data
-    # We need to be careful with route boundaries.
-    # Faster way: Iterate per route
     
     print(f"Creating sequences of length {seq_length} for block starts...")
     
-    for route in df['route_id'].unique():
-        route_mask = (route_ids == route)
-        route_data = feature_data[route_mask]
-        route_target = target_data[route_mask]
-        route_starts = block_start_mask[route_mask]
-        
-        if len(route_data) < seq_length:
-            continue
-            
-        # We only take windows where the END (index i) is a block start
-        for i in range(seq_length, len(route_data)):
-            if route_starts[i] == 1:
-                # Sequence is [i-seq_length : i]
-                # Target is at i
-                X.append(route_data[i-seq_length:i])
-                y.append(route_target[i])
-                
-    return np.array(X), np.array(y)
+    # Per-route windows [i-seq_length : i] (never crossing routes), each
+    # paired with its target row i; keep those where row i is a block start
+    X, rows = build_windows(feature_data, np.arange(len(df)), seq_length, groups=df['route_id'].values)
+    keep = block_start_mask[rows] == 1
+    return X[keep], target_data[rows[keep]]
 
 def train_lstm_duration_model():
     print("Loading Raw Data for LSTM...")
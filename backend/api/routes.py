@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Optional
+import asyncio
 import sys
 import os
 from pathlib import Path
@@ -12,28 +14,51 @@ if str(backend_dir) not in sys.path:
     sys.path.append(str(backend_dir))
 
 try:
-    from src.predict import get_prediction_data
+    from src.predict import get_prediction_data, last_prediction
 except ImportError:
     # If src is in the project root instead of backend/src
     project_root = backend_dir.parent
     if str(project_root) not in sys.path:
         sys.path.append(str(project_root))
-    from src.predict import get_prediction_data
+    from src.predict import get_prediction_data, last_prediction
 
 router = APIRouter()
 
+def _parse_horizons(horizons):
+    """Comma-separated horizon hours -> list of floats; 422 when malformed or out of range."""
+    from src.forecast_engine import MAX_HORIZON_H, MAX_HORIZONS
+    if not horizons:
+        return None
+    values = []
+    for part in horizons.split(","):
+        if not part.strip():
+            continue
+        try:
+            value = float(part)
+        except ValueError:
+            raise HTTPException(status_code=422, detail=f"Invalid horizon '{part.strip()}': expected a number of hours")
+        if not 0 < value <= MAX_HORIZON_H:
+            raise HTTPException(status_code=422, detail=f"Horizon {value:g} out of range: must be > 0 and <= {MAX_HORIZON_H} hours")
+        values.append(value)
+    if len(values) > MAX_HORIZONS:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_HORIZONS} horizons per request")
+    return values or None
+
 @router.get("/predict")
 async def predict_traffic(
     city: str = Query("Mumbai, India", description="Target City"),
     source: Optional[str] = Query(None, description="Start Location"),
-    dest: Optional[str] = Query(None, description="End Location")
+    dest: Optional[str] = Query(None, description="End Location"),
+    horizons: Optional[str] = Query(None, description="Comma-separated forecast horizons in hours (e.g. 0.25,0.5,1)")
 ):
     """
     Get real-time traffic prediction and context.
     """
+    horizon_list = _parse_horizons(horizons)
     try:
-        # Call the core logic
-        data = get_prediction_data(city=city, source=source, dest=dest)
+        # Call the core logic (in a worker thread so concurrent requests can share a batch)
+        import asyncio
+        data = await asyncio.to_thread(get_prediction_data, city=city, source=source, dest=dest, horizons=horizon_list)
         
         if "error" in data:
             raise HTTPException(status_code=400, detail=data["error"])
@@ -67,11 +92,13 @@ async def predict_traffic(
                 ]
             }
         except Exception as e:
-            print(f"[WARNING] /predict Smart Analysis failed: {e}")
+            logger.warning("/predict Smart Analysis failed: %s", e)
             data["smart_analysis"] = {}
 
         return data
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -84,173 +111,293 @@ class RouteRequest(BaseModel):
     destination: GeoPoint
     source_name: Optional[str] = None
     dest_name: Optional[str] = None
+    departure_hour: Optional[float] = Field(None, ge=0, lt=24)  # hour of day; defaults to the current hour
+    # Local-engine routes to search: the single best path (default) stays in
+    # single-digit ms; each alternative is another full search
+    alternatives: int = Field(1, ge=1, le=3)
+    route: Optional[List[List[float]]] = None  # [[lon, lat], ...] geometry for corridor queries
 
 import requests
-import polyline
+from src.http_pool import get_session, get_upstream, base_url
+from src.route_cache import route_cache, decode_routes, expand_routes
+from src.local_router import local_routes, traffic_routes, traffic_key, get_graph
+from src.segment_analytics import find_bottleneck_spans
+from src.deadline import Deadline, DEFAULT_BUDGET_S
+from src.telemetry import span, latency_stats
+from src.geometry_codec import FORMATS as GEOMETRY_FORMATS, compact_routes, dumps, encode_geometry
+from src.log import get_logger
+from src.scraper import get_live_weather_async, get_city_events_async, get_event_impact_score_async
+
+logger = get_logger(__name__)
+
+OSRM_PARAMS = {
+    "overview": "full",
+    "geometries": "polyline",
+    "alternatives": "3",
+    "steps": "true",
+    "annotations": "true"
+}
+
+# "auto": local graph when one is loaded, else OSRM; "local" / "osrm" force one engine
+ROUTING_ENGINE = os.getenv("ROUTING_ENGINE", "auto")
+
+def _cached_local_routes(key, search):
+    """Local-engine entries through the route cache; empty results are not cached."""
+    def _search():
+        with span("local_routing"):
+            routes = search()
+        if not routes:
+            raise _NoRoute("No local route")
+        return routes
+    try:
+        return route_cache.get_or_load(key, _search)
+    except _NoRoute:
+        return []
+
+def _route_locally(start_lat, start_lon, dest_lat, dest_lon):
+    """Routes from the in-process engine in get_osrm_route shape, or None."""
+    if ROUTING_ENGINE == "osrm":
+        return None
+    try:
+        key = ("local",) + route_cache.key(start_lat, start_lon, dest_lat, dest_lon)
+        routes = _cached_local_routes(key, lambda: local_routes(start_lat, start_lon, dest_lat, dest_lon))
+    except Exception as e:
+        logger.warning("Local routing failed: %s", e)
+        return None
+    if not routes:
+        return None
+    logger.debug("Local router found %s routes", len(routes))
+    return expand_routes(routes)
+
+def _route_with_forecast(start_lat, start_lon, dest_lat, dest_lon, prediction, depart_hour=None, k=1):
+    """Up to k forecast-timed routes from the local graph in get_osrm_route shape, or None."""
+    try:
+        key = ("timed", k) + route_cache.key(start_lat, start_lon, dest_lat, dest_lon) + traffic_key(prediction, depart_hour)
+        routes = _cached_local_routes(key, lambda: traffic_routes(
+            start_lat, start_lon, dest_lat, dest_lon, prediction=prediction, depart_hour=depart_hour, k=k
+        ))
+    except Exception as e:
+        logger.warning("Time-dependent routing failed: %s", e)
+        return None
+    if not routes:
+        return None
+    logger.debug("Time-dependent router found %s routes", len(routes))
+    return expand_routes(routes)
+
+def _route_congestion(route_info, default):
+    """Congestion of one route from its forecast delay over free flow; `default` without one."""
+    free_flow = route_info.get("free_flow_duration")
+    if not free_flow:
+        return default
+    delay = route_info["duration"] / free_flow
+    if delay >= 1.5:
+        return 'high'
+    if delay >= 1.2:
+        return 'medium'
+    return 'low'
+
+def _eco_index(all_routes):
+    """
+    Alternative with the lowest fuel proxy (distance, scaled up by stop-and-go
+    delay where forecast timings exist), or None with a single route.
+    """
+    if len(all_routes) < 2:
+        return None
+    def fuel(idx):
+        r = all_routes[idx]
+        return r["distance"] * (r["duration"] / r.get("free_flow_duration", r["duration"]) if r["duration"] else 1.0)
+    return min(range(1, len(all_routes)), key=fuel)
+
+def _span_bottlenecks(route_info, k=3):
+    """Slow stretches from a route's segment annotations, in the bottleneck format."""
+    return [{
+        "location": span["name"],
+        "lat": span["lat"],
+        "lon": span["lon"],
+        "start": span["start"],
+        "end": span["end"],
+        "eta_minutes": int(span["eta_s"] // 60),
+        "congestion_forecast": "Critical" if span["severity"] == "High" else "High",
+        "probability": round(max(span["slowdown"], 0.5), 2),
+        "delay_minutes": round(span["delay_s"] / 60, 1),
+        "reason": f"Slow traffic on {span['name']}: {int(span['speed_kmh'])} km/h over {int(span['length_m'])} m"
+    } for span in find_bottleneck_spans(route_info, k=k)]
+
+def _osrm_path(start_lat, start_lon, dest_lat, dest_lon):
+    # OSRM expects: lon,lat;lon,lat
+    return f"/route/v1/driving/{start_lon},{start_lat};{dest_lon},{dest_lat}"
+
+class _NoRoute(Exception):
+    """OSRM answered without a usable route (never cached)."""
+
+def _decode_osrm_response(response):
+    logger.debug("OSRM Response Status: %s", response.status_code)
+    if response.status_code != 200:
+        raise _NoRoute(f"OSRM Error {response.status_code}: {response.text}")
+    data = response.json()
+    routes = decode_routes(data)
+    if not routes:
+        raise _NoRoute(f"OSRM returned 0 routes. Response: {data}")
+    logger.debug("Found %s routes (1 main + %s alternates)", len(routes), len(routes) - 1)
+    return routes
 
 def get_osrm_route(start_lat, start_lon, dest_lat, dest_lon):
     """
     Fetch real driving route from OSRM public API
-    Returns: (main_route, alternates, duration, distance)
+    Served from the route cache when the snapped origin/destination cells were seen recently.
+    Returns: (main_route, alternates, duration, distance, all_routes)
     """
+    local = _route_locally(start_lat, start_lon, dest_lat, dest_lon)
+    if local is not None or ROUTING_ENGINE == "local":
+        return local or (None, [], 0, 0, [])
+
     try:
-        # OSRM expects: lon,lat;lon,lat
-        # DEBUG LOG
-        print(f"[DEBUG] get_osrm_route INPUT: start={start_lat},{start_lon}, dest={dest_lat},{dest_lon}")
-        
-        url = f"http://router.project-osrm.org/route/v1/driving/{start_lon},{start_lat};{dest_lon},{dest_lat}"
-        print(f"[DEBUG] get_osrm_route URL: {url}")
-        
-        params = {
-            "overview": "full",
-            "geometries": "polyline",
-            "alternatives": "3",
-            "steps": "true",
-            "annotations": "true"
-        }
-        headers = {
-            "User-Agent": "TrafficIntelligenceApp/1.0"
-        }
-        
-        print(f"[DEBUG] OSRM Request URL: {url}")
-        try:
-            response = requests.get(url, params=params, headers=headers, timeout=5)
-            print(f"[DEBUG] OSRM Response Status: {response.status_code}")
-            
-            if response.status_code == 200:
-                data = response.json()
-                routes = data.get("routes", [])
-                
-                if not routes:
-                    print(f"[DEBUG] OSRM returned 0 routes. Response: {data}")
-                    return None, [], 0, 0, []
-                
-                # Process all routes
-                all_routes = []
-                for route in routes:
-                    decoded = polyline.decode(route["geometry"]) # Returns [(lat, lon)]
-                    # Convert to [lon, lat] for MapLibre
-                    path = [[p[1], p[0]] for p in decoded]
-                    all_routes.append({
-                        "geometry": path,
-                        "duration": route.get("duration", 0),
-                        "distance": route.get("distance", 0) / 1000,
-                        "legs": route.get("legs", [])
-                    })
-                
-                # Main route is the first one
-                main_route_geom = all_routes[0]["geometry"]
-                duration = all_routes[0]["duration"]
-                distance = all_routes[0]["distance"]
-                
-                # Alternates are the rest
-                alternates = [r["geometry"] for r in all_routes[1:]]
-                
-                print(f"[DEBUG] Found {len(all_routes)} routes (1 main + {len(alternates)} alternates)")
-                
-                return main_route_geom, alternates, duration, distance, all_routes
-            else:
-                print(f"[DEBUG] OSRM Error {response.status_code}: {response.text}")
+        url = base_url("osrm") + _osrm_path(start_lat, start_lon, dest_lat, dest_lon)
 
-        except requests.exceptions.RequestException as req_err:
-             print(f"[DEBUG] OSRM Network Error: {req_err}")
-             return None, [], 0, 0, []
-            
+        def _fetch():
+            logger.debug("OSRM Request URL: %s", url)
+            with span("osrm"):
+                response = get_session("osrm").get(url, params=OSRM_PARAMS, timeout=5)
+            return _decode_osrm_response(response)
+
+        key = route_cache.key(start_lat, start_lon, dest_lat, dest_lon)
+        return expand_routes(route_cache.get_or_load(key, _fetch))
+
+    except _NoRoute as e:
+        logger.debug("No OSRM route: %s", e)
+    except requests.exceptions.RequestException as req_err:
+        logger.debug("OSRM Network Error: %s", req_err)
     except Exception as e:
-        print(f"[WARNING] OSRM Route fetch failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return None, [], 0, 0, []
+        logger.warning("OSRM Route fetch failed: %s", e, exc_info=True)
 
     return None, [], 0, 0, []
 
-@router.post("/route")
-async def get_route(request: RouteRequest):
+async def get_osrm_route_async(start_lat, start_lon, dest_lat, dest_lon):
     """
-    Get route coordinates, congestion prediction, and comprehensive route analysis.
-    Optimized with parallel execution for faster response times.
+    Event-loop variant of get_osrm_route using the pooled OSRM client
+    (keep-alive, retries, circuit breaker) and the same route cache.
+    Returns: (main_route, alternates, duration, distance, all_routes)
     """
-    import asyncio
-    from concurrent.futures import ThreadPoolExecutor
+    local = await asyncio.to_thread(_route_locally, start_lat, start_lon, dest_lat, dest_lon)
+    if local is not None or ROUTING_ENGINE == "local":
+        return local or (None, [], 0, 0, [])
 
-    # Determine location names
-    source_name = request.source_name or "Bandra"
-    dest_name = request.dest_name or "Dadar"
-    
-    start_coords = [request.start.lat, request.start.lon]
-    dest_coords = [request.destination.lat, request.destination.lon]
+    try:
+        path = _osrm_path(start_lat, start_lon, dest_lat, dest_lon)
 
-    # --- Helper wrappers for blocking calls ---
-    def _fetch_osrm():
-        # Returns: main_route_coords, alternates_coords, duration_sec, distance_km, all_routes_details
-        return get_osrm_route(request.start.lat, request.start.lon, request.destination.lat, request.destination.lon)
+        async def _fetch():
+            logger.debug("OSRM Request: %s", path)
+            with span("osrm"):
+                response = await get_upstream("osrm").get(path, params=OSRM_PARAMS)
+            return _decode_osrm_response(response)
 
-    def _fetch_prediction():
-        try:
-            return get_prediction_data(city="Mumbai", source=source_name, dest=dest_name)
-        except Exception as e:
-            print(f"[ERROR] Prediction failed: {e}")
-            return {}
+        key = route_cache.key(start_lat, start_lon, dest_lat, dest_lon)
+        return expand_routes(await route_cache.get_or_load_async(key, _fetch))
 
-    def _fetch_reports():
-        try:
-            from backend.services.reports_fetcher import fetch_route_reports
-            return fetch_route_reports(source=source_name, destination=dest_name, hours=24, limit=10)
-        except Exception as e:
-            print(f"[ERROR] Reports fetching failed: {e}")
-            return []
+    except _NoRoute as e:
+        logger.debug("No OSRM route: %s", e)
+    except Exception as e:
+        logger.warning("OSRM Route fetch failed: %s", e)
 
-    # --- Phase 1: Parallel Execution ---
-    # Run OSRM, Prediction, and Reports fetching concurrently
-    print(f"[INFO] Starting parallel fetch for {source_name} -> {dest_name}")
-    
-    # We use asyncio.to_thread to run blocking I/O in a separate thread
-    # This is non-blocking for the event loop
+    return None, [], 0, 0, []
+
+# --- /route stages, shared by the JSON and streaming endpoints ---
+
+def _route_names(request):
+    return request.source_name or "Bandra", request.dest_name or "Dadar"
+
+async def _fetch_prediction(source_name, dest_name, deadline):
     try:
-        results = await asyncio.gather(
-            asyncio.to_thread(_fetch_osrm),
-            asyncio.to_thread(_fetch_prediction),
-            asyncio.to_thread(_fetch_reports),
-            return_exceptions=True
+        # Live context is fetched natively on the event loop; only the
+        # CPU-bound model work runs in a thread
+        weather, event_score, events = await asyncio.gather(
+            get_live_weather_async("Mumbai", deadline=deadline),
+            get_event_impact_score_async("Mumbai", deadline=deadline),
+            get_city_events_async("Mumbai", context={'source': source_name, 'dest': dest_name}, deadline=deadline)
+        )
+        context = {"weather": weather, "event_score": event_score, "events": events}
+        return await deadline.run(
+            "prediction",
+            asyncio.to_thread(get_prediction_data, city="Mumbai", source=source_name, dest=dest_name, context=context, deadline=deadline),
+            # Out of time: the last forecast for this trip, else none
+            fallback=lambda: last_prediction("Mumbai", source_name, dest_name) or {}
         )
     except Exception as e:
-        print(f"[CRITICAL] Async gather failed: {e}")
-        # Fallback empty values
-        results = [ (None, [], 0, 0), {}, [] ]
+        logger.error("Prediction failed: %s", e)
+        return {}
 
-    # Unpack results with error handling
-    osrm_data = results[0] if not isinstance(results[0], Exception) else (None, [], 0, 0)
-    pred_data = results[1] if not isinstance(results[1], Exception) else {}
-    community_reports = results[2] if not isinstance(results[2], Exception) else []
+@span("reports")
+def _fetch_reports(source_name, dest_name, deadline):
+    try:
+        from backend.services.reports_fetcher import fetch_route_reports
+        return fetch_route_reports(source=source_name, destination=dest_name, hours=24, limit=10, deadline=deadline)
+    except Exception as e:
+        logger.error("Reports fetching failed: %s", e)
+        return []
 
-    route_coords, alt_routes, duration, distance, all_routes_data = osrm_data
+async def _fetch_routes(request, prediction_task, deadline):
+    # With a local graph, routes are searched on per-hour edge costs from
+    # whatever forecast is already at hand (this request's if it finished,
+    # else the last one for the trip, else the typical demand curve), so
+    # routing never waits on the prediction's scrapes; otherwise OSRM.
+    # Out of time, routing returns None and the mock route is used.
+    if ROUTING_ENGINE != "osrm" and await asyncio.to_thread(get_graph) is not None:
+        if prediction_task.done() and not prediction_task.cancelled():
+            prediction = prediction_task.result()
+        else:
+            prediction = last_prediction("Mumbai", *_route_names(request))
+        routed = await deadline.run("routing", asyncio.to_thread(
+            _route_with_forecast, request.start.lat, request.start.lon,
+            request.destination.lat, request.destination.lon,
+            prediction, request.departure_hour, request.alternatives
+        ))
+        if routed is not None:
+            return routed
+    return await deadline.run("routing", get_osrm_route_async(
+        request.start.lat, request.start.lon, request.destination.lat, request.destination.lon
+    ))
 
-    # Fallback if OSRM fails
-    if not route_coords:
-        print("[INFO] Using fallback mock route generation")
-        steps = 20
-        route_coords = []
-        for i in range(steps + 1):
-            t = i / steps
-            lat = request.start.lat + (request.destination.lat - request.start.lat) * t
-            lon = request.start.lon + (request.destination.lon - request.start.lon) * t
-            route_coords.append([lon, lat])
-        
-        # Mock alternate
-        import math
-        alt_route_coords = [] 
-        for i in range(steps + 1):
-            t = i / steps
-            deviation = math.sin(t * math.pi) * 0.02
-            lat = request.start.lat + (request.destination.lat - request.start.lat) * t + deviation
-            lon = request.start.lon + (request.destination.lon - request.start.lon) * t + deviation
-            alt_route_coords.append([lon, lat])
-        
-        alt_routes = [alt_route_coords]
-        duration = 1200
-        distance = 5.0
+def _start_route_tasks(request, deadline):
+    """(routes, prediction, reports) tasks for a /route request, all started now."""
+    source_name, dest_name = _route_names(request)
+    prediction_task = asyncio.ensure_future(_fetch_prediction(source_name, dest_name, deadline))
+    routes_task = asyncio.ensure_future(_fetch_routes(request, prediction_task, deadline))
+    reports_task = asyncio.ensure_future(deadline.run(
+        "reports", asyncio.to_thread(_fetch_reports, source_name, dest_name, deadline), fallback=list
+    ))
+    return routes_task, prediction_task, reports_task
 
-    # --- Phase 2: Processing (Fast, CPU bound) ---
+def _route_deadline(budget_ms):
+    return Deadline(budget_ms / 1000 if budget_ms else DEFAULT_BUDGET_S)
+
+def _mock_routes(request):
+    """Straight-line main route plus a bowed alternate, for when routing fails."""
+    import math
+    steps = 20
+    route_coords, alt_route_coords = [], []
+    for i in range(steps + 1):
+        t = i / steps
+        lat = request.start.lat + (request.destination.lat - request.start.lat) * t
+        lon = request.start.lon + (request.destination.lon - request.start.lon) * t
+        route_coords.append([lon, lat])
+        deviation = math.sin(t * math.pi) * 0.02
+        alt_route_coords.append([lon + deviation, lat + deviation])
+    return route_coords, [alt_route_coords], 1200, 5.0, []
+
+def _routing_result(result):
+    """The routing task's result, or None when routing failed (callers use the mock route)."""
+    if isinstance(result, Exception) or not result or not result[0]:
+        return None
+    return result
+
+def _congestion_value(pred_data):
+    congestion_level = pred_data.get('prediction', {}).get('congestion_level', 'low')
+    c_map = {'0': 'low', '1': 'medium', '2': 'high'}
+    return c_map.get(str(congestion_level), 'low')
+
+@span("analysis")
+def _analyze_route(pred_data, community_reports, route_coords, all_routes_data, source_name, dest_name):
+    """Alerts, impact score and bottlenecks for the main route (briefing left empty)."""
     route_analysis = {
         "alerts_24hr": [],
         "community_reports": community_reports,
@@ -266,76 +413,64 @@ async def get_route(request: RouteRequest):
         from src.route_analyzer import filter_alerts_by_route, prioritize_alerts, calculate_route_impact_score
         all_events = events_data.get("Events", [])
         recent = prioritize_alerts(all_events)
-        route_alerts = filter_alerts_by_route(recent, source_name, dest_name, radius_km=5)
+        # Corridor distances against the actual route geometry
+        route_alerts = filter_alerts_by_route(recent, source_name, dest_name, radius_km=5, route_coords=route_coords)
         
         route_analysis["alerts_24hr"] = route_alerts[:10]
-        route_analysis["route_impact_score"] = calculate_route_impact_score(route_alerts, source_name, dest_name)
+        route_analysis["route_impact_score"] = calculate_route_impact_score(route_alerts, source_name, dest_name, route_coords=route_coords)
     except Exception as e:
-        print(f"[ERROR] Alert processing failed: {e}")
+        logger.error("Alert processing failed: %s", e)
+
+    try:
+        # Community reports through the same corridor (kept in score order)
+        from src.route_analyzer import filter_alerts_by_route
+        route_analysis["community_reports"] = filter_alerts_by_route(
+            community_reports, source_name, dest_name, radius_km=5, route_coords=route_coords, sort=False
+        )
+    except Exception as e:
+        logger.error("Report filtering failed: %s", e)
+
+    try:
+        # Spatial bottlenecks: slow stretches in the main route's segment annotations
+        if all_routes_data:
+            route_analysis["bottlenecks"] = _span_bottlenecks(all_routes_data[0])
+    except Exception as e:
+        logger.error("Segment analysis failed: %s", e)
 
     try:
         # Detect bottlenecks
         from src.bottleneck_detector import detect_bottlenecks
-        route_analysis["bottlenecks"] = detect_bottlenecks(
+        route_analysis["bottlenecks"] += detect_bottlenecks(
             source=source_name, destination=dest_name, prediction_data=pred_data, events_data=events_data
         )
     except Exception as e:
-        print(f"[ERROR] Bottleneck detection failed: {e}")
-
-    # --- Phase 3: AI Briefing (Can be slow, so run in thread) ---
-    def _gen_briefing():
-        from src.traffic_anchor import generate_traffic_bulletin
-        # Use our updated generate_route_briefing helper
-        ctx = {
-            **pred_data,
-            "route_analysis": route_analysis,
-            "source": source_name,
-            "destination": dest_name,
-            "community_reports": community_reports
-        }
-        return generate_route_briefing(ctx)
+        logger.error("Bottleneck detection failed: %s", e)
+    return route_analysis
 
-    try:
-        # Run AI in background thread so it doesn't block if we wanted to stream (but here we await it)
-        # Note: If this is too slow, we could skip it or cache it.
-        # route_analysis["ai_route_briefing"] = await asyncio.to_thread(_gen_briefing)
-        
-        # USE NEW FEATHERLESS LOGIC
-        from backend.genai_handler import generate_traffic_insight
-        structured_ctx = {
-             "selected_route_name": "Best Route",
-             "selected_eta": pred_data.get('prediction', {}).get('eta', 0),
-             "selected_congestion": pred_data.get('prediction', {}).get('congestion_level', 'Low'),
-             "top_contributing_factors": "Traffic flow is normal"
-        }
-        print("[DEBUG] Calling Featherless AI from get_route...")
-        route_analysis["ai_route_briefing"] = await asyncio.to_thread(generate_traffic_insight, structured_ctx)
-        
-    except Exception as e:
-        print(f"[ERROR] AI Briefing failed: {e}")
-        route_analysis["ai_route_briefing"] = "Traffic is building up near Dadar, but don't worry—this is still your fastest option. Drive safe!"
+def _insight_context(pred_data):
+    return {
+        "selected_route_name": "Best Route",
+        "selected_eta": pred_data.get('prediction', {}).get('eta', 0),
+        "selected_congestion": pred_data.get('prediction', {}).get('congestion_level', 'Low'),
+        "top_contributing_factors": "Traffic flow is normal"
+    }
 
-    # Map congestion level
-    congestion_level = pred_data.get('prediction', {}).get('congestion_level', 'low')
-    c_map = {'0': 'low', '1': 'medium', '2': 'high'}
-    congestion_val = c_map.get(str(congestion_level), 'low')
+FALLBACK_BRIEFING = "Traffic is building up near Dadar, but don't worry—this is still your fastest option. Drive safe!"
 
-    # Build routes array in the format frontend expects
+def _routes_response(all_routes_data, route_coords, alt_routes, duration, distance, pred_data, congestion_val):
+    """The `routes` array in the format the frontend expects."""
     routes_response = []
     
     if all_routes_data:
-        # Use the detailed route data from OSRM
+        # Use the detailed route data from the router
+        eco_idx = _eco_index(all_routes_data)
         for idx, route_info in enumerate(all_routes_data):
             # Determine route characteristics
             is_fastest = idx == 0
-            is_eco = idx == 1  # Second route is eco-friendly
+            is_eco = idx == eco_idx
             
-            # Calculate congestion variation for different routes
-            route_congestion = congestion_val
-            if idx == 1:  # Eco route might have less congestion
-                route_congestion = 'low' if congestion_val == 'high' else congestion_val
-            elif idx == 2:  # Third route might have different congestion
-                route_congestion = 'medium' if congestion_val != 'medium' else 'high'
+            # Per-route congestion from forecast timings (city-level for OSRM routes)
+            route_congestion = _route_congestion(route_info, congestion_val)
             
             # Generate route label
             if is_fastest:
@@ -397,9 +532,22 @@ async def get_route(request: RouteRequest):
                 "ai_prediction": f"Alternative route with estimated {round(duration / 60 * 1.15, 1)} min travel time.",
                 "confidence_score": 70
             })
+    return routes_response
 
+def _prediction_summary(pred_data, congestion_val):
     return {
-        "routes": routes_response,  # Frontend expects this
+        "overall_congestion": congestion_val,
+        "confidence": pred_data.get('prediction', {}).get('confidence_score', 85),
+        "weather": pred_data.get('context', {}).get('weather', {}).get('Condition', 'Clear'),
+        "events": pred_data.get('context', {}).get('events', {}).get('Details', {}).get('Name', 'None')
+    }
+
+def _route_body(routing, pred_data, route_analysis, deadline):
+    """The complete /route response body."""
+    route_coords, alt_routes, duration, distance, all_routes_data = routing
+    congestion_val = _congestion_value(pred_data)
+    return {
+        "routes": _routes_response(all_routes_data, route_coords, alt_routes, duration, distance, pred_data, congestion_val),  # Frontend expects this
         "route": route_coords,  # Keep for backward compatibility
         "alternative_route": alt_routes[0] if alt_routes else [],
         "alternates": alt_routes,
@@ -409,14 +557,191 @@ async def get_route(request: RouteRequest):
         "distance": distance,
         "route_analysis": route_analysis,
         "ai_insight": route_analysis.get("ai_route_briefing", ""),
-        "prediction_data": {
-            "overall_congestion": congestion_val,
-            "confidence": pred_data.get('prediction', {}).get('confidence_score', 85),
-            "weather": pred_data.get('context', {}).get('weather', {}).get('Condition', 'Clear'),
-            "events": pred_data.get('context', {}).get('events', {}).get('Details', {}).get('Name', 'None')
-        }
+        "prediction_data": _prediction_summary(pred_data, congestion_val),
+        # Budget, per-stage milliseconds and the stages that fell back
+        "metadata": deadline.metadata()
     }
 
+def _check_geometry_format(geometry):
+    if geometry not in GEOMETRY_FORMATS:
+        raise HTTPException(status_code=422, detail=f"geometry must be one of {list(GEOMETRY_FORMATS)}")
+
+@router.post("/route")
+async def get_route(
+    request: RouteRequest,
+    http_request: Request,
+    geometry: str = Query("full", description="Geometry encoding: full, simplified, polyline or delta"),
+    zoom: Optional[float] = Query(None, ge=0, le=22, description="Map zoom to simplify geometry for"),
+    budget_ms: Optional[int] = Query(None, gt=0, le=60000, description="Deadline for the whole request")
+):
+    """
+    Get route coordinates, congestion prediction, and comprehensive route analysis.
+    Optimized with parallel execution for faster response times.
+
+    Every stage runs within one deadline (budget_ms, default ROUTE_DEADLINE_S);
+    stages that run out of time fall back to cached or heuristic output and
+    are listed in metadata.degraded.
+
+    With a local graph, only the best route is searched unless the body asks
+    for `alternatives` (up to 3); OSRM returns its own alternatives.
+
+    `geometry=polyline|delta` encodes each route once (see geometry_codec);
+    send `Accept: application/msgpack` for a msgpack body. /route/stream
+    sends the same data progressively.
+    """
+    _check_geometry_format(geometry)
+    source_name, dest_name = _route_names(request)
+    deadline = _route_deadline(budget_ms)
+
+    # --- Phase 1: Parallel Execution ---
+    # Run routing, Prediction, and Reports fetching concurrently
+    logger.debug("Starting parallel fetch for %s -> %s", source_name, dest_name)
+    
+    # HTTP upstreams run on the event loop; Firestore (blocking SDK) runs in a thread
+    results = await asyncio.gather(*_start_route_tasks(request, deadline), return_exceptions=True)
+
+    # Unpack results with error handling
+    pred_data = results[1] if not isinstance(results[1], Exception) else {}
+    community_reports = results[2] if not isinstance(results[2], Exception) else []
+
+    routing = _routing_result(results[0])
+    # Fallback if OSRM fails
+    if routing is None:
+        logger.info("Using fallback mock route generation")
+        routing = _mock_routes(request)
+    route_coords, _, _, _, all_routes_data = routing
+
+    # --- Phase 2: Processing (Fast, CPU bound) ---
+    with deadline.stage("analysis"):
+        route_analysis = _analyze_route(pred_data, community_reports, route_coords, all_routes_data, source_name, dest_name)
+
+    # --- Phase 3: AI Briefing ---
+    try:
+        from backend.genai_handler import generate_traffic_insight_async
+        logger.debug("Calling Featherless AI from get_route...")
+        route_analysis["ai_route_briefing"] = await generate_traffic_insight_async(_insight_context(pred_data), deadline=deadline)
+        
+    except Exception as e:
+        logger.error("AI Briefing failed: %s", e)
+        route_analysis["ai_route_briefing"] = FALLBACK_BRIEFING
+
+    body = _route_body(routing, pred_data, route_analysis, deadline)
+    # Serialized directly: skips FastAPI's per-element jsonable_encoder pass over the geometry
+    content, media_type = dumps(compact_routes(body, geometry, zoom), http_request.headers.get("accept"))
+    return Response(content=content, media_type=media_type)
+
+NDJSON_TYPE = "application/x-ndjson"
+
+def _stream_frame(event, data, ndjson):
+    content, _ = dumps({"event": event, "data": data} if ndjson else data)
+    if ndjson:
+        return content + b"\n"
+    return b"event: " + event.encode() + b"\ndata: " + content + b"\n\n"
+
+@router.post("/route/stream")
+async def stream_route(
+    request: RouteRequest,
+    http_request: Request,
+    geometry: str = Query("full", description="Geometry encoding: full, simplified, polyline or delta"),
+    zoom: Optional[float] = Query(None, ge=0, le=22, description="Map zoom to simplify geometry for"),
+    stream_format: str = Query("sse", alias="format", description="sse (text/event-stream) or ndjson"),
+    budget_ms: Optional[int] = Query(None, gt=0, le=60000, description="Deadline for the whole request")
+):
+    """
+    /route as a progressive stream: each stage is sent as soon as it is ready.
+
+    Events, in order:
+        routes         {routes: [{points, eta_min, distance_km}], duration, distance}
+        prediction     {congestion, forecast, prediction_data, route_congestion}
+        analysis       route_analysis without the briefing
+        insight_token  {text} per LLM token (one chunk when the insight is cached)
+        insight        {text} the complete briefing
+        complete       the full /route body (same schema, geometry encoding and metadata)
+
+    SSE frames are `event: <name>` + `data: <json>`; with format=ndjson (or
+    `Accept: application/x-ndjson`) each line is {"event", "data"}.
+    """
+    _check_geometry_format(geometry)
+    if stream_format not in ("sse", "ndjson"):
+        raise HTTPException(status_code=422, detail="format must be sse or ndjson")
+    ndjson = stream_format == "ndjson" or NDJSON_TYPE in (http_request.headers.get("accept") or "")
+    source_name, dest_name = _route_names(request)
+    deadline = _route_deadline(budget_ms)
+    routes_task, prediction_task, reports_task = _start_route_tasks(request, deadline)
+
+    async def _events():
+        try:
+            # 1. Geometry as soon as routing returns (OSRM latency)
+            try:
+                routing = _routing_result(await routes_task)
+            except Exception as e:
+                logger.error("Routing failed: %s", e)
+                routing = None
+            if routing is None:
+                routing = _mock_routes(request)
+            route_coords, alt_routes, duration, distance, all_routes_data = routing
+            geometries = [r["geometry"] for r in all_routes_data] or [route_coords] + list(alt_routes)
+            infos = all_routes_data or [{"duration": duration, "distance": distance}] * len(geometries)
+            yield _stream_frame("routes", {
+                "routes": [{
+                    "points": encode_geometry(g, geometry, zoom),
+                    "eta_min": round(r["duration"] / 60, 1),
+                    "distance_km": round(r["distance"], 2)
+                } for g, r in zip(geometries, infos)],
+                "duration": duration,
+                "distance": distance
+            }, ndjson)
+
+            # 2. Congestion prediction
+            try:
+                pred_data = await prediction_task
+            except Exception:
+                pred_data = {}
+            congestion_val = _congestion_value(pred_data)
+            yield _stream_frame("prediction", {
+                "congestion": [{"congestion_level": congestion_val}],
+                "forecast": pred_data.get('forecast', []),
+                "prediction_data": _prediction_summary(pred_data, congestion_val),
+                "route_congestion": [_route_congestion(r, congestion_val) for r in all_routes_data] or [congestion_val] * len(geometries)
+            }, ndjson)
+
+            # 3. Alerts and bottlenecks
+            try:
+                community_reports = await reports_task
+            except Exception:
+                community_reports = []
+            with deadline.stage("analysis"):
+                route_analysis = await asyncio.to_thread(
+                    _analyze_route, pred_data, community_reports, route_coords, all_routes_data, source_name, dest_name
+                )
+            yield _stream_frame("analysis", route_analysis, ndjson)
+
+            # 4. Briefing, token by token
+            parts = []
+            try:
+                from backend.genai_handler import stream_traffic_insight
+                async for token in stream_traffic_insight(_insight_context(pred_data), deadline=deadline):
+                    parts.append(token)
+                    yield _stream_frame("insight_token", {"text": token}, ndjson)
+            except Exception as e:
+                logger.error("AI Briefing failed: %s", e)
+            route_analysis["ai_route_briefing"] = "".join(parts) or FALLBACK_BRIEFING
+            yield _stream_frame("insight", {"text": route_analysis["ai_route_briefing"]}, ndjson)
+
+            # 5. The whole response in the /route schema
+            body = _route_body(routing, pred_data, route_analysis, deadline)
+            yield _stream_frame("complete", compact_routes(body, geometry, zoom), ndjson)
+        finally:
+            # Client went away: stop work nobody will read
+            for task in (routes_task, prediction_task, reports_task):
+                task.cancel()
+
+    return StreamingResponse(
+        _events(),
+        media_type=NDJSON_TYPE if ndjson else "text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 
 @router.post("/analyze_routes")
 async def analyze_routes(request: RouteRequest, user_preference: str = Query("Fastest route", description="User priority")):
@@ -424,18 +749,15 @@ async def analyze_routes(request: RouteRequest, user_preference: str = Query("Fa
     Advanced Route Analysis with GenAI (Featherless) and ML Integration.
     Returns 3 best routes with predictions and explanation.
     """
-    import asyncio
-    
     # 1. Get Routes via OSRM (Known to work)
     start_coords = [request.start.lat, request.start.lon]
     dest_coords = [request.destination.lat, request.destination.lon]
     
     try:
         # Use explicit args to ensure correct coordinate order (Lat, Lon)
-        main_route_points, alternates, duration_osrm, distance_osrm, all_routes_data = get_osrm_route(request.start.lat, request.start.lon, request.destination.lat, request.destination.lon)
+        main_route_points, alternates, duration_osrm, distance_osrm, all_routes_data = await get_osrm_route_async(request.start.lat, request.start.lon, request.destination.lat, request.destination.lon)
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("OSRM routing failed")
         raise HTTPException(status_code=500, detail=f"OSRM Routing Failed: {str(e)}")
     
     if not main_route_points:
@@ -479,7 +801,7 @@ async def analyze_routes(request: RouteRequest, user_preference: str = Query("Fa
     ai_insight_text = "Traffic is building up near Dadar, but don't worry—this is still your fastest option. Drive safe!"
     try:
         # Import dynamically to avoid top-level issues
-        from backend.genai_handler import generate_traffic_insight
+        from backend.genai_handler import generate_traffic_insight_async
         
         # Prepare context for AI
         traffic_context = {
@@ -493,19 +815,22 @@ async def analyze_routes(request: RouteRequest, user_preference: str = Query("Fa
             "top_contributing_factors": "Traffic accumulation near Dadar T.T."
         }
         
-        # Call AI (Sync wrapper for simplicity in this correct version, or await if async)
-        # GenAI handler is synchronous in the viewed file
-        print("[DEBUG] Calling Featherless AI...")
-        generated_text = generate_traffic_insight(traffic_context)
+        # Call AI natively on the event loop
+        logger.debug("Calling Featherless AI...")
+        generated_text = await generate_traffic_insight_async(traffic_context)
         if generated_text and len(generated_text) > 10:
              ai_insight_text = generated_text
-             print("[DEBUG] Used Featherless AI Insight")
+             logger.debug("Used Featherless AI Insight")
     except Exception as e:
-        print(f"[WARNING] AI Generation failed, using fallback: {e}")
+        logger.warning("AI Generation failed, using fallback: %s", e)
 
-    # Mock Bottlenecks
+    # Bottlenecks from the main route's segment annotations (mock when unavailable)
     mock_bottlenecks = []
-    if len(main_route_points) > 20: 
+    try:
+        mock_bottlenecks = _span_bottlenecks(all_routes_data[0]) if all_routes_data else []
+    except Exception as e:
+        logger.warning("Segment analysis failed: %s", e)
+    if not mock_bottlenecks and len(main_route_points) > 20: 
         # Add a bottleneck somewhere in middle
         mid = len(main_route_points) // 2
         mock_bottlenecks.append({
@@ -572,172 +897,6 @@ async def analyze_routes(request: RouteRequest, user_preference: str = Query("Fa
         },
         "congestion": [{"congestion_level": congestion_level}]
     }
-    
-    # 2. GenAI Insight
-    structured_data = {
-        "selected_route_name": selected_route["name"],
-        "selected_eta": selected_route["eta_min"],
-        "selected_congestion": selected_route["congestion_level"],
-        "congestion_uncertainty": "Moderate" if selected_route["confidence"] == "Low" else "Low",
-        
-        "recommended_route_name": best_route["name"],
-        "recommended_eta": best_route["eta_min"],
-        "recommended_congestion": best_route["congestion_level"],
-        "time_savings": round(routes_data[1]["eta_min"] - best_route["eta_min"], 1) if len(routes_data) > 1 else 0,
-        
-        "top_contributing_factors": "High traffic volume detected near Dadar circle" if dest_name == "Dadar" else "Standard peak hour traffic",
-        
-        # Forecast placeholders (Mock for now, or call predict.py forecast)
-        "future_eta_1h": round(best_route["eta_min"] * 1.1, 1),
-        "future_eta_2h": round(best_route["eta_min"] * 1.25, 1)
-    }
-    
-    # Call Featherless (Async to not block, but we await for response)
-    try:
-        print("[DEBUG] Calling Featherless AI...")
-        ai_explanation = await asyncio.to_thread(generate_traffic_insight, structured_data, user_preference)
-        print(f"[DEBUG] Featherless AI Response: {ai_explanation[:100]}...")
-    except Exception as e:
-        print(f"[ERROR] Featherless AI failed: {e}")
-        ai_explanation = None
-    
-    # 3. Hybrid Bottleneck Generation (Spatial + Temporal)
-    bottlenecks = []
-    
-    # A. Spatial Detection: Scan OSRM steps for actual slow segments
-    try:
-        if routes_response and len(routes_response) > 0:
-             main_route = routes_response[0]
-             legs = main_route.get("legs", [])
-             
-             slowest_steps = []
-             
-             for leg in legs:
-                 steps = leg.get("steps", [])
-                 for step in steps:
-                     # Calculate speed (km/h)
-                     dist_m = step.get("distance", 0)
-                     dur_s = step.get("duration", 0)
-                     
-                     if dur_s > 0 and dist_m > 50: # Only consider significant segments
-                         speed_kmh = (dist_m / 1000) / (dur_s / 3600)
-                         
-                         # Thresholds for Bottlenecks
-                         if speed_kmh < 20: # Very Slow
-                             slowest_steps.append({
-                                 "speed": speed_kmh,
-                                 "loc": step.get("maneuver", {}).get("location"), # [lon, lat]
-                                 "name": step.get("name", "Road Segment"),
-                                 "severity": "High" if speed_kmh < 10 else "Moderate"
-                             })
-
-             # Sort by speed (ascending) to find worst bottlenecks
-             slowest_steps.sort(key=lambda x: x["speed"])
-             
-             # Pick top 2 unique locations
-             top_bottlenecks = slowest_steps[:2]
-             
-             if top_bottlenecks:
-                 for b in top_bottlenecks:
-                      if b["loc"]:
-                          bottlenecks.append({
-                             "lat": b["loc"][1],
-                             "lon": b["loc"][0],
-                             "type": "Traffic Jam" if b["severity"] == "High" else "Slowdown",
-                             "severity": b["severity"],
-                             "description": f"Heavy traffic on {b['name']} ({int(b['speed'])} km/h)"
-                         })
-             
-             # FALLBACK: If no explicit slow steps found but route is congestion High
-             elif best_route["congestion_index"] > 0.5 and not bottlenecks:
-                 # Use previous heuristic logic as fallback
-                 main_route_geometry = main_route["geometry"]
-                 mid_idx = int(len(main_route_geometry) * 0.6)
-                 if mid_idx < len(main_route_geometry):
-                     pt = main_route_geometry[mid_idx]
-                     bottlenecks.append({
-                         "lat": pt[1],
-                         "lon": pt[0],
-                         "type": "Slowdown",
-                         "severity": "Moderate",
-                         "description": "General route congestion detected."
-                     })
-                     
-    except Exception as e:
-        print(f"[WARNING] Spatial Bottleneck detection failed: {e}")
-
-    except Exception as e:
-        print(f"[WARNING] Spatial Bottleneck detection failed: {e}")
-
-    # B. AI Temporal Prediction
-    if pred_data.get("forecast"):
-        for f in pred_data["forecast"]:
-             if f.get("is_bottleneck", False):
-                  bottlenecks.append({
-                      "location": f"Forecasted (+{f['step'].replace('+','').replace('h','')}h)",
-                      "lat": best_route["points"][0][1], # Placeholder lat
-                      "lon": best_route["points"][0][0], # Placeholder lon
-                      "congestion_forecast": "Critical",
-                      "eta_minutes": int(float(f['step'].replace('+','').replace('h','')) * 60),
-                      "probability": f['confidence'] / 100.0,
-                      "reason": "AI Predicted Congestion Spike"
-                  })
-
-    # 4. Smart Recommendations (Datathon Feature 3)
-    try:
-        # Fetch Real-Time Events for AI Context
-        from backend.src.scraper import get_city_events
-        from backend.src.smart_recommendations import get_route_viability, suggest_smart_break, optimize_departure_time
-        
-        events = get_city_events("Mumbai")
-        # Handle new structure where 'Details' behaves differently or use 'Name' directly if corrected
-        # In scraper.py we return {Incident:..., Details: {Name:..., Events:[...]}}
-        event_name = events.get("Details", {}).get("Name", "None")
-        
-        # Extract necessary data for recommendations
-        current_congestion = 0 # Default Low
-        if best_route["congestion_level"] == "Medium": current_congestion = 1
-        elif best_route["congestion_level"] == "High": current_congestion = 2
-        
-        # Use Real AI Predictions from Phase 1
-        future_preds = pred_data.get("forecast", [])
-        
-        # Fallback if no forecast available
-        if not future_preds:
-             print("[WARNING] No forecast data found, using heuristic fallback.")
-             future_preds = [
-                 {'time_ahead': 0.5, 'hour': 18, 'level': current_congestion},
-                 {'time_ahead': 1.0, 'hour': 19, 'level': max(0, current_congestion - 1)},
-                 {'time_ahead': 2.0, 'hour': 20, 'level': 0}
-             ]
-
-        # Get Smart Recommendations
-        viability_alert = get_route_viability(current_congestion, future_preds)
-        smart_break = suggest_smart_break(future_preds)
-        optimal_time = optimize_departure_time(current_congestion, future_preds, 17) # Mock 17:00
-
-        structured_data["smart_recommendations"] = {
-            "viability_alert": viability_alert,
-            "smart_break": smart_break,
-            "optimal_departure": optimal_time
-        }
-        
-        # Inject Event into AI Context
-        structured_data["top_contributing_factors"] = f"Event: {event_name}"
-        
-    except Exception as e:
-        print(f"[WARNING] Smart Recommendations/Events failed: {e}")
-        structured_data["smart_recommendations"] = {}
-
-    structured_data["bottlenecks"] = bottlenecks
-
-    return {
-        "routes": routes_data,
-        "best_route_index": 0,
-        "ai_insight": ai_explanation,
-        "analysis_context": structured_data,
-        "congestion": [{"congestion_level": pred_data.get("prediction", {}).get("congestion_level", "Moderate")}]
-    }
 
 def generate_route_briefing(route_context):
     """
@@ -779,11 +938,67 @@ Give practical advice for this specific route."""
         return response.content.strip()
         
     except Exception as e:
-        print(f"[ERROR] Route briefing generation failed: {e}")
+        logger.error("Route briefing generation failed: %s", e)
         return f"Route from {route_context.get('source')} to {route_context.get('destination')} analyzed. Check alerts and reports for details."
 
 
 
+@router.get("/models")
+async def get_model_status():
+    """
+    Report load time and memory footprint of every registered model.
+    """
+    from src.model_registry import registry
+    return {"models": registry.stats()}
+
+@router.get("/inference/stats")
+async def get_inference_stats():
+    """
+    Micro-batching metrics: batch-size distribution and queue wait.
+    """
+    from src.inference_batcher import batcher
+    return batcher.stats()
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Hit/miss counters for the shared context caches.
+    """
+    from src.context_cache import cache_stats
+    return cache_stats()
+
+@router.get("/upstreams/stats")
+async def get_upstream_stats():
+    """
+    Request/failure counters and circuit-breaker state per HTTP upstream.
+    """
+    from src.http_pool import upstream_stats
+    return upstream_stats()
+
+@router.get("/sensors/stats")
+async def get_sensor_stats():
+    """
+    Pooled sensor connections and ring-buffer freshness per location.
+    """
+    from src.sensor_gateway import gateway
+    return gateway.stats()
+
+@router.get("/latency/stats")
+async def get_latency_stats():
+    """
+    Per-stage latency (count, mean, p50/p90/p99, max in ms); /metrics has
+    the same histograms in Prometheus format.
+    """
+    return {"stages": latency_stats()}
+
+@router.get("/pois/stats")
+async def get_poi_stats():
+    """
+    Offline POI index contents and the refresh job's state.
+    """
+    from src.poi_index import poi_refresher
+    return poi_refresher.stats()
+
 @router.get("/locations")
 async def get_locations():
     """
@@ -812,7 +1027,7 @@ async def get_locations():
         return {"locations": get_locations.cache}
         
     except Exception as e:
-        print(f"[ERROR] Fetching locations failed: {e}")
+        logger.error("Fetching locations failed: %s", e)
         return {"locations": ["Bandra", "Andheri", "Dadar"]} # Fallback
 
 # ==========================================
@@ -849,7 +1064,8 @@ async def api_simulate(request: SimulationRequest):
         elif request.scenario == "Accident":
             modifications['volume_multiplier'] = 1.5
             
-        result = simulate_traffic(request.location, "start", "end", modifications)
+        import asyncio
+        result = await asyncio.to_thread(simulate_traffic, request.location, "start", "end", modifications)
         return {"status": "success", "result": result}
     except Exception as e:
         return {"status": "error", "message": str(e)}
@@ -883,7 +1099,8 @@ async def api_community_feed(location: str = "Mumbai", hours: int = 24):
 @router.post("/stations")
 async def api_get_stations(request: RouteRequest):
     """
-    Find Fuel and EV stations along a route.
+    Find Fuel and EV stations (and parking) along a route.
+    Pass the route geometry in `route` to search its corridor.
     """
     try:
         # Use simple geocoding or provided coords
@@ -893,8 +1110,9 @@ async def api_get_stations(request: RouteRequest):
         # We need OSmnx which is heavy, ensure it's imported
         from backend.src.station_locator import get_stations_along_route
         
-        stations = get_stations_along_route(start_coords, dest_coords, radius_km=2.0)
+        stations = await asyncio.to_thread(get_stations_along_route, start_coords, dest_coords,
+                                           radius_km=2.0, route_coords=request.route)
         return {"status": "success", "data": stations}
     except Exception as e:
-        print(f"[ERROR] Station locator failed: {e}")
-        return {"status": "error", "message": str(e), "data": {"fuel_stations": [], "ev_chargers": []}}
+        logger.error("Station locator failed: %s", e)
+        return {"status": "error", "message": str(e), "data": {"fuel_stations": [], "ev_chargers": [], "parking": []}}
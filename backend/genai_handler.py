@@ -1,9 +1,21 @@
+import asyncio
 import os
+import sys
+import time
 import openai
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Shared HTTP layer (backend/src)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from src.http_pool import base_url, get_upstream
+from src.insight_cache import insight_cache, bucket_structured_data, insight_key
+from src.telemetry import span, observe
+from src.log import get_logger
+
+logger = get_logger(__name__)
+
 # Featherless Configuration
 # Featherless Configuration
 def load_llm_config_key():
@@ -25,19 +37,33 @@ def load_llm_config_key():
                     if 'FEATHERLESS_API_KEY' in line and '=' in line:
                         return line.split('=', 1)[1].strip()
     except Exception as e:
-        print(f"[config] Error loading llm_config.env: {e}")
+        logger.warning("Error loading llm_config.env: %s", e)
     return None
 
 FEATHERLESS_API_KEY = os.getenv("FEATHERLESS_API_KEY") or load_llm_config_key()
-FEATHERLESS_BASE_URL = "https://api.featherless.ai/v1"
+FEATHERLESS_BASE_URL = base_url("featherless")
+FEATHERLESS_MODEL = "meta-llama/Meta-Llama-3.1-8B-Instruct"
+FEATHERLESS_TIMEOUT = 15.0
+# Below this much remaining request budget a model call is not started
+INSIGHT_MIN_S = float(os.getenv("INSIGHT_MIN_S", "0.5"))
 
 if not FEATHERLESS_API_KEY:
-    print("[WARNING] FEATHERLESS_API_KEY not found in environment or llm_config.env. Using dummy key.")
+    logger.warning("FEATHERLESS_API_KEY not found in environment or llm_config.env. Using dummy key.")
     FEATHERLESS_API_KEY = "dummy_key_for_no_crash"
 
 client = openai.OpenAI(
     api_key=FEATHERLESS_API_KEY,
-    base_url=FEATHERLESS_BASE_URL
+    base_url=FEATHERLESS_BASE_URL,
+    timeout=FEATHERLESS_TIMEOUT
+)
+
+# Async client for the event loop; retries and circuit breaking are handled
+# by the shared "featherless" upstream instead of the SDK.
+async_client = openai.AsyncOpenAI(
+    api_key=FEATHERLESS_API_KEY,
+    base_url=FEATHERLESS_BASE_URL,
+    timeout=FEATHERLESS_TIMEOUT,
+    max_retries=0
 )
 
 SYSTEM_PROMPT = """
@@ -59,20 +85,8 @@ MODES:
 Focus on being "understood" easily by a driver. Avoid complex jargon.
 """
 
-def generate_traffic_insight(structured_data: dict, user_preference: str = "Fastest route") -> str:
-    """
-    Generates a natural language explanation for the traffic prediction.
-    
-    Args:
-        structured_data: Dict containing predictions (times, congestion, uncertainty, etc.)
-        user_preference: String indicating user priority (e.g., "Fastest", "Safe")
-        
-    Returns:
-        String explanation.
-    """
-    
-    # Construct User Prompt from Data
-    user_prompt = f"""
+def _build_user_prompt(structured_data: dict, user_preference: str) -> str:
+    return f"""
     CONTEXT DATA:
     User Preference: {user_preference}
     
@@ -94,30 +108,154 @@ def generate_traffic_insight(structured_data: dict, user_preference: str = "Fast
     
     Task: Provide a concise recommendation and explanation based on this data.
     """
+
+def _chat_request(user_prompt: str, stream: bool = False) -> dict:
+    return dict(
+        model=FEATHERLESS_MODEL,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ],
+        temperature=0.7,
+        max_tokens=250,
+        stream=stream,
+        extra_body={
+            "transforms": ["middle-out"]
+        }
+    )
+
+def _fallback_insight(structured_data: dict) -> str:
+    return f"Based on current analysis, the recommended route offers a savings of {structured_data.get('time_savings', 0)} minutes despite moderate congestion. Traffic is expected to strictly follow the predicted trend. (Source: Fallback)"
+
+def _complete(user_prompt: str, timeout: float = FEATHERLESS_TIMEOUT) -> str:
+    # Raises on failure so the insight cache never stores a fallback
+    if "dummy" in FEATHERLESS_API_KEY:
+        logger.debug("Using Dummy Key - Returning Fallback Response")
+        raise Exception("Using Dummy Key")
+    logger.debug("Sending request to Featherless API... (Key: %s***)", FEATHERLESS_API_KEY[:4])
+    with span("llm"):
+        response = client.with_options(timeout=timeout).chat.completions.create(**_chat_request(user_prompt))
+    content = response.choices[0].message.content.strip()
+    logger.debug("Featherless API Success! Response length: %s", len(content))
+    return content
+
+async def _complete_async(user_prompt: str) -> str:
+    if "dummy" in FEATHERLESS_API_KEY:
+        logger.debug("Using Dummy Key - Returning Fallback Response")
+        raise Exception("Using Dummy Key")
+    with span("llm"):
+        response = await get_upstream("featherless").call(
+            lambda: async_client.chat.completions.create(**_chat_request(user_prompt))
+        )
+    content = response.choices[0].message.content.strip()
+    logger.debug("Featherless API Success! Response length: %s", len(content))
+    return content
+
+def _out_of_time(key: str, structured_data: dict) -> str:
+    # Deadline fallback: the last insight for this situation, else the template
+    return insight_cache.last_value(key) or _fallback_insight(structured_data)
+
+def generate_traffic_insight(structured_data: dict, user_preference: str = "Fastest route", deadline=None) -> str:
+    """
+    Generates a natural language explanation for the traffic prediction.
+    Answers are cached per bucketed traffic situation (see insight_cache).
+    
+    Args:
+        structured_data: Dict containing predictions (times, congestion, uncertainty, etc.)
+        user_preference: String indicating user priority (e.g., "Fastest", "Safe")
+        deadline: Optional request Deadline; caps the model call's timeout
+        
+    Returns:
+        String explanation.
+    """
+    
+    # Construct User Prompt from the bucketed data the cache is keyed on
+    bucketed = bucket_structured_data(structured_data)
+    user_prompt = _build_user_prompt(bucketed, user_preference)
+    key = insight_key(bucketed, user_preference)
     
+    try:
+        if deadline is None:
+            return insight_cache.get_or_generate(key, lambda: _complete(user_prompt))
+        if deadline.timeout() <= INSIGHT_MIN_S:
+            deadline.degrade("insight", "skipped")
+            return _out_of_time(key, structured_data)
+        with deadline.stage("insight"):
+            return insight_cache.get_or_generate(key, lambda: _complete(user_prompt, deadline.timeout(FEATHERLESS_TIMEOUT)))
+    except Exception as e:
+        logger.error("Insight generation failed: %s", e)
+        return _fallback_insight(structured_data)
+
+async def generate_traffic_insight_async(structured_data: dict, user_preference: str = "Fastest route", deadline=None) -> str:
+    """
+    Event-loop variant of generate_traffic_insight. Goes through the shared
+    "featherless" upstream (concurrency limit + circuit breaker) and the
+    same insight cache. With a Deadline, a call still running when it
+    expires finishes in the background and fills the cache.
+    """
+    bucketed = bucket_structured_data(structured_data)
+    user_prompt = _build_user_prompt(bucketed, user_preference)
+    key = insight_key(bucketed, user_preference)
+    
+    try:
+        load = insight_cache.get_or_generate_async(key, lambda: _complete_async(user_prompt))
+        if deadline is None:
+            return await load
+        return await deadline.run("insight", load, fallback=lambda: _out_of_time(key, structured_data), min_s=INSIGHT_MIN_S)
+    except Exception as e:
+        logger.error("Insight generation failed: %s", e)
+        return _fallback_insight(structured_data)
+
+async def stream_traffic_insight(structured_data: dict, user_preference: str = "Fastest route", deadline=None):
+    """
+    generate_traffic_insight as an async iterator of text chunks, streamed
+    from the model as they are generated. A cached insight is yielded as one
+    chunk; a completed stream is cached. Yields the fallback text when the
+    model cannot be reached before the first token. With a Deadline, the
+    stream is cut off (and not cached) when it expires.
+    """
+    bucketed = bucket_structured_data(structured_data)
+    key = insight_key(bucketed, user_preference)
+    cached = await asyncio.to_thread(insight_cache.peek, key)
+    if cached is not None:
+        yield cached
+        return
+
     try:
         if "dummy" in FEATHERLESS_API_KEY:
-            print("[GENAI DEBUG] Using Dummy Key - Returning Fallback Response")
             raise Exception("Using Dummy Key")
-
-        print(f"[GENAI DEBUG] Sending request to Featherless API... (Key: {FEATHERLESS_API_KEY[:4]}***)")
-        
-        response = client.chat.completions.create(
-            model="meta-llama/Meta-Llama-3.1-8B-Instruct",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.7,
-            max_tokens=250,
-            extra_body={
-                "transforms": ["middle-out"]
-            }
+        user_prompt = _build_user_prompt(bucketed, user_preference)
+        connect = get_upstream("featherless").call(
+            lambda: async_client.chat.completions.create(**_chat_request(user_prompt, stream=True))
         )
-        content = response.choices[0].message.content.strip()
-        print(f"[GENAI DEBUG] Featherless API Success! Response length: {len(content)}")
-        return content
-        
+        if deadline is None:
+            stream = await connect
+        else:
+            # Not shielded: an abandoned stream would hold its connection
+            stream = await deadline.run("insight_connect", connect, min_s=INSIGHT_MIN_S, shield=False)
     except Exception as e:
-        print(f"[GENAI ERROR] {e}")
-        return f"Based on current analysis, the recommended route offers a savings of {structured_data.get('time_savings', 0)} minutes despite moderate congestion. Traffic is expected to strictly follow the predicted trend. (Source: Fallback)"
+        logger.error("Insight generation failed: %s", e)
+        stream = None
+    if stream is None:
+        yield _out_of_time(key, structured_data)
+        return
+
+    parts = []
+    started = time.perf_counter()
+    try:
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                if not parts:
+                    observe("llm_first_token", time.perf_counter() - started)
+                parts.append(delta)
+                yield delta
+            if deadline is not None and deadline.expired:
+                deadline.degrade("insight", "truncated")
+                return
+    finally:
+        observe("llm_stream", time.perf_counter() - started)
+        await stream.close()
+    content = "".join(parts).strip()
+    if content:
+        await asyncio.to_thread(insight_cache.put, key, content)
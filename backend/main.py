@@ -1,6 +1,8 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 import uvicorn
+import asyncio
 import os
 import sys
 from pathlib import Path
@@ -39,12 +41,78 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Binds X-Request-ID for every log record written while serving a request
+from src.log import RequestIdMiddleware, get_logger, log_stats
+app.add_middleware(RequestIdMiddleware)
+# Added last, so it is outermost: Server-Timing and request latency cover everything below
+from src.telemetry import ServerTimingMiddleware, render_prometheus
+app.add_middleware(ServerTimingMiddleware)
+
+logger = get_logger(__name__)
+
 app.include_router(api_router, prefix="/api")
 
+@app.on_event("startup")
+async def startup():
+    """Warm process-wide state so requests never pay deserialization."""
+    from src.model_registry import registry
+    try:
+        import ml_integration  # registers the route RF models
+    except Exception as e:
+        logger.warning("ml_integration unavailable: %s", e)
+    from src.poi_index import poi_refresher  # registers the POI index
+    registry.preload()
+
+    # Builds the POI index if missing, then rebuilds it periodically
+    poi_refresher.start()
+
+    from src.route_cache import route_cache
+    restored = route_cache.load()
+    if restored:
+        logger.info("Restored %s cached routes", restored)
+
+    # Sensor handshakes happen once here, not per request
+    from src.sensor_gateway import gateway, STARTUP_LOCATIONS
+    await asyncio.to_thread(gateway.start, STARTUP_LOCATIONS)
+
+    # Memory-map prebuilt road network stores (ROAD_NETWORK_PLACES, ';'-separated)
+    from src.osm_loader import warm_stores
+    places = [p.strip() for p in os.getenv("ROAD_NETWORK_PLACES", "Mumbai, India").split(";") if p.strip()]
+    mapped = await asyncio.to_thread(warm_stores, places)
+    if mapped:
+        logger.info("Road network stores mapped: %s", mapped)
+
+@app.on_event("shutdown")
+async def shutdown():
+    from src.http_pool import aclose_all
+    await aclose_all()
+
+    from src.route_cache import route_cache
+    route_cache.save()
+
+    from src.sensor_gateway import gateway
+    gateway.stop()
+
+    from src.poi_index import poi_refresher
+    poi_refresher.stop()
+
+    from src.insight_cache import insight_cache
+    insight_cache.close()
+
 @app.get("/")
 async def root():
     return {"message": "Traffic Intelligence API is running. Visit /docs for Swagger UI."}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Stage and route latency histograms (and dropped log records) in Prometheus text format."""
+    dropped = (
+        "# HELP log_records_dropped_total Log records dropped because the log queue was full.\n"
+        "# TYPE log_records_dropped_total counter\n"
+        f"log_records_dropped_total {log_stats()['dropped']}\n"
+    )
+    return PlainTextResponse(render_prometheus() + dropped, media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 async def health_check():
     return {"status": "ok", "message": "Backend Online"}
@@ -1,4 +1,5 @@
 import os
+import sys
 import joblib
 import pandas as pd
 import numpy as np
@@ -8,31 +9,39 @@ from datetime import datetime
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MODELS_DIR = os.path.join(BASE_DIR, 'Datathon_routes', 'models')
 
-# Global Cache
-_MODELS = {}
+# Shared model registry (backend/src)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from src.model_registry import registry
+from src.log import get_logger
+
+logger = get_logger(__name__)
+
+_MODEL_FILES = {
+    'rf_time': 'rf_actual_travel_time_min.pkl',
+    'rf_congestion': 'rf_congestion_index.pkl',
+    'enc_origin': 'origin_encoder.pkl',
+    'enc_dest': 'destination_encoder.pkl',
+    'enc_route': 'route_id_encoder.pkl'
+}
+
+def _load_route_models(*paths):
+    return {key: joblib.load(path) for key, path in zip(_MODEL_FILES, paths)}
+
+registry.register(
+    "route_rf",
+    [os.path.join(MODELS_DIR, f) for f in _MODEL_FILES.values()],
+    _load_route_models
+)
 
 def load_models():
-    """Load ML models and encoders into memory."""
-    global _MODELS
-    if _MODELS:
-        return
-    
-    try:
-        print("[INFO] Loading ML Models...")
-        _MODELS['rf_time'] = joblib.load(os.path.join(MODELS_DIR, 'rf_actual_travel_time_min.pkl'))
-        _MODELS['rf_congestion'] = joblib.load(os.path.join(MODELS_DIR, 'rf_congestion_index.pkl'))
-        _MODELS['enc_origin'] = joblib.load(os.path.join(MODELS_DIR, 'origin_encoder.pkl'))
-        _MODELS['enc_dest'] = joblib.load(os.path.join(MODELS_DIR, 'destination_encoder.pkl'))
-        _MODELS['enc_route'] = joblib.load(os.path.join(MODELS_DIR, 'route_id_encoder.pkl'))
-        print("[INFO] Models Loaded Successfully.")
-    except Exception as e:
-        print(f"[ERROR] Failed to load models: {e}")
+    """Return the route ML models and encoders from the shared registry."""
+    return registry.get("route_rf") or {}
 
 def predict_route_metrics(source, destination, hour=None, day=None):
     """
     Predict Travel Time and Congestion Index for a route.
     """
-    load_models()
+    _MODELS = load_models()
     
     if 'rf_time' not in _MODELS:
         return None
@@ -123,7 +132,7 @@ def predict_route_metrics(source, destination, hour=None, day=None):
             # Likely feature mismatch.
             # In a real scenario, we'd inspect model.feature_names_in_
             # For now, return Mock/Fallback if mismatch
-            print(f"[ML WARNING] Feature mismatch: {ve}")
+            logger.warning("Feature mismatch: %s", ve)
             return {
                 "travel_time_min": 45.0,
                 "congestion_index": 0.6,
@@ -136,6 +145,6 @@ def predict_route_metrics(source, destination, hour=None, day=None):
             "confidence": "High"
         }
         
-    except Exception as e:
-        print(f"[ML ERROR] Prediction failed: {e}")
+    except Exception:
+        logger.exception("Prediction failed")
         return None
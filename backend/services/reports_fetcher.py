@@ -6,6 +6,10 @@ NOTE: Requires firebase_admin_config.json in backend folder
 import os
 from pathlib import Path
 
+from src.log import get_logger
+
+logger = get_logger(__name__)
+
 try:
     import firebase_admin
     from firebase_admin import credentials, firestore
@@ -19,21 +23,21 @@ try:
         if config_path.exists():
             cred = credentials.Certificate(str(config_path))
             firebase_admin.initialize_app(cred)
-            print("[INFO] Firebase Admin initialized successfully")
+            logger.info("Firebase Admin initialized successfully")
         else:
-            print(f"[WARNING] Firebase Admin config not found at {config_path}")
-            print("[INFO] Community reports will not be available")
+            logger.warning("Firebase Admin config not found at %s", config_path)
+            logger.info("Community reports will not be available")
             firebase_admin = None
     
     db = firestore.client() if firebase_admin._apps else None
     
 except Exception as e:
-    print(f"[WARNING] Failed to initialize Firebase Admin: {e}")
+    logger.warning("Failed to initialize Firebase Admin: %s", e)
     firebase_admin = None
     db = None
 
 
-def fetch_route_reports(source, destination, hours=24, min_score=0, limit=10):
+def fetch_route_reports(source, destination, hours=24, min_score=0, limit=10, deadline=None):
     """
     Fetch community reports relevant to a route
     
@@ -43,12 +47,17 @@ def fetch_route_reports(source, destination, hours=24, min_score=0, limit=10):
         hours: Time window in hours (default 24)
         min_score: Minimum netScore to filter (default 0)
         limit: Maximum number of reports (default 10)
+        deadline: Optional Deadline; stops reading (returning what was read)
+                  once it runs out
     
     Returns:
         List of report dictionaries
     """
     if not db:
-        print("[INFO] Firestore not available, returning empty reports")
+        logger.info("Firestore not available, returning empty reports")
+        return []
+    if deadline is not None and deadline.expired:
+        deadline.degrade("reports", "skipped")
         return []
     
     try:
@@ -64,6 +73,9 @@ def fetch_route_reports(source, destination, hours=24, min_score=0, limit=10):
         
         reports = []
         for doc in docs:
+            if deadline is not None and deadline.expired:
+                deadline.degrade("reports", "partial")
+                break
             data = doc.to_dict()
             
             # Check timestamp
@@ -103,7 +115,7 @@ def fetch_route_reports(source, destination, hours=24, min_score=0, limit=10):
         return reports[:limit]
         
     except Exception as e:
-        print(f"[ERROR] Failed to fetch reports: {e}")
+        logger.error("Failed to fetch reports: %s", e)
         return []
 
 
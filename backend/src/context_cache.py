@@ -0,0 +1,230 @@
+"""
+Context Cache
+Bounded LRU + TTL caches for live-context sources (weather, news, ...).
+
+- Fresh entries are served directly.
+- Entries past their TTL but inside the stale window are served immediately
+  while a background thread refreshes them (stale-while-revalidate).
+- Concurrent misses for the same key share one upstream fetch (single-flight).
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# Registry of named caches so stats can be reported in one place
+_CACHES = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+class TTLCache:
+    """
+    Args:
+        name: Source name used in stats (e.g. "weather")
+        maxsize: Maximum number of keys kept (least recently used evicted first)
+        ttl: Seconds an entry is fresh
+        stale_ttl: Extra seconds a stale entry may be served while refreshing
+    """
+    def __init__(self, name, maxsize=128, ttl=300, stale_ttl=0):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._data = OrderedDict()  # key -> (value, stored_at)
+        self._inflight = {}         # key -> Future
+        self._refresh_tasks = set() # background async refreshes (kept referenced)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.errors = 0
+        self.evictions = 0
+
+    def get_or_load(self, key, loader):
+        """
+        Return the cached value for `key`, calling `loader()` on a miss.
+        Exceptions from `loader` propagate to every caller waiting on that fetch
+        and nothing is cached.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                age = now - stored_at
+                if age < self.ttl:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                if age < self.ttl + self.stale_ttl:
+                    self._data.move_to_end(key)
+                    self.stale_hits += 1
+                    if key not in self._inflight:
+                        fut = Future()
+                        self._inflight[key] = fut
+                        self.refreshes += 1
+                        threading.Thread(target=self._fill, args=(key, loader, fut), daemon=True).start()
+                    return value
+
+            fut = self._inflight.get(key)
+            leader = fut is None
+            if leader:
+                fut = Future()
+                self._inflight[key] = fut
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if leader:
+            self._fill(key, loader, fut)
+        return fut.result()
+
+    async def get_or_load_async(self, key, loader):
+        """
+        Async variant of get_or_load: `loader` is a coroutine function and
+        runs on the event loop. Shares in-flight fetches with sync callers.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                age = now - stored_at
+                if age < self.ttl:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                if age < self.ttl + self.stale_ttl:
+                    self._data.move_to_end(key)
+                    self.stale_hits += 1
+                    if key not in self._inflight:
+                        fut = Future()
+                        self._inflight[key] = fut
+                        self.refreshes += 1
+                        task = asyncio.get_running_loop().create_task(self._fill_async(key, loader, fut))
+                        self._refresh_tasks.add(task)
+                        task.add_done_callback(self._refresh_tasks.discard)
+                    return value
+
+            fut = self._inflight.get(key)
+            leader = fut is None
+            if leader:
+                fut = Future()
+                self._inflight[key] = fut
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if leader:
+            await self._fill_async(key, loader, fut)
+        return await asyncio.wrap_future(fut)
+
+    async def _fill_async(self, key, loader, fut):
+        try:
+            value = await loader()
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+                self._inflight.pop(key, None)
+            fut.set_exception(e)
+            return
+        except BaseException:
+            # Leader cancelled: release the waiters rather than leave them on
+            # a future nobody will resolve; the next caller loads afresh
+            with self._lock:
+                self._inflight.pop(key, None)
+            fut.cancel()
+            raise
+        self._store(key, value, fut)
+
+    def _store(self, key, value, fut, age=0.0):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() - age)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+            self._inflight.pop(key, None)
+        fut.set_result(value)
+
+    def _fill(self, key, loader, fut):
+        try:
+            value = loader()
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+                self._inflight.pop(key, None)
+            fut.set_exception(e)
+            return
+        self._store(key, value, fut)
+
+    def put(self, key, value, age=0.0):
+        """Store `value` for `key` directly, as if loaded `age` seconds ago."""
+        with self._lock:
+            self._data[key] = (value, time.monotonic() - age)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def last_value(self, key, default=None):
+        """
+        The most recent value stored for `key` whatever its age (for
+        fallbacks when a fresh load cannot be waited for), else `default`.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+        return entry[0] if entry is not None else default
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything when key is None."""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_s": self.ttl,
+                "stale_ttl_s": self.stale_ttl,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "background_refreshes": self.refreshes,
+                "errors": self.errors,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.stale_hits + self.coalesced) / lookups, 4) if lookups else 0.0
+            }
+
+
+def get_cache(name, maxsize=128, ttl=300, stale_ttl=0):
+    """Return the named cache, creating it with the given settings on first use."""
+    with _REGISTRY_LOCK:
+        cache = _CACHES.get(name)
+        if cache is None:
+            cache = TTLCache(name, maxsize=maxsize, ttl=ttl, stale_ttl=stale_ttl)
+            _CACHES[name] = cache
+        return cache
+
+
+def register_cache(name, cache):
+    """Add a cache with its own storage to the shared stats report."""
+    with _REGISTRY_LOCK:
+        _CACHES[name] = cache
+    return cache
+
+
+def cache_stats():
+    """Hit/miss counters for every cache, keyed by name."""
+    with _REGISTRY_LOCK:
+        caches = dict(_CACHES)
+    return {name: cache.stats() for name, cache in caches.items()}
@@ -1,7 +1,25 @@
+import hashlib
+import json
+import joblib
+import numpy as np
 import pandas as pd
 import xml.etree.ElementTree as ET
 import os
 
+try:
+    from lxml import etree as _lxml_etree
+except ImportError:
+    _lxml_etree = None
+
+try:
+    from src.categorical import bin_congestion_index, map_congestion
+    from src.log import get_logger
+except ImportError:
+    from categorical import bin_congestion_index, map_congestion
+    from log import get_logger
+
+logger = get_logger(__name__)
+
 def load_traffic_data(file_path):
     """
     Loads traffic data from XML or CSV.
@@ -12,9 +30,37 @@ def load_traffic_data(file_path):
     
     if file_path.endswith('.csv'):
         return _parse_csv_to_df(file_path)
+    elif file_path.endswith(('.parquet', '.feather', '.arrow')):
+        return _load_columnar(file_path)
     else:
         return parse_xml_to_df(file_path)
 
+# Column renames per source dataset (matched by file name).
+# Part of the dataset cache key: editing a map invalidates cached frames.
+_SCHEMA_MAPS = {
+    "all_features": {
+        'Traffic_Volume': 'VehicleCount', 
+        'Traffic_Speed': 'Speed',
+        'Weather_Conditions': 'WeatherCondition',
+        'Congestion_Level': 'CongestionLevel',
+        'lat': 'Latitude', 'long': 'Longitude'
+    },
+    "smart_mobility": {
+        'Vehicle_Count': 'VehicleCount',
+        'Vehicle_Speed': 'Speed',
+        'Congestion_Level': 'CongestionLevel'
+    },
+    "mumbai_multi_route": {
+        'traffic_volume': 'VehicleCount',
+        'avg_speed': 'Speed',
+        'hour': 'Hour',
+        'day_of_week': 'DayOfWeek',
+        'is_weekend': 'IsWeekend',
+        'timestamp': 'Timestamp'
+        # origin, destination, congestion_index kept as is
+    }
+}
+
 def normalize_schema(df, source_name):
     """
     Normalizes column names to a canonical format based on the source dataset.
@@ -27,39 +73,10 @@ def normalize_schema(df, source_name):
     
     # Normalize headers to PascalCase or standard keys
     rename_map = {}
-    
-    if "all_features" in source_name:
-        # Check typical columns
-        rename_map = {
-            'Traffic_Volume': 'VehicleCount', 
-            'Traffic_Speed': 'Speed',
-            'Weather_Conditions': 'WeatherCondition',
-            'Congestion_Level': 'CongestionLevel',
-            'lat': 'Latitude', 'long': 'Longitude'
-        }
-    elif "smart_mobility" in source_name:
-        rename_map = {
-            'Vehicle_Count': 'VehicleCount',
-            'Traffic_Speed_kmh': 'Speed',
-            'Weather_Condition': 'WeatherCondition',
-            'Traffic_Condition': 'CongestionLevel',
-            'Traffic_Light_State': 'TrafficSignalStatus'
-        }
-        rename_map = {
-            'Vehicle_Count': 'VehicleCount',
-            'Vehicle_Speed': 'Speed',
-            'Congestion_Level': 'CongestionLevel'
-        }
-    elif "mumbai_multi_route" in source_name:
-        rename_map = {
-            'traffic_volume': 'VehicleCount',
-            'avg_speed': 'Speed',
-            'hour': 'Hour',
-            'day_of_week': 'DayOfWeek',
-            'is_weekend': 'IsWeekend',
-            'timestamp': 'Timestamp'
-            # origin, destination, congestion_index kept as is
-        }
+    for marker, mapping in _SCHEMA_MAPS.items():
+        if marker in source_name:
+            rename_map = mapping
+            break
     
     # Apply renaming (flexible lookup)
     # We invert the map to check if flexible matching is needed, but for now specific map
@@ -72,16 +89,127 @@ def normalize_schema(df, source_name):
         
     return df
 
-def unify_datasets(file_paths):
+# Bump when unify_datasets output changes in a way the fingerprint can't see
+_DATASET_CACHE_VERSION = 2
+
+def _dataset_fingerprint(file_paths, hash_contents=False):
+    """
+    Cache key for a unified dataset: source file identity (size + mtime, or a
+    content hash) plus the schema maps and cache version.
+    """
+    h = hashlib.sha1()
+    h.update(json.dumps({"version": _DATASET_CACHE_VERSION, "schema": _SCHEMA_MAPS}, sort_keys=True).encode())
+    for path in file_paths:
+        h.update(os.path.abspath(path).encode())
+        if not os.path.exists(path):
+            h.update(b"missing")
+            continue
+        st = os.stat(path)
+        h.update(f"{st.st_size}".encode())
+        if hash_contents:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    h.update(block)
+        else:
+            h.update(f"{st.st_mtime_ns}".encode())
+    return h.hexdigest()
+
+def _downcast(df, max_category_ratio=0.5):
+    """
+    Shrinks a frame for storage: float64 -> float32 where every value
+    survives the round trip, ints to the smallest width, low-cardinality
+    strings to categories. Lossless, so cached loads match fresh builds.
+    """
+    df = df.copy()
+    for col in df.columns:
+        kind = df[col].dtype.kind
+        if kind == 'f':
+            narrow = df[col].astype(np.float32)
+            if np.array_equal(narrow.to_numpy(np.float64), df[col].to_numpy(np.float64), equal_nan=True):
+                df[col] = narrow
+        elif kind in 'iu':
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+        elif kind == 'O' and pd.api.types.infer_dtype(df[col], skipna=True) == 'string':
+            if df[col].nunique(dropna=True) <= max_category_ratio * len(df):
+                df[col] = df[col].astype('category')
+    return df
+
+def _dataset_cache_paths(cache_dir, key, fmt):
+    base = os.path.join(cache_dir, f"unified_{key}")
+    return f"{base}.{fmt}", f"{base}.encoders.pkl"
+
+def _read_dataset_cache(cache_dir, key, fmt):
+    data_path, enc_path = _dataset_cache_paths(cache_dir, key, fmt)
+    if not (os.path.exists(data_path) and os.path.exists(enc_path)):
+        return None
+    try:
+        if fmt == 'feather':
+            # Uncompressed Feather is memory-mapped rather than read into RAM
+            from pyarrow import feather
+            df = feather.read_table(data_path, memory_map=True).to_pandas()
+        else:
+            df = pd.read_parquet(data_path)
+        meta = joblib.load(enc_path)
+    except Exception as e:
+        logger.warning("Could not read dataset cache %s: %s", data_path, e)
+        return None
+    # Storage dtypes (narrow ints, categories) back to the ones the frame
+    # was built with, so cached and fresh loads are interchangeable
+    for col, dtype in meta["dtypes"].items():
+        if col in df.columns and df[col].dtype != dtype:
+            df[col] = df[col].astype(dtype)
+    return df, meta["encoders"]
+
+def _write_dataset_cache(cache_dir, key, fmt, df, encoders):
+    data_path, enc_path = _dataset_cache_paths(cache_dir, key, fmt)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        stored = _downcast(df)
+        tmp_path = f"{data_path}.tmp"
+        if fmt == 'feather':
+            stored.to_feather(tmp_path, compression='uncompressed')
+        else:
+            stored.to_parquet(tmp_path, index=False)
+        joblib.dump({"encoders": encoders, "dtypes": df.dtypes.to_dict()}, enc_path)
+        os.replace(tmp_path, data_path)
+    except Exception as e:
+        logger.warning("Could not write dataset cache (%s); continuing without it.", e)
+
+def unify_datasets(file_paths, cache_dir=None, use_cache=True, hash_contents=False):
     """
     Loads and unifies multiple CSV datasets into a single DataFrame.
+
+    The result is materialized to a columnar cache (Feather by default,
+    Parquet with DATASET_CACHE_FORMAT=parquet) keyed on the source files and
+    schema maps, so repeat loads skip CSV parsing and encoding. Set
+    DATASET_CACHE=0 or use_cache=False to bypass it. Needs pyarrow; without
+    it the datasets are always rebuilt.
     """
+    use_cache = use_cache and os.getenv("DATASET_CACHE", "1") != "0"
+    if not use_cache or not file_paths:
+        return _unify_datasets(file_paths)
+
+    fmt = os.getenv("DATASET_CACHE_FORMAT", "feather")
+    cache_dir = cache_dir or os.getenv("DATASET_CACHE_DIR") or os.path.join(
+        os.path.dirname(os.path.abspath(file_paths[0])), ".dataset_cache")
+    key = _dataset_fingerprint(file_paths, hash_contents=hash_contents)
+
+    cached = _read_dataset_cache(cache_dir, key, fmt)
+    if cached is not None:
+        logger.info("Loaded unified dataset from cache (%s, %s rows)", key[:12], len(cached[0]))
+        return cached
+
+    unified_df, encoders = _unify_datasets(file_paths)
+    _write_dataset_cache(cache_dir, key, fmt, unified_df, encoders)
+    return unified_df, encoders
+
+def _unify_datasets(file_paths):
     dfs = []
-    print(f"Unifying {len(file_paths)} datasets...")
+    logger.info("Unifying %s datasets...", len(file_paths))
     
     for path in file_paths:
         if not os.path.exists(path):
-            print(f"Warning: File not found {path}")
+            logger.warning("File not found %s", path)
             continue
             
         try:
@@ -93,7 +221,7 @@ def unify_datasets(file_paths):
             
             dfs.append(df)
         except Exception as e:
-            print(f"Error loading {path}: {e}")
+            logger.error("Error loading %s: %s", path, e)
 
     if not dfs:
         raise ValueError("No datasets loaded.")
@@ -102,26 +230,15 @@ def unify_datasets(file_paths):
     
     # Handle CongestionLevel Unification
     if 'congestion_index' in unified_df.columns and 'CongestionLevel' not in unified_df.columns:
-        print("   [INFO] Auto-Binning 'congestion_index' to create Target Variable...")
+        logger.info("Auto-Binning 'congestion_index' to create Target Variable...")
         try:
              unified_df['CongestionLevel'] = pd.qcut(unified_df['congestion_index'], q=3, labels=[0, 1, 2]).astype(int)
         except:
-             unified_df['CongestionLevel'] = unified_df['congestion_index'].apply(lambda x: 2 if x > 1.5 else (1 if x > 1.0 else 0))
+             unified_df['CongestionLevel'] = bin_congestion_index(unified_df['congestion_index'])
     
     # Map 'Fast', 'Normal', 'Slow', 'congestion', etc. to 0, 1, 2
-    def map_congestion(val):
-        if pd.isna(val): return -1
-        # If already numeric, return it
-        if isinstance(val, (int, float)): return int(val)
-        
-        val = str(val).lower()
-        if val in ['0', 'low', 'fast', 'free flow']: return 0
-        if val in ['1', 'medium', 'normal', 'moderate']: return 1
-        if val in ['2', 'high', 'slow', 'heavy', 'congestion']: return 2
-        return 0 
-        
     if 'CongestionLevel' in unified_df.columns:
-        unified_df['CongestionLevel'] = unified_df['CongestionLevel'].apply(map_congestion)
+        unified_df['CongestionLevel'] = map_congestion(unified_df['CongestionLevel'])
         
     # Multi-Route Encoding
     encoders = {}
@@ -144,7 +261,7 @@ def unify_datasets(file_paths):
     return unified_df, encoders
 
 def _parse_csv_to_df(csv_path):
-    print(f"Parsing CSV from {csv_path}...")
+    logger.info("Parsing CSV from %s...", csv_path)
     df = pd.read_csv(csv_path)
     
     # Rename columns to match the XML schema (PascalCase) used in preprocessing
@@ -171,121 +288,301 @@ def _parse_csv_to_df(csv_path):
     
     return df
 
-def parse_xml_to_df(xml_file_path):
+# Node field layout: (tag, column, kind). Kinds: float, int, str, bool
+_XML_NODE_FIELDS = [
+    ('Location', 'Location', 'str'),
+    ('RoadType', 'RoadType', 'str'),
+    ('Lanes', 'Lanes', 'int'),
+    ('SpeedLimit', 'SpeedLimit', 'float'),
+]
+
+# Record field layout: (section, tag, column, kind)
+_XML_RECORD_FIELDS = [
+    ('Traffic', 'TrafficVolume', 'TrafficVolume', 'float'),
+    ('Traffic', 'TrafficSpeed', 'TrafficSpeed', 'float'),
+    ('Traffic', 'TrafficDensity', 'TrafficDensity', 'float'),
+    ('Traffic', 'VehicleCount', 'VehicleCount', 'int'),
+    ('Traffic', 'VehicleSpeed', 'VehicleSpeed', 'float'),
+    ('Traffic', 'RoadOccupancy', 'RoadOccupancy', 'float'),
+    ('Traffic', 'TravelTime', 'TravelTime', 'float'),
+    ('Temporal', 'Hour', 'Hour', 'int'),
+    ('Temporal', 'DayOfWeek', 'DayOfWeek', 'str'),
+    ('Temporal', 'PeakType', 'PeakType', 'str'),
+    ('Infrastructure', 'RoadLength', 'RoadLength', 'float'),
+    ('Infrastructure', 'NumberOfLanes', 'NumberOfLanes', 'int'),
+    ('Infrastructure', 'IntersectionPresent', 'IntersectionPresent', 'bool'),
+    ('Infrastructure', 'TrafficSignalCount', 'TrafficSignalCount', 'int'),
+    ('Infrastructure', 'SignalPhaseDuration', 'SignalPhaseDuration', 'int'),
+    ('Weather', 'Condition', 'Condition', 'str'),
+    ('Weather', 'EmissionLevel', 'EmissionLevel', 'float'),
+    ('Weather', 'EnergyConsumption', 'EnergyConsumption', 'float'),
+    ('Events', 'Incident', 'Incident', 'str'),
+    ('Events', 'AccidentCount', 'AccidentCount', 'int'),
+    ('SmartMobility', 'GPSUtilization', 'GPSUtilization', 'float'),
+    ('SmartMobility', 'PublicTransportActive', 'PublicTransportActive', 'bool'),
+    ('SmartMobility', 'RideSharingDemand', 'RideSharingDemand', 'int'),
+    ('SmartMobility', 'ParkingAvailability', 'ParkingAvailability', 'int'),
+    ('SmartMobility', 'SentimentScore', 'SentimentScore', 'float'),
+    ('GraphContext', 'PreviousTimesteps', 'PreviousTimesteps', 'int'),
+    ('GraphContext', 'ConnectedNodes', 'ConnectedNodes', 'str'),
+    ('GraphContext', 'EdgeWeight', 'EdgeWeight', 'float'),
+    ('Target', 'CongestionLevel', 'CongestionLevel', 'str'),
+    ('Target', 'DelayReduction', 'DelayReduction', 'float'),
+    ('Target', 'OptimalRoute', 'OptimalRoute', 'str'),
+]
+
+# Column order of the returned frame
+_XML_COLUMNS = (['NodeID'] + [c for _, c, _ in _XML_NODE_FIELDS] + ['Timestamp', 'Split']
+                + [c for _, _, c, _ in _XML_RECORD_FIELDS])
+
+
+_XML_KINDS = {'NodeID': 'str', 'Timestamp': 'str', 'Split': 'str'}
+_XML_KINDS.update({c: k for _, c, k in _XML_NODE_FIELDS})
+_XML_KINDS.update({c: k for _, _, c, k in _XML_RECORD_FIELDS})
+
+
+def _numeric(raw):
+    # Element text -> float64; missing -> NaN. Malformed text (rare) falls
+    # back to the slower coercing parser.
+    present = raw != None  # noqa: E711 (elementwise)
+    out = np.full(len(raw), np.nan)
+    try:
+        out[present] = raw[present].astype(np.float64)
+    except (TypeError, ValueError):
+        out = pd.to_numeric(raw, errors='coerce').astype(np.float64, copy=False)
+    return out
+
+
+class _XMLChunk:
     """
-    Parses the traffic data XML file and returns a pandas DataFrame.
+    One chunk of records as preallocated per-column arrays of element text
+    (None where absent). to_frame() converts each column in one vectorized
+    step: float64, nullable Int64/boolean, object strings.
     """
+    def __init__(self, size):
+        self.size = size
+        self.n = 0
+        self.values = {col: np.empty(size, dtype=object) for col in _XML_COLUMNS}
+
+    def to_frame(self):
+        n = self.n
+        columns = {}
+        for col in _XML_COLUMNS:
+            kind = _XML_KINDS[col]
+            raw = self.values[col][:n]
+            if kind == 'float':
+                columns[col] = _numeric(raw)
+            elif kind == 'int':
+                # int() semantics: non-integral text counts as missing
+                values = _numeric(raw)
+                valid = np.isfinite(values) & (values == np.floor(values))
+                columns[col] = pd.arrays.IntegerArray(np.where(valid, values, 0).astype(np.int64), ~valid)
+            elif kind == 'bool':
+                missing = pd.isna(raw)
+                columns[col] = pd.arrays.BooleanArray(raw == 'true', missing)
+            else:
+                columns[col] = raw
+        return pd.DataFrame(columns)
+
+
+def _iter_xml_chunks(xml_file_path, chunksize):
+    """Yields (DataFrame, sections seen so far) per chunk."""
     if not os.path.exists(xml_file_path):
         raise FileNotFoundError(f"File not found: {xml_file_path}")
 
-    tree = ET.parse(xml_file_path)
-    root = tree.getroot()
-
-    data = []
-
-    # Iterate through all nodes
-    for node in root.findall('.//Node'):
-        node_id = node.get('id')
-        location = node.find('Location').text
-        road_type = node.find('RoadType').text
-        lanes = int(node.find('Lanes').text)
-        speed_limit = float(node.find('SpeedLimit').text)
-
-        # Iterate through all records in the TimeSeries
-        for record in node.findall('.//Record'):
-            record_data = {
-                'NodeID': node_id,
-                'Location': location,
-                'RoadType': road_type,
-                'Lanes': lanes,
-                'SpeedLimit': speed_limit,
-                'Timestamp': record.get('timestamp'),
-                'Split': record.get('split')
-            }
-
-            # Helper function to extract text deeply
-            def extract_text(element, tag_name, type_func=str, default=None):
-                found = element.find(tag_name)
-                if found is not None and found.text is not None:
-                    try:
-                        return type_func(found.text)
-                    except ValueError:
-                        return default
-                return default
-
-            # Traffic
-            traffic = record.find('Traffic')
-            if traffic is not None:
-                record_data['TrafficVolume'] = extract_text(traffic, 'TrafficVolume', float)
-                record_data['TrafficSpeed'] = extract_text(traffic, 'TrafficSpeed', float)
-                record_data['TrafficDensity'] = extract_text(traffic, 'TrafficDensity', float)
-                record_data['VehicleCount'] = extract_text(traffic, 'VehicleCount', int)
-                record_data['VehicleSpeed'] = extract_text(traffic, 'VehicleSpeed', float)
-                record_data['RoadOccupancy'] = extract_text(traffic, 'RoadOccupancy', float)
-                record_data['TravelTime'] = extract_text(traffic, 'TravelTime', float)
-
-            # Temporal
-            temporal = record.find('Temporal')
-            if temporal is not None:
-                record_data['Hour'] = extract_text(temporal, 'Hour', int)
-                record_data['DayOfWeek'] = extract_text(temporal, 'DayOfWeek')
-                record_data['PeakType'] = extract_text(temporal, 'PeakType')
-
-            # Infrastructure
-            infra = record.find('Infrastructure')
-            if infra is not None:
-                record_data['RoadLength'] = extract_text(infra, 'RoadLength', float)
-                record_data['NumberOfLanes'] = extract_text(infra, 'NumberOfLanes', int)
-                record_data['IntersectionPresent'] = extract_text(infra, 'IntersectionPresent') == 'true'
-                record_data['TrafficSignalCount'] = extract_text(infra, 'TrafficSignalCount', int)
-                record_data['SignalPhaseDuration'] = extract_text(infra, 'SignalPhaseDuration', int)
-
-            # Weather
-            weather = record.find('Weather')
-            if weather is not None:
-                record_data['Condition'] = extract_text(weather, 'Condition')
-                record_data['EmissionLevel'] = extract_text(weather, 'EmissionLevel', float)
-                record_data['EnergyConsumption'] = extract_text(weather, 'EnergyConsumption', float)
-            
-            # Events
-            events = record.find('Events')
-            if events is not None:
-                record_data['Incident'] = extract_text(events, 'Incident')
-                record_data['AccidentCount'] = extract_text(events, 'AccidentCount', int)
-
-            # SmartMobility
-            mobility = record.find('SmartMobility')
-            if mobility is not None:
-                record_data['GPSUtilization'] = extract_text(mobility, 'GPSUtilization', float)
-                record_data['PublicTransportActive'] = extract_text(mobility, 'PublicTransportActive') == 'true'
-                record_data['RideSharingDemand'] = extract_text(mobility, 'RideSharingDemand', int)
-                record_data['ParkingAvailability'] = extract_text(mobility, 'ParkingAvailability', int)
-                record_data['SentimentScore'] = extract_text(mobility, 'SentimentScore', float)
-
-            # GraphContext
-            graph = record.find('GraphContext')
-            if graph is not None:
-                record_data['PreviousTimesteps'] = extract_text(graph, 'PreviousTimesteps', int)
-                record_data['ConnectedNodes'] = extract_text(graph, 'ConnectedNodes')
-                record_data['EdgeWeight'] = extract_text(graph, 'EdgeWeight', float)
-
-            # Target
-            target = record.find('Target')
-            if target is not None:
-                record_data['CongestionLevel'] = extract_text(target, 'CongestionLevel')
-                record_data['DelayReduction'] = extract_text(target, 'DelayReduction', float)
-                record_data['OptimalRoute'] = extract_text(target, 'OptimalRoute')
-
-            data.append(record_data)
-
-    return pd.DataFrame(data)
+    node_fields = {tag: col for tag, col, _ in _XML_NODE_FIELDS}
+
+    def bind(chunk):
+        # section -> ({tag: column array}, [flag column arrays]) for this chunk
+        layout = {}
+        for sec, tag, col, kind in _XML_RECORD_FIELDS:
+            fields, flags = layout.setdefault(sec, ({}, []))
+            fields[tag] = chunk.values[col]
+            if kind == 'bool':
+                flags.append(chunk.values[col])
+        return chunk.values, layout
+
+    chunk = _XMLChunk(chunksize)
+    values, layout = bind(chunk)
+    sections = set()
+    node = {}
+
+    for elem in _iter_record_elements(xml_file_path, node_fields):
+        tag = elem.tag
+        if tag == 'Node':
+            node = {'NodeID': elem.get('id')}
+            continue
+        if tag in node_fields:
+            node[node_fields[tag]] = elem.text
+            continue
+
+        # Record
+        i = chunk.n
+        for col, value in node.items():
+            values[col][i] = value
+        values['Timestamp'][i] = elem.get('timestamp')
+        values['Split'][i] = elem.get('split')
+
+        for section in elem:
+            stag = section.tag
+            sections.add(stag)
+            spec = layout.get(stag)
+            if spec is None:
+                continue
+            fields, flags = spec
+            for field in section:
+                column = fields.get(field.tag)
+                if column is not None:
+                    column[i] = field.text
+            # Flags are False when their section exists but the tag does not
+            for column in flags:
+                if column[i] is None:
+                    column[i] = ''
+
+        chunk.n += 1
+        if chunk.n == chunksize:
+            yield chunk.to_frame(), sections
+            chunk = _XMLChunk(chunksize)
+            values, layout = bind(chunk)
+
+    if chunk.n:
+        yield chunk.to_frame(), sections
+
+
+def _iter_record_elements(xml_file_path, node_fields):
+    """
+    Yields, in document order: each Node (on open, for its id), the Node's
+    own fields and each completed Record. Processed records are removed
+    from the tree so memory stays flat.
+    """
+    if _lxml_etree is not None:
+        # lxml filters by tag in C, so the many leaf elements never reach Python
+        tags = ('Node', 'Record') + tuple(node_fields)
+        for event, elem in _lxml_etree.iterparse(xml_file_path, events=('start', 'end'), tag=tags):
+            if event == 'start':
+                if elem.tag == 'Node':
+                    yield elem
+                continue
+            if elem.tag == 'Record':
+                yield elem
+                elem.clear()
+                # Drop already-processed siblings still referenced by the parent
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+            elif elem.tag != 'Node' and elem.getparent() is not None and elem.getparent().tag == 'Node':
+                yield elem
+        return
+
+    stack = []
+    for event, elem in ET.iterparse(xml_file_path, events=('start', 'end')):
+        if event == 'start':
+            stack.append(elem)
+            if elem.tag == 'Node':
+                yield elem
+            continue
+        stack.pop()
+        parent = stack[-1] if stack else None
+        if elem.tag == 'Record':
+            yield elem
+            elem.clear()
+            if parent is not None:
+                parent.remove(elem)
+        elif parent is not None and parent.tag == 'Node' and elem.tag in node_fields:
+            yield elem
+
+
+def iter_xml_chunks(xml_file_path, chunksize=50000):
+    """
+    Streams the traffic data XML file as DataFrame chunks of up to
+    `chunksize` records, in bounded memory.
+
+    Every chunk has the full column set with a fixed schema: integer and
+    boolean columns use pandas nullable dtypes (Int64, boolean).
+    """
+    for df, _ in _iter_xml_chunks(xml_file_path, chunksize):
+        yield df
+
+
+def parse_xml_to_df(xml_file_path, chunksize=50000):
+    """
+    Parses the traffic data XML file and returns a pandas DataFrame.
+    Streams the file in chunks (see iter_xml_chunks) and concatenates them.
+
+    Only 1.2-1.8x faster than the original whole-tree parser, but with about
+    40% of its memory growth (bench_xml_parse.py, 30k records); most of the
+    time left is the XML parse itself. The whole result is still held in memory: for
+    large files, process iter_xml_chunks chunk by chunk or convert once
+    with xml_to_columnar and load the Parquet / Feather file instead.
+    """
+    chunks = []
+    sections = set()
+    for frame, sections in _iter_xml_chunks(xml_file_path, chunksize):
+        chunks.append(frame)
+    if not chunks:
+        return pd.DataFrame()
+    df = pd.concat(chunks, axis=0, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+    # Columns of sections that never occur are left out, as before
+    unseen = [c for sec, _, c, _ in _XML_RECORD_FIELDS if sec not in sections]
+    df = df.drop(columns=unseen)
+
+    # Same dtypes as a frame built from per-record dicts:
+    # complete int columns are int64, int columns with gaps float64, flags bool/object
+    for col in df.columns:
+        dtype = str(df[col].dtype)
+        has_na = df[col].isna().any()
+        if dtype == 'Int64':
+            df[col] = df[col].astype('float64' if has_na else 'int64')
+        elif dtype == 'boolean':
+            df[col] = df[col].astype(object).where(df[col].notna(), np.nan) if has_na else df[col].astype(bool)
+    return df
+
+
+def xml_to_columnar(xml_file_path, out_path, chunksize=50000):
+    """
+    Converts the traffic data XML file to Parquet (.parquet) or Arrow IPC
+    (.feather / .arrow) chunk by chunk. Requires pyarrow.
+
+    Returns:
+        Number of records written
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("xml_to_columnar needs pyarrow (pip install pyarrow)")
+
+    arrow_types = {'str': pa.string(), 'float': pa.float64(), 'int': pa.int64(), 'bool': pa.bool_()}
+    schema = pa.schema([(col, arrow_types[_XML_KINDS[col]]) for col in _XML_COLUMNS])
+
+    tmp_path = f"{out_path}.tmp"
+    if out_path.endswith('.parquet'):
+        writer = pq.ParquetWriter(tmp_path, schema)
+    else:
+        writer = pa.ipc.new_file(tmp_path, schema)
+    rows = 0
+    try:
+        for df in iter_xml_chunks(xml_file_path, chunksize=chunksize):
+            writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+            rows += len(df)
+    finally:
+        writer.close()
+
+    os.replace(tmp_path, out_path)
+    return rows
+
+
+def _load_columnar(path):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_feather(path)
 
 if __name__ == "__main__":
     # Test
     csv_path = r"c:/Users/Devanshu/OneDrive/Documents/datathon/all_features_traffic_dataset.csv"
     if os.path.exists(csv_path):
         df = load_traffic_data(csv_path)
-        print(df.head())
-        print(df.info())
+        logger.info("%s", df.head())
+        df.info()
     else:
-        print("CSV file not found.")
+        logger.info("CSV file not found.")
@@ -0,0 +1,101 @@
+"""
+Request Deadlines
+A per-request time budget threaded through the route pipeline (scraper
+calls, prediction, reports, GenAI) so one slow upstream cannot hold a
+request past its budget.
+
+    deadline = Deadline(8.0)
+    weather = await deadline.run("weather", fetch(), fallback=lambda: cached_or_default)
+    deadline.metadata()  # {"budget_ms", "elapsed_ms", "stages": {...}, "degraded": {...}}
+
+Stages that run out of time return their fallback (a cached or heuristic
+value) and are listed under "degraded". Timed-out work is shielded, not
+cancelled: it finishes in the background and fills the caches for the
+next request (cancelling would also strand single-flight waiters).
+"""
+import asyncio
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUDGET_S = float(os.getenv("ROUTE_DEADLINE_S", "8"))
+
+
+class Deadline:
+    """
+    Args:
+        budget_s: Seconds the whole request may take
+    """
+    def __init__(self, budget_s=DEFAULT_BUDGET_S):
+        self.budget_s = budget_s
+        self.started = time.monotonic()
+        self.expires = self.started + budget_s
+        self.stages = {}    # name -> ms spent
+        self.degraded = {}  # name -> reason
+        self._lock = threading.Lock()
+
+    def remaining(self):
+        """Seconds left (never negative)."""
+        return max(self.expires - time.monotonic(), 0.0)
+
+    @property
+    def expired(self):
+        return time.monotonic() >= self.expires
+
+    def timeout(self, cap=None):
+        """Seconds a stage may wait: the remaining budget, at most `cap`."""
+        remaining = self.remaining()
+        return remaining if cap is None else min(remaining, cap)
+
+    def record(self, name, seconds):
+        # A stage reached more than once (e.g. concurrently) reports its longest run
+        with self._lock:
+            self.stages[name] = max(self.stages.get(name, 0.0), round(seconds * 1000, 1))
+
+    def degrade(self, name, reason):
+        with self._lock:
+            self.degraded[name] = reason
+
+    @contextmanager
+    def stage(self, name):
+        """Time a synchronous block as stage `name`."""
+        start = time.monotonic()
+        try:
+            yield self
+        finally:
+            self.record(name, time.monotonic() - start)
+
+    async def run(self, name, awaitable, fallback=None, cap=None, min_s=0.0, shield=True):
+        """
+        Await `awaitable` within the remaining budget (at most `cap` seconds).
+
+        Returns its result, or `fallback()` when the budget runs out first
+        (or less than `min_s` seconds are left to begin with). Exceptions
+        from `awaitable` propagate. With shield=False a timed-out awaitable
+        is cancelled instead of left to finish.
+        """
+        start = time.monotonic()
+        timeout = self.timeout(cap)
+        try:
+            if timeout <= min_s:
+                if asyncio.iscoroutine(awaitable):
+                    awaitable.close()  # Never started
+                self.degrade(name, "skipped")
+                return fallback() if fallback else None
+            try:
+                return await asyncio.wait_for(asyncio.shield(awaitable) if shield else awaitable, timeout)
+            except asyncio.TimeoutError:
+                self.degrade(name, "timeout")
+                return fallback() if fallback else None
+        finally:
+            self.record(name, time.monotonic() - start)
+
+    def metadata(self):
+        with self._lock:
+            return {
+                "budget_ms": round(self.budget_s * 1000),
+                "elapsed_ms": round((time.monotonic() - self.started) * 1000, 1),
+                "stages": dict(self.stages),
+                "degraded": dict(self.degraded)
+            }
@@ -0,0 +1,137 @@
+"""
+Time-Dependent Edge Costs
+Travel time per (edge, hour bucket) for the local road graph, derived from
+the model's hourly congestion forecast through the BPR curve
+(TrafficPhysics.bpr_speed).
+
+A table is computed once per forecast profile as a (buckets, edges) float32
+array, so a departure-time-aware search costs one lookup per edge relaxation
+instead of a model call. Fast roads carry more of the forecast load than side
+streets, which is what moves peak-hour routes off the arterials.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from src.categorical import map_congestion
+from src.sensor_interface import TrafficPhysics, demand_curve
+
+HOUR_BUCKETS = 24
+BUCKET_SECONDS = 3600.0
+
+# Forecast class (0 free flow, 1 moderate, 2 heavy) -> volume / capacity
+LEVEL_LOAD = np.array([0.6, 0.95, 1.25])
+
+# Share of the load an edge sees, by free-flow speed (km/h): arterials
+# (~60+) attract through traffic, residential streets (~25) much less
+_EXPOSURE_SPEED = 40.0
+_EXPOSURE_RANGE = (0.5, 1.3)
+
+
+def hourly_load(prediction=None, physics=None):
+    """
+    Volume/capacity ratio for each hour of the day, shape (24,).
+
+    Hours without a model prediction follow the typical demand curve; the
+    current hour and every forecast horizon in `prediction` (the
+    get_prediction_data response) use the predicted congestion class.
+    """
+    physics = physics or TrafficPhysics()
+    load = demand_curve(np.arange(HOUR_BUCKETS)) / physics.capacity
+    if not prediction:
+        return load
+
+    hours, labels = [], []
+    current = prediction.get("prediction", {})
+    if "hour" in current:
+        hours.append(current["hour"])
+        labels.append(current.get("congestion_level"))
+    for step in prediction.get("forecast", []):
+        if "hour" in step:
+            hours.append(step["hour"])
+            labels.append(step.get("congestion_level"))
+    if hours:
+        codes = map_congestion(labels)
+        known = codes >= 0
+        hours = np.asarray(hours, dtype=int)[known] % HOUR_BUCKETS
+        load[hours] = LEVEL_LOAD[np.clip(codes[known], 0, len(LEVEL_LOAD) - 1)]
+    return load
+
+
+class EdgeCostTable:
+    """
+    Per-(hour bucket, edge) travel seconds for one RoadGraph.
+
+    Args:
+        graph: RoadGraph (uses its free-flow speed and travel arrays)
+        load: Volume/capacity ratio per hour bucket (see hourly_load)
+        physics: TrafficPhysics supplying the BPR curve
+    """
+    def __init__(self, graph, load, physics=None):
+        physics = physics or TrafficPhysics()
+        self.load = np.asarray(load, dtype=np.float64)
+        self.buckets = len(self.load)
+        exposure = np.clip(graph.speed.astype(np.float64) / _EXPOSURE_SPEED, *_EXPOSURE_RANGE)
+        free_flow = graph.travel.astype(np.float64)
+
+        self.travel = np.empty((self.buckets, graph.n_edges), dtype=np.float32)
+        for h, ratio in enumerate(self.load):
+            # BPR speed relative to free flow; congestion only ever slows an edge
+            slowdown = physics.bpr_speed(ratio * exposure * physics.capacity) / physics.v_f
+            self.travel[h] = free_flow / np.minimum(slowdown, 1.0)
+
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, t):
+        """Hour bucket for `t` seconds after midnight (wraps past 24h)."""
+        return int(t // BUCKET_SECONDS) % self.buckets
+
+    def row(self, bucket):
+        """Travel seconds of every edge in `bucket` as a list (cached; cheap to index in the search loop)."""
+        row = self._rows.get(bucket)
+        if row is None:
+            with self._lock:
+                row = self._rows.get(bucket)
+                if row is None:
+                    row = self._rows[bucket] = self.travel[bucket].tolist()
+        return row
+
+    def edge_times(self, edges, depart):
+        """Travel seconds of each edge along a path entered at `depart` seconds after midnight."""
+        t = depart
+        times = []
+        for e in edges:
+            d = float(self.travel[self.bucket(t), e])
+            times.append(d)
+            t += d
+        return times
+
+    def nbytes(self):
+        return int(self.travel.nbytes)
+
+
+_tables = OrderedDict()  # (graph id, load bytes) -> (graph, EdgeCostTable)
+_tables_lock = threading.Lock()
+_MAX_TABLES = 8
+
+
+def cost_table(graph, load):
+    """
+    Shared EdgeCostTable for `graph` and a load profile. Forecast classes are
+    discrete, so only a handful of distinct profiles occur; each is built once.
+    """
+    load = np.round(np.asarray(load, dtype=np.float64), 3)
+    key = (id(graph), load.tobytes())
+    with _tables_lock:
+        hit = _tables.get(key)
+        if hit is not None and hit[0] is graph:
+            _tables.move_to_end(key)
+            return hit[1]
+    table = EdgeCostTable(graph, load)
+    with _tables_lock:
+        _tables[key] = (graph, table)
+        while len(_tables) > _MAX_TABLES:
+            _tables.popitem(last=False)
+    return table
@@ -0,0 +1,87 @@
+"""
+Horizon-Batched Forecast Engine
+Builds the current window and every forecast window as one
+(windows, seq_len, features) tensor and scores them in a single forward pass.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.inference_batcher import predict_proba
+
+DEFAULT_HORIZONS = [1, 2, 3]
+# Bounds for caller-supplied horizons (the API rejects anything outside)
+MAX_HORIZON_H = 24
+MAX_HORIZONS = 48
+
+
+def scale_windows(scaler, X):
+    """
+    Scale a (..., features) array with a fitted scaler in one vectorized step.
+    MinMaxScaler is applied directly from its coefficients.
+    """
+    flat = np.asarray(X, dtype=np.float64).reshape(-1, X.shape[-1])
+    if hasattr(scaler, 'scale_') and hasattr(scaler, 'min_'):
+        flat = flat * scaler.scale_ + scaler.min_
+        if getattr(scaler, 'clip', False):
+            np.clip(flat, scaler.feature_range[0], scaler.feature_range[1], out=flat)
+    else:
+        flat = scaler.transform(flat)
+    return flat.reshape(X.shape).astype(np.float32)
+
+
+def build_horizon_windows(history, future):
+    """
+    Slide the history window forward through the future rows.
+
+    Args:
+        history: (seq_len, features) array of observed rows
+        future: (horizons, features) array, one projected row per horizon
+
+    Returns:
+        (horizons, seq_len, features) array; window k ends at future[k]
+    """
+    seq_len = len(history)
+    timeline = np.concatenate([history, future], axis=0)
+    # sliding_window_view puts the window axis last: (T, F, L) -> (T, L, F)
+    windows = sliding_window_view(timeline, seq_len, axis=0).transpose(0, 2, 1)
+    return windows[1:]
+
+
+def horizon_hours(current_hour, horizons):
+    """Hour-of-day feature for each horizon (fractional horizons floor to the hour)."""
+    return (np.floor(current_hour + np.asarray(horizons, dtype=float)) % 24).astype(int)
+
+
+def score_windows(model, X):
+    """
+    Run a batch of scaled windows through the model. Goes through the shared
+    micro-batcher, so concurrent requests share one forward pass.
+
+    Returns:
+        (windows, classes) numpy array of softmax probabilities
+    """
+    return predict_proba(model, X)
+
+
+def predict_with_horizons(model, scaler, current, history, future):
+    """
+    Score the current window plus one window per horizon in a single pass.
+
+    Args:
+        model: Trained LSTM
+        scaler: Fitted feature scaler
+        current: (seq_len, features) unscaled window for the current prediction
+        history: (seq_len, features) unscaled rows the forecast windows start from
+        future: (horizons, features) unscaled projected rows
+
+    Returns:
+        (1 + horizons, classes) probabilities; row 0 is the current prediction
+    """
+    windows = build_horizon_windows(history, future)
+    batch = np.concatenate([current[None, :, :], windows], axis=0)
+    return score_windows(model, scale_windows(scaler, batch))
+
+
+def format_step(horizon):
+    """Label a horizon the way the API reports it (e.g. '+1h', '+0.25h')."""
+    return f"+{horizon:g}h"
@@ -4,8 +4,15 @@ import numpy as np
 from datetime import datetime, timedelta
 import random
 
+try:
+    from src.log import get_logger
+except ImportError:
+    from log import get_logger
+
+logger = get_logger(__name__)
+
 def generate_city_data(city_name, lat, lon, num_days=30):
-    print(f"Generating data for {city_name}...")
+    logger.info("Generating data for %s...", city_name)
     
     start_date = datetime.now() - timedelta(days=num_days)
     data = []
@@ -101,11 +108,11 @@ def generate_big_dataset():
         all_data.extend(city_data)
         
     df = pd.DataFrame(all_data)
-    print(f"Generated {len(df)} rows of synthetic state-wise data.")
+    logger.info("Generated %s rows of synthetic state-wise data.", len(df))
     
     output_path = "state_wise_traffic_data.csv"
     df.to_csv(output_path, index=False)
-    print(f"Saved to {output_path}")
+    logger.info("Saved to %s", output_path)
 
 if __name__ == "__main__":
     generate_big_dataset()
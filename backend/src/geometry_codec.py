@@ -0,0 +1,214 @@
+"""
+Geometry Codec
+Compact encodings for route geometry in API responses.
+
+    simplify()         Douglas-Peucker, vectorized over all open ranges per pass
+    zoom_tolerance()   Simplification tolerance for a map zoom level
+    encode_polyline()  Google encoded polyline (precision 5 or 6), vectorized
+    delta_encode()     Integer [lon, lat] deltas (flat list) at a precision
+    compact_routes()   Encode a /route response's geometry once per route
+    dumps()            Serialize a response body (orjson / msgpack / json)
+
+All functions take (N, 2) [lon, lat] arrays, the layout used throughout the
+routing code.
+"""
+import json
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+FORMATS = ("full", "simplified", "polyline", "delta")
+MSGPACK_TYPE = "application/msgpack"
+
+
+def zoom_tolerance(zoom, lat=19.0, pixels=0.5):
+    """
+    Tolerance (degrees of latitude) that keeps simplification below
+    `pixels` screen pixels at a web-map zoom level.
+    """
+    return pixels * 360.0 / (256 * 2.0 ** zoom) * np.cos(np.radians(lat))
+
+
+def simplify(coords, tolerance):
+    """
+    Douglas-Peucker simplification. Distances are measured with longitude
+    scaled by cos(latitude), so `tolerance` is in degrees of latitude.
+
+    Returns:
+        The kept points, (M, 2) float64, endpoints always included
+    """
+    pts = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    n = len(pts)
+    if n < 3 or not tolerance or tolerance <= 0:
+        return pts
+    xy = pts * [np.cos(np.radians(pts[:, 1].mean())), 1.0]
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    # Split every open range at once per pass, so one pass is a handful of
+    # array operations however many ranges are open
+    a, b = np.array([0]), np.array([n - 1])
+    while len(a):
+        inner = b - a - 1
+        a, b, inner = a[inner > 0], b[inner > 0], inner[inner > 0]
+        if not len(a):
+            break
+        rng = np.repeat(np.arange(len(a)), inner)
+        idx = np.arange(len(rng)) - np.repeat(np.cumsum(inner) - inner, inner) + a[rng] + 1
+        sx, sy = (xy[b] - xy[a]).T
+        rx, ry = (xy[idx] - xy[a[rng]]).T
+        norm = np.hypot(sx, sy)[rng]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            dist = np.where(norm > 0, np.abs(rx * sy[rng] - ry * sx[rng]) / norm, np.hypot(rx, ry))
+        # Farthest point per range (the first one on ties, as argmax would)
+        first = np.cumsum(inner) - inner
+        far_d = np.maximum.reduceat(dist, first)
+        pos = np.where(dist == far_d[rng], np.arange(len(rng)), len(rng))
+        far = idx[np.minimum.reduceat(pos, first)]
+        split = far_d > tolerance
+        keep[far[split]] = True
+        a, b = np.r_[a[split], far[split]], np.r_[far[split], b[split]]
+    return pts[keep]
+
+
+def _quantize(coords, precision):
+    return np.round(np.asarray(coords, dtype=np.float64).reshape(-1, 2) * 10 ** precision).astype(np.int64)
+
+
+def encode_polyline(coords, precision=5):
+    """
+    Encode [lon, lat] points as a Google polyline string (which stores
+    lat, lon pairs), decodable by the `polyline` package and map SDKs.
+    """
+    q = _quantize(coords, precision)[:, ::-1]
+    if len(q) == 0:
+        return ""
+    deltas = np.diff(q, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    # Zigzag: sign into the lowest bit
+    values = np.where(deltas < 0, ~(deltas << 1), deltas << 1)
+    # Split into 5-bit chunks, low first; all but the last get the 0x20 flag
+    nbits = np.maximum(np.floor(np.log2(np.maximum(values, 1))).astype(np.int64) + 1, 1)
+    nchunks = (nbits + 4) // 5
+    k = np.arange(int(nchunks.max()))
+    chunks = (values[:, None] >> (5 * k)) & 0x1F
+    chunks = chunks | np.where(k < (nchunks[:, None] - 1), 0x20, 0)
+    chars = (chunks + 63)[k < nchunks[:, None]]
+    return chars.astype(np.uint8).tobytes().decode("ascii")
+
+
+def delta_encode(coords, precision=5):
+    """
+    First point then per-point differences, as integers at 10**precision,
+    flattened [lon0, lat0, dlon1, dlat1, ...]. Decode with a cumulative sum.
+    """
+    q = _quantize(coords, precision)
+    if len(q) == 0:
+        return []
+    return np.diff(q, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel().tolist()
+
+
+def encode_geometry(coords, fmt="full", zoom=None, precision=5):
+    """
+    Encode one geometry for a response.
+
+    Args:
+        fmt: "full" ([lon, lat] list), "simplified" (list, zoom 14 when no
+             zoom given), "polyline" or "delta"
+        zoom: Map zoom level; simplifies to half a pixel when given
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown geometry format '{fmt}' (expected one of {FORMATS})")
+    if fmt == "full" and zoom is None and isinstance(coords, list):
+        return coords
+    pts = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    if zoom is None and fmt == "simplified":
+        zoom = 14
+    if zoom is not None and len(pts):
+        pts = simplify(pts, zoom_tolerance(zoom, lat=float(pts[:, 1].mean())))
+    if fmt == "polyline":
+        return encode_polyline(pts, precision)
+    if fmt == "delta":
+        return delta_encode(pts, precision)
+    return pts.tolist() if fmt == "full" and zoom is None else np.round(pts, precision + 1).tolist()
+
+
+def compact_routes(body, fmt="full", zoom=None, precision=5):
+    """
+    Encode the geometry of a /route response body in place.
+
+    Each routes[i]["points"] is encoded once. Compact formats (polyline,
+    delta) also drop the legacy route / alternative_route / alternates
+    copies, which repeat those geometries, and add "geometry_refs" giving
+    the routes[] index each of them pointed at.
+    """
+    if fmt == "full" and zoom is None:
+        return body
+    routes = body.get("routes", [])
+    points = [r.get("points") for r in routes]
+    encoded = {}  # id(geometry) -> encoding; the legacy fields share the route lists
+
+    def _encode(coords):
+        key = id(coords)
+        if key not in encoded:
+            encoded[key] = (coords, encode_geometry(coords or [], fmt, zoom, precision))
+        return encoded[key][1]
+
+    for r in routes:
+        r["points"] = _encode(r.get("points"))
+    body["geometry"] = {"format": fmt, "precision": precision, "zoom": zoom}
+
+    legacy = ("route", "alternative_route", "alternates")
+    if fmt in ("polyline", "delta"):
+        def _ref(coords):
+            for i, p in enumerate(points):
+                if p is coords or p == coords:
+                    return i
+            return None
+        alternates = body.get("alternates") or []
+        body["geometry_refs"] = {
+            "route": _ref(body.get("route")),
+            "alternative_route": _ref(alternates[0]) if alternates else None,
+            "alternates": [_ref(a) for a in alternates]
+        }
+        for key in legacy:
+            body.pop(key, None)
+    else:
+        for key in legacy:
+            if key in body:
+                body[key] = [_encode(a) for a in body[key]] if key == "alternates" else _encode(body[key])
+    return body
+
+
+def dumps(body, accept=None):
+    """
+    Serialize a response body, as msgpack when the client accepts it (and
+    msgpack is installed), else JSON (orjson when installed).
+
+    Returns:
+        (content bytes, media type)
+    """
+    if accept and MSGPACK_TYPE in accept and msgpack is not None:
+        return msgpack.packb(body, default=_plain), MSGPACK_TYPE
+    if orjson is not None:
+        return orjson.dumps(body, default=_plain, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS), "application/json"
+    return json.dumps(body, default=_plain, separators=(",", ":")).encode(), "application/json"
+
+
+def _plain(obj):
+    # NumPy scalars / arrays and anything else the encoders do not know
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    return str(obj)
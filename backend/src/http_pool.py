@@ -0,0 +1,271 @@
+"""
+Shared HTTP Layer
+One pooled client per upstream (OSRM, Open-Meteo, Google News RSS, Featherless)
+with keep-alive, per-host concurrency limits, timeouts, jittered retries and a
+circuit breaker.
+
+Async callers use `get_upstream(name)`; the few remaining synchronous callers
+(CLI scripts, worker threads) use `get_session(name)`, a keep-alive
+requests.Session for the same host.
+
+Base URLs can be overridden with environment variables (e.g. OSRM_BASE_URL)
+or `configure_upstream`, so the stack can run against local stub servers.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# name -> default settings
+UPSTREAMS = {
+    "osrm": {
+        "base_url": os.getenv("OSRM_BASE_URL", "http://router.project-osrm.org"),
+        "timeout": 5.0, "max_connections": 20, "concurrency": 10, "retries": 2
+    },
+    "open_meteo": {
+        "base_url": os.getenv("OPEN_METEO_BASE_URL", "https://api.open-meteo.com"),
+        "timeout": 5.0, "max_connections": 10, "concurrency": 5, "retries": 2
+    },
+    "google_news": {
+        "base_url": os.getenv("NEWS_RSS_BASE_URL", "https://news.google.com"),
+        "timeout": 5.0, "max_connections": 10, "concurrency": 4, "retries": 1
+    },
+    "featherless": {
+        "base_url": os.getenv("FEATHERLESS_BASE_URL", "https://api.featherless.ai/v1"),
+        "timeout": 15.0, "max_connections": 10, "concurrency": 8, "retries": 0
+    }
+}
+
+DEFAULT_HEADERS = {"User-Agent": "TrafficIntelligenceApp/1.0"}
+
+
+class CircuitOpenError(Exception):
+    """Raised when an upstream's circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures and rejects calls for
+    `reset_after` seconds, then lets a single trial call through (half-open).
+    """
+    def __init__(self, threshold=5, reset_after=30.0):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """Free the half-open trial slot without recording an outcome."""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+def _backoff(attempt, base=0.2, cap=2.0):
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class Upstream:
+    """
+    Pooled async client for one upstream host.
+    """
+    def __init__(self, name, base_url, timeout=5.0, max_connections=10, concurrency=5,
+                 retries=1, breaker_threshold=5, breaker_reset=30.0):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.concurrency = concurrency
+        self.retries = retries
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
+        self._client = None
+        self._semaphore = None
+        self._loop = None
+        self.requests = 0
+        self.failures = 0
+        self.rejected = 0
+
+    def _bind(self):
+        # httpx clients and semaphores belong to one event loop
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+                headers=DEFAULT_HEADERS
+            )
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._loop = loop
+        return self._client
+
+    @property
+    def client(self):
+        """The underlying httpx.AsyncClient for the running loop."""
+        return self._bind()
+
+    async def call(self, fn, retries=None):
+        """
+        Run `await fn()` under this upstream's concurrency limit, retry policy
+        and circuit breaker. `fn` should raise on failure.
+        """
+        self._bind()
+        retries = self.retries if retries is None else retries
+        if not self.breaker.allow():
+            self.rejected += 1
+            raise CircuitOpenError(f"{self.name} circuit is open")
+
+        last_error = None
+        try:
+            for attempt in range(retries + 1):
+                self.requests += 1
+                try:
+                    async with self._semaphore:
+                        result = await fn()
+                    self.breaker.record_success()
+                    return result
+                except Exception as e:
+                    last_error = e
+                    self.failures += 1
+                    if attempt < retries:
+                        await asyncio.sleep(_backoff(attempt))
+        except BaseException:
+            # Cancelled by the caller (e.g. a deadline): says nothing about
+            # the upstream, but a half-open trial must give its slot back
+            self.breaker.release()
+            raise
+
+        self.breaker.record_failure()
+        raise last_error
+
+    async def get(self, path, params=None, headers=None, retries=None):
+        """
+        GET `path` (relative to the base URL, or absolute). Retries on
+        transport errors and 5xx responses.
+
+        Returns:
+            httpx.Response (any status below 500)
+        """
+        client = self._bind()
+
+        async def _do():
+            response = await client.get(path, params=params, headers=headers)
+            if response.status_code >= 500:
+                response.raise_for_status()
+            return response
+
+        return await self.call(_do, retries=retries)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self):
+        return {
+            "base_url": self.base_url,
+            "circuit": self.breaker.state,
+            "requests": self.requests,
+            "failures": self.failures,
+            "rejected": self.rejected
+        }
+
+
+_UPSTREAMS = {}
+_SESSIONS = {}
+_LOCK = threading.Lock()
+
+
+def get_upstream(name):
+    """Return the shared async client for a named upstream."""
+    with _LOCK:
+        upstream = _UPSTREAMS.get(name)
+        if upstream is None:
+            upstream = Upstream(name, **UPSTREAMS[name])
+            _UPSTREAMS[name] = upstream
+        return upstream
+
+
+def get_session(name):
+    """Keep-alive requests.Session for synchronous callers of a named upstream."""
+    with _LOCK:
+        session = _SESSIONS.get(name)
+        if session is None:
+            cfg = UPSTREAMS[name]
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=cfg["max_connections"])
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(DEFAULT_HEADERS)
+            _SESSIONS[name] = session
+        return session
+
+
+def base_url(name):
+    """Current base URL of a named upstream (honours overrides)."""
+    return UPSTREAMS[name]["base_url"].rstrip("/")
+
+
+def configure_upstream(name, **settings):
+    """
+    Override settings for an upstream (e.g. base_url of a local stub server).
+    Existing clients for that upstream are discarded.
+    """
+    with _LOCK:
+        UPSTREAMS.setdefault(name, {}).update(settings)
+        _UPSTREAMS.pop(name, None)
+        _SESSIONS.pop(name, None)
+
+
+async def aclose_all():
+    """Close every pooled async client (application shutdown)."""
+    with _LOCK:
+        upstreams = list(_UPSTREAMS.values())
+    for upstream in upstreams:
+        await upstream.aclose()
+
+
+def upstream_stats():
+    with _LOCK:
+        upstreams = dict(_UPSTREAMS)
+    return {name: u.stats() for name, u in upstreams.items()}
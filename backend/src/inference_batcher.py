@@ -0,0 +1,169 @@
+"""
+Micro-Batching Inference
+Coalesces concurrent model calls into one batched forward pass.
+
+Callers (request threads or coroutines) submit their window tensors; a
+worker thread collects pending requests for up to `max_wait_ms` or until
+`max_batch_size` windows are queued, runs them as one batch and scatters
+the softmax results back.
+"""
+import asyncio
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+import torch
+
+
+class _Pending:
+    def __init__(self, model, X):
+        self.model = model
+        self.X = X
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class InferenceBatcher:
+    """
+    Request coalescer for classification models returning logits.
+
+    Args:
+        max_batch_size: Maximum number of windows per forward pass
+        max_wait_ms: How long the first request of a batch waits for company
+    """
+    def __init__(self, max_batch_size=32, max_wait_ms=2.0):
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = {}
+        self._waits_ms = deque(maxlen=2048)
+        self._batches = 0
+        self._requests = 0
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+                self._worker.start()
+
+    def submit(self, model, X):
+        """
+        Queue a (windows, seq_len, features) array for `model`.
+
+        Returns:
+            concurrent.futures.Future resolving to (windows, classes) probabilities
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 2:
+            X = X[None, :, :]
+        item = _Pending(model, X)
+        self._ensure_worker()
+        self._queue.put(item)
+        return item.future
+
+    def predict(self, model, X):
+        """Blocking variant for request threads."""
+        return self.submit(model, X).result()
+
+    async def predict_async(self, model, X):
+        """Awaitable variant for coroutines."""
+        return await asyncio.wrap_future(self.submit(model, X))
+
+    def _collect(self):
+        first = self._queue.get()
+        batch = [first]
+        windows = len(first.X)
+        deadline = time.perf_counter() + self.max_wait_ms / 1000.0
+        while windows < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            windows += len(item.X)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+
+            # Items can only share a forward pass if they use the same model
+            # and window shape (what-if scenarios use single-step windows)
+            groups = {}
+            for item in batch:
+                groups.setdefault((id(item.model), item.X.shape[1:]), []).append(item)
+
+            for items in groups.values():
+                self._run_group(items)
+
+            with self._stats_lock:
+                self._batches += 1
+                self._requests += len(batch)
+                size = sum(len(item.X) for item in batch)
+                self._batch_sizes[size] = self._batch_sizes.get(size, 0) + 1
+                for item in batch:
+                    self._waits_ms.append((started - item.enqueued_at) * 1000)
+
+    def _run_group(self, items):
+        model = items[0].model
+        try:
+            device = next(model.parameters()).device
+            X = np.concatenate([item.X for item in items], axis=0) if len(items) > 1 else items[0].X
+            with torch.no_grad():
+                output = model(torch.from_numpy(X).to(device))
+                probs = torch.softmax(output, dim=1).cpu().numpy()
+        except Exception as e:
+            for item in items:
+                item.future.set_exception(e)
+            return
+
+        offset = 0
+        for item in items:
+            n = len(item.X)
+            item.future.set_result(probs[offset:offset + n])
+            offset += n
+
+    def stats(self):
+        """
+        Returns:
+            dict with batch-size distribution and queue-wait percentiles (ms)
+        """
+        with self._stats_lock:
+            waits = np.array(self._waits_ms) if self._waits_ms else np.zeros(1)
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_ms,
+                "batches": self._batches,
+                "requests": self._requests,
+                "avg_requests_per_batch": round(self._requests / self._batches, 2) if self._batches else 0.0,
+                "batch_size_distribution": dict(sorted(self._batch_sizes.items())),
+                "queue_wait_ms": {
+                    "p50": round(float(np.percentile(waits, 50)), 3),
+                    "p95": round(float(np.percentile(waits, 95)), 3),
+                    "max": round(float(waits.max()), 3)
+                },
+                "pending": self._queue.qsize()
+            }
+
+
+# Shared instance; tune with INFERENCE_MAX_BATCH / INFERENCE_MAX_WAIT_MS
+batcher = InferenceBatcher(
+    max_batch_size=int(os.getenv("INFERENCE_MAX_BATCH", "32")),
+    max_wait_ms=float(os.getenv("INFERENCE_MAX_WAIT_MS", "2"))
+)
+
+
+def predict_proba(model, X):
+    """Score windows through the shared batcher and return softmax probabilities."""
+    return batcher.predict(model, X)
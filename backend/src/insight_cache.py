@@ -0,0 +1,216 @@
+"""
+LLM Insight Cache
+Caches generated traffic insights keyed on a bucketed version of the
+structured data the prompt is built from, so identical traffic situations
+(to within the buckets) cost one model call however many users ask.
+
+- ETAs are rounded to ETA_BUCKET_MIN minutes and savings to whole minutes;
+  congestion levels and free text are normalized. The prompt is built from
+  the bucketed values, so a cached answer never quotes numbers that differ
+  from the key it is stored under.
+- Memory tier: the shared LRU + TTL + single-flight policy of context_cache.
+- Optional persistent tier (INSIGHT_CACHE_DB): a SQLite table consulted on
+  memory misses and written on every model call, so restarts and other
+  worker processes reuse answers.
+- Failed model calls raise through the loader and are never cached.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+try:
+    from src.context_cache import TTLCache, register_cache
+    from src.log import get_logger
+except ImportError:
+    from context_cache import TTLCache, register_cache
+    from log import get_logger
+
+logger = get_logger(__name__)
+
+ETA_BUCKET_MIN = float(os.getenv("INSIGHT_ETA_BUCKET_MIN", "5"))
+
+_ETA_FIELDS = ("selected_eta", "recommended_eta", "future_eta_1h", "future_eta_2h")
+_LEVEL_FIELDS = ("selected_congestion", "recommended_congestion", "congestion_uncertainty")
+_TEXT_FIELDS = ("selected_route_name", "recommended_route_name", "top_contributing_factors")
+_LEVELS = {"0": "Low", "1": "Medium", "2": "High", "moderate": "Medium"}
+
+
+def _bucket(value, step):
+    try:
+        return int(round(float(value) / step) * step)
+    except (TypeError, ValueError):
+        return value  # "N/A" and other placeholders pass through
+
+
+def _level(value):
+    text = str(value).strip()
+    level = _LEVELS.get(text.lower())
+    if level is None and text.lower() in ("low", "medium", "high"):
+        level = text.capitalize()
+    return level or text  # "N/A" and other placeholders pass through
+
+
+def _text(value):
+    return re.sub(r"\s+", " ", str(value)).strip()
+
+
+def bucket_structured_data(structured_data):
+    """
+    The fields the insight prompt reads, quantized. Fields that are absent
+    stay absent so the prompt's own defaults still apply.
+    """
+    out = {}
+    for key in _ETA_FIELDS:
+        if key in structured_data:
+            out[key] = _bucket(structured_data[key], ETA_BUCKET_MIN)
+    if "time_savings" in structured_data:
+        out["time_savings"] = _bucket(structured_data["time_savings"], 1)
+    for key in _LEVEL_FIELDS:
+        if key in structured_data:
+            out[key] = _level(structured_data[key])
+    for key in _TEXT_FIELDS:
+        if key in structured_data:
+            out[key] = _text(structured_data[key])
+    return out
+
+
+def insight_key(bucketed, user_preference):
+    """Stable key for bucketed data + preference (case-insensitive)."""
+    payload = json.dumps([bucketed, _text(user_preference)], sort_keys=True, default=str).casefold()
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class InsightCache(TTLCache):
+    """
+    TTLCache of insight strings with an optional SQLite tier at `path`.
+    """
+    def __init__(self, maxsize=1024, ttl=900, path=None):
+        super().__init__("llm_insights", maxsize=maxsize, ttl=ttl)
+        self.path = path
+        self.db_hits = 0
+        self.db_errors = 0
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._row_ages = {}  # key -> age of the SQLite row being loaded
+
+    def _conn(self):
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS insights "
+                             "(key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)")
+            self._db.execute("DELETE FROM insights WHERE stored_at < ?", (time.time() - self.ttl,))
+        return self._db
+
+    def _db_row(self, key):
+        # (value, stored_at wall-clock time) of a fresh row, else None
+        if not self.path:
+            return None
+        try:
+            with self._db_lock:
+                row = self._conn().execute("SELECT value, stored_at FROM insights WHERE key = ? AND stored_at >= ?",
+                                           (key, time.time() - self.ttl)).fetchone()
+        except sqlite3.Error as e:
+            self.db_errors += 1
+            logger.warning("Insight cache DB read failed: %s", e)
+            return None
+        if row is not None:
+            self.db_hits += 1
+        return row
+
+    def _db_get(self, key):
+        # Loader side of a SQLite hit: _store keeps the row's age
+        row = self._db_row(key)
+        if row is None:
+            return None
+        self._row_ages[key] = max(time.time() - row[1], 0.0)
+        return row[0]
+
+    def _store(self, key, value, fut, age=0.0):
+        # Values loaded from SQLite expire when their row does
+        super()._store(key, value, fut, age=self._row_ages.pop(key, age))
+
+    def _db_put(self, key, value):
+        if not self.path:
+            return
+        try:
+            with self._db_lock:
+                self._conn().execute("INSERT OR REPLACE INTO insights (key, value, stored_at) VALUES (?, ?, ?)",
+                                     (key, value, time.time()))
+        except sqlite3.Error as e:
+            self.db_errors += 1
+            logger.warning("Insight cache DB write failed: %s", e)
+
+    def get_or_generate(self, key, generate):
+        """Cached insight for `key`, calling `generate()` (sync) on a miss of both tiers."""
+        def _load():
+            value = self._db_get(key)
+            if value is None:
+                value = generate()
+                self._db_put(key, value)
+            return value
+        return self.get_or_load(key, _load)
+
+    async def get_or_generate_async(self, key, generate):
+        """Async variant; `generate` is a coroutine function. SQLite runs in a thread."""
+        async def _load():
+            value = await asyncio.to_thread(self._db_get, key) if self.path else None
+            if value is None:
+                value = await generate()
+                if self.path:
+                    await asyncio.to_thread(self._db_put, key, value)
+            return value
+        return await self.get_or_load_async(key, _load)
+
+    def peek(self, key):
+        """Fresh cached insight from either tier without generating one, else None."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and time.monotonic() - entry[1] < self.ttl:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+        row = self._db_row(key)
+        if row is None:
+            return None
+        # Keep the row's age so it expires when the DB row does
+        super().put(key, row[0], age=max(time.time() - row[1], 0.0))
+        return row[0]
+
+    def put(self, key, value):
+        """Store an insight produced outside get_or_generate (e.g. streamed) in both tiers."""
+        super().put(key, value)
+        self._db_put(key, value)
+
+    def invalidate(self, key=None):
+        super().invalidate(key)
+        if not self.path:
+            return
+        with self._db_lock:
+            if key is None:
+                self._conn().execute("DELETE FROM insights")
+            else:
+                self._conn().execute("DELETE FROM insights WHERE key = ?", (key,))
+
+    def close(self):
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self):
+        stats = super().stats()
+        stats.update({"persistent": bool(self.path), "db_hits": self.db_hits, "db_errors": self.db_errors})
+        return stats
+
+
+insight_cache = register_cache("llm_insights", InsightCache(
+    maxsize=int(os.getenv("INSIGHT_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("INSIGHT_CACHE_TTL", "900")),
+    path=os.getenv("INSIGHT_CACHE_DB")
+))
@@ -0,0 +1,576 @@
+"""
+Local Routing Engine
+In-process driving routes over a preprocessed Mumbai drive graph, so route
+requests do not depend on the public OSRM server.
+
+The osmnx graph is flattened once (build_graph) into CSR adjacency arrays
+saved as .npz: per-edge head node, length, free-flow speed, travel time,
+street name and geometry. Queries snap the endpoints to the nearest nodes
+and run a bidirectional A* search; alternatives come from re-searching
+with the edges of earlier routes penalized. Given an EdgeCostTable
+(edge_costs), the search runs time-dependently on forecast travel times.
+
+The A* bounds are ALT (landmarks + triangle inequality): free-flow travel
+times from and to ROUTING_LANDMARKS landmarks, chosen by farthest-point
+selection, are computed once per graph (scipy's C Dijkstra) and saved with
+it. Penalties and congestion only make edges slower, so the free-flow bounds
+stay admissible for every search. On large graphs they settle far fewer
+nodes than the straight-line bound (see bench_routing.py).
+
+Searches are pure Python and hold the GIL while they run. On the
+benchmark's 40k-node grid a free-flow best path takes ~6 ms p50 / 9 ms p95;
+each alternative is another search (k=3: ~27 / 98 ms), and forecast-timed
+searches, where peak-hour costs leave the free-flow bounds loose, take
+~23 / 143 ms for the best path alone. /api/route therefore searches only the
+best path unless the request asks for alternatives, and caches the results.
+
+Routes are returned in the route_cache entry format, so expand_routes()
+turns them into the get_osrm_route return shape and the API caches them
+alongside OSRM responses (timed routes keyed by traffic_key as well).
+
+Build the graph (uses the osmnx cache in ./cache when present):
+    python -m src.local_router "Mumbai, India"
+"""
+import heapq
+import math
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+
+try:
+    from src.model_registry import registry
+    from src.edge_costs import BUCKET_SECONDS, cost_table, hourly_load
+    from src.log import get_logger
+except ImportError:
+    from model_registry import registry
+    from edge_costs import BUCKET_SECONDS, cost_table, hourly_load
+    from log import get_logger
+
+logger = get_logger(__name__)
+
+GRAPH_PATH = os.getenv("ROUTING_GRAPH_PATH", "mumbai_drive_graph.npz")
+# Landmarks precomputed per graph (0 disables ALT) and used per query
+LANDMARKS = int(os.getenv("ROUTING_LANDMARKS", "16"))
+ACTIVE_LANDMARKS = 4
+
+# Free-flow speeds (km/h) by OSM highway class when maxspeed is missing
+_HIGHWAY_SPEEDS = {
+    "motorway": 80, "motorway_link": 50,
+    "trunk": 60, "trunk_link": 40,
+    "primary": 45, "primary_link": 35,
+    "secondary": 40, "secondary_link": 30,
+    "tertiary": 35, "tertiary_link": 25,
+    "unclassified": 25, "residential": 25,
+    "living_street": 15, "service": 15
+}
+_DEFAULT_SPEED = 30.0
+_EARTH_RADIUS_M = 6371000.0
+
+
+def _first(value):
+    return value[0] if isinstance(value, list) else value
+
+
+def _edge_speed(data):
+    try:
+        speed = float(str(_first(data.get("maxspeed"))).split()[0])
+        if speed > 0:
+            return speed
+    except (TypeError, ValueError, IndexError):
+        pass
+    return float(_HIGHWAY_SPEEDS.get(_first(data.get("highway")), _DEFAULT_SPEED))
+
+
+class RoadGraph:
+    """
+    CSR road graph plus the search routines.
+
+    Arrays (E = edges, N = nodes):
+        lat, lon: node coordinates (N)
+        indptr: (N + 1) offsets into the edge arrays, edges sorted by tail
+        tail, head: edge endpoints (E)
+        length: metres (E), speed: km/h (E), travel: seconds (E)
+        name_idx: index into names (E), -1 when unnamed
+        geom_ptr: (E + 1) offsets into geom, geom: (G, 2) float32 [lon, lat]
+        landmarks: (L) node ids; lm_from, lm_to: (L, N) float32 free-flow
+            seconds from / to each landmark (NaN when unreachable)
+    """
+    ARRAYS = ("lat", "lon", "indptr", "tail", "head", "length", "speed", "travel",
+              "name_idx", "names", "geom_ptr", "geom")
+    LANDMARK_ARRAYS = ("landmarks", "lm_from", "lm_to")
+
+    def __init__(self, landmarks=LANDMARKS, **arrays):
+        for key in self.ARRAYS:
+            setattr(self, key, arrays[key])
+        self.n_nodes = len(self.lat)
+        self.n_edges = len(self.head)
+
+        # Reverse adjacency (edges grouped by head) for the backward search
+        order = np.argsort(self.head, kind="stable")
+        self.rev_edge = order.astype(np.int32)
+        self.rev_indptr = np.concatenate([[0], np.cumsum(np.bincount(self.head, minlength=self.n_nodes))])
+
+        # Local equirectangular projection (metres) for snapping and the A* bound
+        self.lat0 = float(np.mean(self.lat)) if self.n_nodes else 0.0
+        k = math.radians(1) * _EARTH_RADIUS_M
+        self.x = self.lon * (k * math.cos(math.radians(self.lat0)))
+        self.y = self.lat * k
+        self.vmax_ms = float(self.speed.max()) / 3.6 if self.n_edges else 1.0
+
+        # Python lists: element access in the search loop is much cheaper than on arrays
+        self._indptr = self.indptr.tolist()
+        self._head = self.head.tolist()
+        self._tail = self.tail.tolist()
+        self._rev_indptr = self.rev_indptr.tolist()
+        self._rev_edge = self.rev_edge.tolist()
+        self._travel = self.travel.tolist()
+
+        if all(key in arrays for key in self.LANDMARK_ARRAYS):
+            for key in self.LANDMARK_ARRAYS:
+                setattr(self, key, arrays[key])
+        else:
+            self.prepare_landmarks(landmarks)
+
+    # --- Construction / persistence ---
+
+    @classmethod
+    def from_networkx(cls, G):
+        """Flatten an osmnx MultiDiGraph; parallel edges keep the fastest one."""
+        node_ids = list(G.nodes)
+        index = {n: i for i, n in enumerate(node_ids)}
+        lat = np.array([G.nodes[n]["y"] for n in node_ids], dtype=np.float64)
+        lon = np.array([G.nodes[n]["x"] for n in node_ids], dtype=np.float64)
+
+        best = {}
+        for u, v, data in G.edges(data=True):
+            speed = _edge_speed(data)
+            length = float(data.get("length", 0.0))
+            travel = length / (speed / 3.6)
+            key = (index[u], index[v])
+            if key not in best or travel < best[key][2]:
+                best[key] = (length, speed, travel, data)
+
+        edges = sorted(best.items())
+        names, name_index = [], {}
+        tail, head, length, speed, travel, name_idx = [], [], [], [], [], []
+        geom_ptr, geom = [0], []
+        for (u, v), (l, s, t, data) in edges:
+            tail.append(u); head.append(v)
+            length.append(l); speed.append(s); travel.append(t)
+            name = _first(data.get("name"))
+            if name:
+                name_idx.append(name_index.setdefault(name, len(names)))
+                if name_idx[-1] == len(names):
+                    names.append(name)
+            else:
+                name_idx.append(-1)
+            line = data.get("geometry")
+            coords = list(line.coords) if line is not None else [(lon[u], lat[u]), (lon[v], lat[v])]
+            geom.extend(coords)
+            geom_ptr.append(len(geom))
+
+        tail = np.array(tail, dtype=np.int32)
+        return cls(
+            lat=lat, lon=lon,
+            indptr=np.concatenate([[0], np.cumsum(np.bincount(tail, minlength=len(node_ids)))]).astype(np.int64),
+            tail=tail, head=np.array(head, dtype=np.int32),
+            length=np.array(length, dtype=np.float32), speed=np.array(speed, dtype=np.float32),
+            travel=np.array(travel, dtype=np.float32), name_idx=np.array(name_idx, dtype=np.int32),
+            names=np.array(names, dtype=str), geom_ptr=np.array(geom_ptr, dtype=np.int64),
+            geom=np.array(geom, dtype=np.float32).reshape(-1, 2)
+        )
+
+    def prepare_landmarks(self, count=LANDMARKS):
+        """
+        Pick `count` landmarks by farthest-point selection on free-flow
+        travel time and compute the distances from and to each of them.
+        """
+        self.landmarks = np.zeros(0, dtype=np.int32)
+        self.lm_from = self.lm_to = np.zeros((0, self.n_nodes), dtype=np.float32)
+        if count <= 0 or self.n_nodes < 2:
+            return
+        from scipy.sparse import csr_matrix
+        from scipy.sparse.csgraph import dijkstra
+
+        # Zero-length edges would vanish from the sparse matrix; a microsecond keeps them
+        weight = np.maximum(self.travel.astype(np.float64), 1e-6)
+        fwd = csr_matrix((weight, self.head, self.indptr), shape=(self.n_nodes, self.n_nodes))
+        centre = int(np.argmin((self.x - self.x.mean()) ** 2 + (self.y - self.y.mean()) ** 2))
+
+        chosen, rows = [], []
+        nearest = dijkstra(fwd, indices=centre)
+        for _ in range(min(count, self.n_nodes)):
+            reach = np.where(np.isfinite(nearest), nearest, -1.0)
+            if chosen:
+                reach[chosen] = -1.0
+            node = int(np.argmax(reach))
+            if reach[node] < 0:
+                break
+            chosen.append(node)
+            rows.append(dijkstra(fwd, indices=node))
+            nearest = rows[-1] if len(rows) == 1 else np.minimum(nearest, rows[-1])
+
+        if not chosen:
+            return
+        to_rows = dijkstra(fwd.T.tocsr(), indices=chosen)
+        self.landmarks = np.array(chosen, dtype=np.int32)
+        self.lm_from, self.lm_to = (
+            np.where(np.isfinite(d), d, np.nan).astype(np.float32).reshape(len(chosen), self.n_nodes)
+            for d in (np.array(rows), to_rows)
+        )
+
+    def save(self, path):
+        tmp = f"{path}.tmp.npz"
+        np.savez(tmp, **{key: getattr(self, key) for key in self.ARRAYS + self.LANDMARK_ARRAYS})
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            graph = cls(**{key: data[key] for key in cls.ARRAYS + cls.LANDMARK_ARRAYS if key in data})
+        if "landmarks" not in data.files and len(graph.landmarks):
+            # Graph saved before landmarks existed: store them for next time
+            try:
+                graph.save(path)
+            except OSError as e:
+                logger.warning("Could not save landmarks to %s: %s", path, e)
+        return graph
+
+    def nbytes(self):
+        return int(sum(getattr(self, key).nbytes for key in self.ARRAYS + self.LANDMARK_ARRAYS))
+
+    # --- Queries ---
+
+    def nearest_node(self, lat, lon):
+        k = math.radians(1) * _EARTH_RADIUS_M
+        px = lon * k * math.cos(math.radians(self.lat0))
+        py = lat * k
+        return int(np.argmin((self.x - px) ** 2 + (self.y - py) ** 2))
+
+    def potential(self, s, t, timed=False):
+        """
+        A* potential for searches from s to t, as a list over nodes.
+
+        h(v) <= d(v, t) is the straight line at the top speed, raised by the
+        ACTIVE_LANDMARKS landmarks that bound d(s, t) best:
+        d(v, t) >= d(L, t) - d(L, v) and d(v, L) - d(t, L). The time-dependent
+        search uses h itself; the bidirectional one (h(v) - h'(v)) / 2, with
+        h'(v) <= d(s, v) bounded the same way.
+        """
+        inv_v = 1.0 / self.vmax_ms
+        to_t = np.hypot(self.x - self.x[t], self.y - self.y[t]) * inv_v
+        from_s = None if timed else np.hypot(self.x - self.x[s], self.y - self.y[s]) * inv_v
+        if len(self.landmarks):
+            # Unreachable entries are NaN, which fmax skips
+            fr, to = self.lm_from, self.lm_to
+            st = np.fmax(fr[:, t].astype(np.float64) - fr[:, s], to[:, s].astype(np.float64) - to[:, t])
+            for i in np.argsort(-np.nan_to_num(st, nan=-np.inf))[:ACTIVE_LANDMARKS].tolist():
+                f, b = fr[i].astype(np.float64), to[i].astype(np.float64)
+                to_t = np.fmax(to_t, np.fmax(f[t] - f, b - b[t]))
+                if not timed:
+                    from_s = np.fmax(from_s, np.fmax(f - f[s], b[s] - b))
+        if timed:
+            return to_t.tolist()
+        return (0.5 * (to_t - from_s)).tolist()
+
+    def shortest_path(self, s, t, weight=None, penalty=None, costs=None, depart=0.0, potential=None):
+        """
+        Bidirectional A* from node s to node t.
+
+        Uses the symmetric (average) potential p(v) = (h(v, t) - h(s, v)) / 2
+        with the ALT bounds as h, so both searches work on the same
+        non-negative reduced costs and stop once the two frontiers' keys add
+        up to the best meeting cost.
+
+        Args:
+            weight: Per-edge cost list, at least the free-flow travel seconds
+                (the default)
+            penalty: Optional {edge: factor} multipliers >= 1 (alternative routes)
+            costs: Optional EdgeCostTable; searches time-dependently from
+                `depart` (seconds after midnight) instead
+            potential: self.potential(s, t, timed=costs is not None), when
+                the caller searches s -> t repeatedly
+
+        Returns:
+            (cost, [edge ids]) or None when t is unreachable
+        """
+        if s == t:
+            return 0.0, []
+        pot = potential or self.potential(s, t, timed=costs is not None)
+        if costs is not None:
+            return self._time_dependent_path(s, t, costs, depart, penalty or {}, pot)
+        weight = self._travel if weight is None else weight
+        penalty = penalty or {}
+        indptr, head, tail = self._indptr, self._head, self._tail
+        rindptr, redge = self._rev_indptr, self._rev_edge
+        inf = float("inf")
+
+        g_f, g_r = {s: 0.0}, {t: 0.0}
+        pred_f, pred_r = {s: -1}, {t: -1}
+        heap_f, heap_r = [(pot[s], s)], [(-pot[t], t)]
+        done_f, done_r = set(), set()
+        best, meet = inf, -1
+
+        while heap_f and heap_r:
+            if heap_f[0][0] + heap_r[0][0] >= best:
+                break
+            if heap_f[0][0] <= heap_r[0][0]:
+                _, u = heapq.heappop(heap_f)
+                if u in done_f:
+                    continue
+                done_f.add(u)
+                gu = g_f[u]
+                for e in range(indptr[u], indptr[u + 1]):
+                    v = head[e]
+                    g = gu + weight[e] * penalty.get(e, 1.0)
+                    if g < g_f.get(v, inf):
+                        g_f[v] = g
+                        pred_f[v] = e
+                        heapq.heappush(heap_f, (g + pot[v], v))
+                        if v in g_r and g + g_r[v] < best:
+                            best, meet = g + g_r[v], v
+            else:
+                _, u = heapq.heappop(heap_r)
+                if u in done_r:
+                    continue
+                done_r.add(u)
+                gu = g_r[u]
+                for j in range(rindptr[u], rindptr[u + 1]):
+                    e = redge[j]
+                    v = tail[e]
+                    g = gu + weight[e] * penalty.get(e, 1.0)
+                    if g < g_r.get(v, inf):
+                        g_r[v] = g
+                        pred_r[v] = e
+                        heapq.heappush(heap_r, (g - pot[v], v))
+                        if v in g_f and g + g_f[v] < best:
+                            best, meet = g + g_f[v], v
+
+        if meet < 0:
+            return None
+
+        edges = []
+        v = meet
+        while pred_f[v] >= 0:
+            e = pred_f[v]
+            edges.append(e)
+            v = tail[e]
+        edges.reverse()
+        v = meet
+        while pred_r[v] >= 0:
+            e = pred_r[v]
+            edges.append(e)
+            v = head[e]
+        return best, edges
+
+    def _time_dependent_path(self, s, t, costs, depart, penalty, to_t):
+        """
+        A* on arrival time: an edge entered at time T costs its entry in
+        the cost table's bucket for T. Congestion only slows edges down, so
+        the free-flow bounds `to_t` stay admissible.
+        Arrival times exclude the alternative-route penalties.
+        """
+        indptr, head, tail = self._indptr, self._head, self._tail
+        inf = float("inf")
+        rows = {}
+
+        g, arrival, pred = {s: 0.0}, {s: 0.0}, {s: -1}
+        heap = [(to_t[s], s)]
+        done = set()
+        while heap:
+            _, u = heapq.heappop(heap)
+            if u in done:
+                continue
+            if u == t:
+                break
+            done.add(u)
+            gu, au = g[u], arrival[u]
+            b = costs.bucket(depart + au)
+            row = rows.get(b)
+            if row is None:
+                row = rows[b] = costs.row(b)
+            for e in range(indptr[u], indptr[u + 1]):
+                v = head[e]
+                cost = row[e]
+                gv = gu + cost * penalty.get(e, 1.0)
+                if gv < g.get(v, inf):
+                    g[v] = gv
+                    arrival[v] = au + cost
+                    pred[v] = e
+                    heapq.heappush(heap, (gv + to_t[v], v))
+
+        if t not in pred:
+            return None
+        edges = []
+        v = t
+        while pred[v] >= 0:
+            e = pred[v]
+            edges.append(e)
+            v = tail[e]
+        edges.reverse()
+        return g[t], edges
+
+    def alternatives(self, s, t, k=3, weight=None, penalty_factor=1.4, max_overlap=0.7, costs=None, depart=0.0):
+        """
+        Up to k routes from s to t: the optimum, then re-searches with the
+        edges of every route found so far penalized. Candidates sharing more
+        than `max_overlap` of their length with an accepted route are dropped.
+
+        Returns:
+            List of edge-id lists, best first
+        """
+        found, shared = [], set()
+        penalty = {}
+        potential = self.potential(s, t, timed=costs is not None) if s != t else None
+        for _ in range(2 * k):
+            result = self.shortest_path(s, t, weight=weight, penalty=penalty, costs=costs,
+                                        depart=depart, potential=potential)
+            if result is None:
+                break
+            edges = result[1]
+            total = float(self.length[edges].sum()) if edges else 0.0
+            overlap = float(self.length[[e for e in edges if e in shared]].sum()) if found else 0.0
+            if not found or (total > 0 and overlap / total <= max_overlap):
+                found.append(edges)
+                shared.update(edges)
+                if len(found) == k:
+                    break
+            for e in edges:
+                penalty[e] = penalty.get(e, 1.0) * penalty_factor
+            if not edges:
+                break
+        return found
+
+    def route_entry(self, edges, s, travel=None):
+        """
+        Build a route_cache entry (coords / duration / distance km / legs)
+        for an edge path starting at node s. `travel` overrides per-edge
+        durations (e.g. time-dependent costs).
+        """
+        edges = np.asarray(edges, dtype=np.int64)
+        if len(edges) == 0:
+            coords = np.array([[self.lon[s], self.lat[s]]], dtype=np.float32)
+        else:
+            parts = [self.geom[self.geom_ptr[e]:self.geom_ptr[e + 1]] for e in edges]
+            # Consecutive edges share an endpoint; keep it once
+            coords = np.concatenate([parts[0]] + [part[1:] for part in parts[1:]])
+        durations = self.travel[edges].astype(np.float64) if travel is None else np.asarray(travel, dtype=np.float64)
+        lengths = self.length[edges].astype(np.float64)
+
+        # One step per run of edges on the same street
+        steps = []
+        if len(edges):
+            names = self.name_idx[edges]
+            starts = np.flatnonzero(np.r_[True, names[1:] != names[:-1]])
+            bounds = np.r_[starts, len(edges)]
+            for a, b in zip(bounds[:-1], bounds[1:]):
+                e = int(edges[a])
+                name_id = int(names[a])
+                steps.append({
+                    "distance": float(lengths[a:b].sum()),
+                    "duration": float(durations[a:b].sum()),
+                    "name": str(self.names[name_id]) if name_id >= 0 else "",
+                    "maneuver": {"location": [float(self.lon[self.tail[e]]), float(self.lat[self.tail[e]])]}
+                })
+
+        duration = float(durations.sum())
+        distance_m = float(lengths.sum())
+        return {
+            "coords": np.ascontiguousarray(coords, dtype=np.float32),
+            "duration": duration,
+            "distance": distance_m / 1000,
+            "legs": [{
+                "distance": distance_m,
+                "duration": duration,
+                "summary": "",
+                "steps": steps,
+                "annotation": {
+                    "distance": lengths.tolist(),
+                    "duration": durations.tolist(),
+                    "speed": np.divide(lengths, durations, out=np.zeros_like(lengths), where=durations > 0).tolist()
+                }
+            }]
+        }
+
+    def routes(self, start_lat, start_lon, dest_lat, dest_lon, k=3, costs=None, depart=0.0):
+        """
+        Up to k route_cache entries between two coordinates, best first.
+
+        With an EdgeCostTable, routes are chosen and timed for a departure
+        `depart` seconds after midnight, and each entry also carries its
+        free-flow duration ("free_flow_duration").
+        """
+        s = self.nearest_node(start_lat, start_lon)
+        t = self.nearest_node(dest_lat, dest_lon)
+        entries = []
+        for edges in self.alternatives(s, t, k=k, costs=costs, depart=depart):
+            if costs is None:
+                entries.append(self.route_entry(edges, s))
+                continue
+            entry = self.route_entry(edges, s, travel=costs.edge_times(edges, depart))
+            entry["free_flow_duration"] = float(self.travel[edges].astype(np.float64).sum())
+            entries.append(entry)
+        return entries
+
+
+registry.register("road_graph", [GRAPH_PATH], RoadGraph.load, size_fn=lambda g: g.nbytes())
+
+
+def get_graph():
+    """The shared RoadGraph, or None when no preprocessed graph is available."""
+    return registry.get("road_graph")
+
+
+def local_routes(start_lat, start_lon, dest_lat, dest_lon, k=3):
+    """
+    Route entries from the local engine (empty list when no graph is
+    loaded or the destination is unreachable).
+    """
+    graph = get_graph()
+    if graph is None:
+        return []
+    return graph.routes(start_lat, start_lon, dest_lat, dest_lon, k=k)
+
+
+def traffic_routes(start_lat, start_lon, dest_lat, dest_lon, prediction=None, depart_hour=None, k=3):
+    """
+    Forecast-aware route entries: edge costs come from the hourly congestion
+    forecast in `prediction` (get_prediction_data response) and routes are
+    timed for a departure at `depart_hour` (defaults to the current local
+    hour). Without a prediction, costs follow the typical demand curve.
+    Empty list when no graph is loaded.
+    """
+    graph = get_graph()
+    if graph is None:
+        return []
+    depart_hour, load = traffic_key(prediction, depart_hour)
+    costs = cost_table(graph, np.frombuffer(load))
+    return graph.routes(start_lat, start_lon, dest_lat, dest_lon, k=k,
+                        costs=costs, depart=depart_hour * BUCKET_SECONDS)
+
+
+def traffic_key(prediction=None, depart_hour=None):
+    """
+    (departure hour, hourly load bytes): everything traffic_routes' result
+    depends on besides the endpoints, for use in cache keys.
+    """
+    if depart_hour is None:
+        # Not the prediction's hour: that is a fixed value in the model inputs
+        depart_hour = datetime.now().hour
+    return float(depart_hour), np.round(hourly_load(prediction), 3).tobytes()
+
+
+def build_graph(place="Mumbai, India", path=GRAPH_PATH):
+    """Download (or read from the osmnx cache) the drive graph and save the CSR arrays."""
+    import osmnx as ox
+    G = ox.graph_from_place(place, network_type="drive")
+    graph = RoadGraph.from_networkx(G)
+    graph.save(path)
+    logger.info("Saved %s nodes / %s edges to %s (%.1f MB)", graph.n_nodes, graph.n_edges, path, graph.nbytes() / 1e6)
+    return graph
+
+
+if __name__ == "__main__":
+    build_graph(sys.argv[1] if len(sys.argv) > 1 else "Mumbai, India")
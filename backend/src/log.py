@@ -0,0 +1,203 @@
+"""
+Structured Logging
+Leveled, sampled, non-blocking logs for the API and the pipeline scripts.
+
+    logger = get_logger(__name__)
+    logger.debug("OSRM request %s", path)                  # free when DEBUG is off
+    logger.info("Cache refreshed", extra={"sample": 0.1})  # keep ~10% of these
+
+- Callers only enqueue records (QueueHandler); one QueueListener thread
+  encodes and writes them, so a slow terminal or log shipper never blocks
+  a request. When the queue is full, records are dropped and counted.
+- LOG_LEVEL sets the level (default INFO). Pass %-style arguments rather
+  than f-strings: a disabled level then costs one integer comparison.
+- extra={"sample": p} keeps a record with probability p (the rate is kept
+  in the output so counts can be scaled back). LOG_SAMPLE_DEBUG sets a
+  default rate for debug records.
+- LOG_FORMAT=json writes one JSON object per line (ts, level, logger, msg,
+  request_id and any extra fields); LOG_FORMAT=text writes the bare
+  message, prefixed with the level unless it is INFO. The default is text
+  on a terminal and JSON otherwise.
+- RequestIdMiddleware tags every record logged while serving a request
+  with its X-Request-ID (taken from the request or generated).
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "auto").lower()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_SAMPLE_DEBUG = float(os.getenv("LOG_SAMPLE_DEBUG", "1.0"))
+
+ROOT = "traffic"
+
+_request_id = ContextVar("request_id", default=None)
+_REQUEST_ID_RE = re.compile(r"^[\w.\-:]{1,128}$")
+# LogRecord attributes that are not user-supplied `extra` fields
+_RESERVED = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "request_id", "asctime"}
+
+_configured = False
+_config_lock = threading.Lock()
+_listener = None
+_handler = None
+
+
+class _Sampler(logging.Filter):
+    # Runs in the caller's thread, before the record is queued
+    def filter(self, record):
+        rate = getattr(record, "sample", None)
+        if rate is None:
+            if record.levelno != logging.DEBUG or LOG_SAMPLE_DEBUG >= 1.0:
+                return True
+            rate = record.sample = LOG_SAMPLE_DEBUG
+        return rate >= 1.0 or random.random() < rate
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Merge the arguments now (they may change after the call returns) and
+        # capture the request id from the caller's context; encoding and
+        # writing happen on the listener thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        record.request_id = _request_id.get()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; `extra` fields are included as keys."""
+    def format(self, record):
+        doc = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        if getattr(record, "request_id", None):
+            doc["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RESERVED:
+                doc[key] = value
+        if record.exc_text:
+            doc["exc"] = record.exc_text
+        return json.dumps(doc, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """The bare message for INFO, `[LEVEL] message` otherwise."""
+    def format(self, record):
+        text = record.getMessage()
+        if record.levelno != logging.INFO:
+            text = f"[{record.levelname}] {text}"
+        if record.exc_text:
+            text = f"{text}\n{record.exc_text}"
+        return text
+
+
+def _use_json():
+    if LOG_FORMAT in ("json", "text"):
+        return LOG_FORMAT == "json"
+    return not (hasattr(sys.stdout, "isatty") and sys.stdout.isatty())
+
+
+def configure():
+    """Attach the queue handler and start the listener (idempotent)."""
+    global _configured, _listener, _handler
+    if _configured:
+        return
+    with _config_lock:
+        if _configured:
+            return
+        out = logging.StreamHandler(sys.stdout)
+        out.setFormatter(JsonFormatter() if _use_json() else TextFormatter())
+        q = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        _handler = _NonBlockingQueueHandler(q)
+        _handler.addFilter(_Sampler())
+        root = logging.getLogger(ROOT)
+        root.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
+        root.addHandler(_handler)
+        root.propagate = False
+        _listener = QueueListener(q, out)
+        _listener.start()
+        atexit.register(shutdown)
+        _configured = True
+
+
+def shutdown():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    with _config_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def get_logger(name):
+    """Logger under the shared "traffic" hierarchy, configuring it on first use."""
+    configure()
+    return logging.getLogger(f"{ROOT}.{name}")
+
+
+def log_stats():
+    return {"dropped": _handler.dropped if _handler is not None else 0}
+
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware: binds the request's X-Request-ID (or a new one) for
+    everything logged while serving it and echoes it in the response.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == b"x-request-id":
+                value = value.decode("latin-1")
+                if _REQUEST_ID_RE.match(value):
+                    request_id = value
+                break
+        request_id = request_id or uuid.uuid4().hex
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        token = _request_id.set(request_id)
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            _request_id.reset(token)
@@ -0,0 +1,147 @@
+"""
+Model Registry
+Loads model artifacts once per process and shares them across the API.
+Entries are hot-swapped when their files change on disk.
+"""
+import os
+import threading
+import time
+
+try:
+    from src.telemetry import observe
+    from src.log import get_logger
+except ImportError:
+    from telemetry import observe
+    from log import get_logger
+
+logger = get_logger(__name__)
+
+
+class ModelEntry:
+    """
+    A loaded artifact plus the bookkeeping needed to detect changes on disk.
+    """
+    def __init__(self, value, signature, load_time_s, memory_bytes):
+        self.value = value
+        self.signature = signature
+        self.load_time_s = load_time_s
+        self.memory_bytes = memory_bytes
+        self.loaded_at = time.time()
+
+
+class ModelRegistry:
+    """
+    Process-wide store of loaded models keyed by name.
+
+    Each registered model is described by the files it is built from and a
+    loader callable taking those paths. Readers always see a fully built
+    value: reloads build the replacement first and then swap the reference.
+    """
+    def __init__(self, check_interval=2.0):
+        self.check_interval = check_interval
+        self._specs = {}
+        self._entries = {}
+        self._last_check = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, paths, loader, size_fn=None):
+        """
+        Register a model.
+
+        Args:
+            name: Registry key (e.g. "traffic_lstm")
+            paths: List of files the model is built from
+            loader: Callable invoked as loader(*paths), returns the model object
+            size_fn: Optional callable(value) -> bytes held in memory.
+                     Defaults to the combined size of the files on disk.
+        """
+        with self._lock:
+            self._specs[name] = (list(paths), loader, size_fn)
+            self._locks.setdefault(name, threading.Lock())
+
+    def _signature(self, paths):
+        sig = []
+        for p in paths:
+            try:
+                st = os.stat(p)
+            except OSError:
+                return None
+            sig.append((p, st.st_mtime_ns, st.st_size))
+        return tuple(sig)
+
+    def _load(self, name, signature):
+        paths, loader, size_fn = self._specs[name]
+        start = time.perf_counter()
+        value = loader(*paths)
+        load_time = time.perf_counter() - start
+        observe(f"model_load_{name}", load_time)
+
+        if size_fn is not None:
+            memory_bytes = size_fn(value)
+        else:
+            memory_bytes = sum(s[2] for s in signature)
+
+        entry = ModelEntry(value, signature, load_time, memory_bytes)
+        self._entries[name] = entry  # Atomic reference swap
+        logger.info("Model '%s' loaded in %.1f ms", name, load_time * 1000)
+        return entry
+
+    def get(self, name):
+        """
+        Return the loaded model for `name`, or None if it cannot be loaded.
+        Reloads it if its files changed since the last load.
+        """
+        if name not in self._specs:
+            raise KeyError(f"Model '{name}' is not registered")
+
+        entry = self._entries.get(name)
+        now = time.monotonic()
+        if entry is not None and now - self._last_check.get(name, 0.0) < self.check_interval:
+            return entry.value
+
+        self._last_check[name] = now
+        signature = self._signature(self._specs[name][0])
+        if signature is None:
+            # Files missing: keep serving what we have (if anything)
+            return entry.value if entry else None
+        if entry is not None and entry.signature == signature:
+            return entry.value
+
+        with self._locks[name]:
+            # Another thread may have finished the reload while we waited
+            current = self._entries.get(name)
+            if current is not None and current.signature == signature:
+                return current.value
+            try:
+                return self._load(name, signature).value
+            except Exception as e:
+                logger.warning("Loading model '%s' failed: %s", name, e)
+                return current.value if current else None
+
+    def preload(self):
+        """Load every registered model. Called once at application startup."""
+        for name in list(self._specs):
+            if self.get(name) is None:
+                logger.warning("Model '%s' not available (missing files)", name)
+
+    def stats(self):
+        """
+        Returns:
+            dict: {name: {loaded, load_time_ms, memory_bytes, loaded_at, files}}
+        """
+        out = {}
+        for name, (paths, _, _) in self._specs.items():
+            entry = self._entries.get(name)
+            out[name] = {
+                "loaded": entry is not None,
+                "load_time_ms": round(entry.load_time_s * 1000, 2) if entry else None,
+                "memory_bytes": int(entry.memory_bytes) if entry else None,
+                "loaded_at": entry.loaded_at if entry else None,
+                "files": paths
+            }
+        return out
+
+
+# Shared instance used by predict.py, ml_integration.py and the API
+registry = ModelRegistry()
@@ -0,0 +1,315 @@
+"""
+POI Index
+Preloaded amenities (fuel, charging_station, parking) for station lookups
+along a route, so requests never query Overpass.
+
+The index is built off the request path (refresh_pois / PoiRefresher) from
+a local OSM XML extract (POI_EXTRACT_PATH) when configured, else osmnx for
+POI_PLACE (served from its cache/ folder for repeated queries), falling back
+to the Overpass JSON already in cache/ when offline. It is saved as compact
+.npz arrays; on load a haversine BallTree is built over the points. A
+corridor query radius-searches the tree from points sampled along the route,
+then measures exact distances to the route polyline for the candidates.
+
+Build once by hand:
+    python -m src.poi_index
+"""
+import glob
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+from sklearn.neighbors import BallTree
+
+try:
+    from src.model_registry import registry
+    from src.corridor import Corridor, EARTH_RADIUS_KM
+    from src.log import get_logger
+except ImportError:
+    from model_registry import registry
+    from corridor import Corridor, EARTH_RADIUS_KM
+    from log import get_logger
+
+logger = get_logger(__name__)
+
+AMENITIES = ("fuel", "charging_station", "parking")
+POI_INDEX_PATH = os.getenv("POI_INDEX_PATH", "mumbai_pois.npz")
+POI_EXTRACT_PATH = os.getenv("POI_EXTRACT_PATH")
+POI_CACHE_DIR = os.getenv("POI_CACHE_DIR", "cache")
+POI_PLACE = os.getenv("POI_PLACE", "Mumbai, India")
+
+_UNNAMED = {
+    "fuel": "Unnamed Fuel Station",
+    "charging_station": "Unnamed EV Charger",
+    "parking": "Unnamed Parking"
+}
+
+
+def _poi_name(amenity, tags):
+    name = tags.get("name")
+    if isinstance(name, str) and name:
+        return name
+    operator = tags.get("operator")
+    if amenity == "charging_station" and isinstance(operator, str) and operator:
+        return f"{operator} Charging Point"
+    return _UNNAMED[amenity]
+
+
+def pois_from_overpass(paths):
+    """
+    Amenity POIs from Overpass JSON responses (the osmnx cache format).
+    Ways are placed at their "center" when present, else at the mean of
+    their nodes found in the same responses.
+
+    Returns:
+        List of (amenity, name, lat, lon)
+    """
+    nodes, tagged = {}, []
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if not isinstance(data, dict):
+            continue  # Nominatim responses share the cache folder
+        for el in data.get("elements", []):
+            if el.get("type") == "node" and "lat" in el:
+                nodes[el["id"]] = (el["lat"], el["lon"])
+            if el.get("tags", {}).get("amenity") in AMENITIES:
+                tagged.append(el)
+
+    pois, seen = [], set()
+    for el in tagged:
+        key = (el["type"], el["id"])
+        if key in seen:
+            continue
+        seen.add(key)
+        if "lat" in el:
+            lat, lon = el["lat"], el["lon"]
+        elif "center" in el:
+            lat, lon = el["center"]["lat"], el["center"]["lon"]
+        else:
+            points = [nodes[n] for n in el.get("nodes", []) if n in nodes]
+            if not points:
+                continue
+            lat, lon = np.mean(points, axis=0)
+        amenity = el["tags"]["amenity"]
+        pois.append((amenity, _poi_name(amenity, el["tags"]), float(lat), float(lon)))
+    return pois
+
+
+def pois_from_features(gdf):
+    """Amenity POIs from an osmnx features GeoDataFrame (polygons at an interior point)."""
+    if gdf is None or gdf.empty:
+        return []
+    points = gdf.geometry.representative_point()
+    pois = []
+    for amenity, tags, point in zip(gdf["amenity"], gdf.to_dict("records"), points):
+        if amenity not in AMENITIES:
+            continue
+        tags = {k: v for k, v in tags.items() if isinstance(v, str)}
+        pois.append((amenity, _poi_name(amenity, tags), float(point.y), float(point.x)))
+    return pois
+
+
+class PoiStore:
+    """
+    Amenity POIs as arrays plus a BallTree over them.
+
+    Arrays (P = POIs):
+        lat, lon: float64 (P)
+        kind: int8 index into AMENITIES (P)
+        name_idx: int32 index into names (P)
+    """
+    ARRAYS = ("lat", "lon", "kind", "name_idx", "names")
+
+    def __init__(self, **arrays):
+        for key in self.ARRAYS:
+            setattr(self, key, arrays[key])
+        self.tree = BallTree(np.radians(np.column_stack([self.lat, self.lon])), metric="haversine") if len(self.lat) else None
+
+    @classmethod
+    def from_pois(cls, pois):
+        """Build from (amenity, name, lat, lon) tuples."""
+        pois = sorted(pois, key=lambda p: p[2])
+        names, name_index = [], {}
+        name_idx = []
+        for _, name, _, _ in pois:
+            if name not in name_index:
+                name_index[name] = len(names)
+                names.append(name)
+            name_idx.append(name_index[name])
+        kinds = {amenity: i for i, amenity in enumerate(AMENITIES)}
+        return cls(
+            lat=np.array([p[2] for p in pois], dtype=np.float64),
+            lon=np.array([p[3] for p in pois], dtype=np.float64),
+            kind=np.array([kinds[p[0]] for p in pois], dtype=np.int8),
+            name_idx=np.array(name_idx, dtype=np.int32),
+            names=np.array(names, dtype=str)
+        )
+
+    def save(self, path):
+        tmp = f"{path}.tmp.npz"
+        np.savez(tmp, **{key: getattr(self, key) for key in self.ARRAYS})
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(**{key: data[key] for key in cls.ARRAYS})
+
+    def __len__(self):
+        return len(self.lat)
+
+    def nbytes(self):
+        return int(sum(getattr(self, key).nbytes for key in self.ARRAYS))
+
+    def counts(self):
+        return {amenity: int(n) for amenity, n in zip(AMENITIES, np.bincount(self.kind, minlength=len(AMENITIES)))}
+
+    def along_route(self, route_coords, radius_km=2.0, amenities=AMENITIES):
+        """
+        POIs within `radius_km` of a route.
+
+        Args:
+            route_coords: (N, 2) route geometry, [lon, lat] rows
+            radius_km: Corridor half-width
+            amenities: Amenity types to return
+
+        Returns:
+            {amenity: [{name, distance, along_km, lat, lon}, ...]} sorted by
+            distance from the route (km)
+        """
+        out = {amenity: [] for amenity in amenities}
+        route = np.asarray(route_coords, dtype=np.float64).reshape(-1, 2)
+        if len(self) == 0 or len(route) == 0:
+            return out
+
+        # Anything within radius of the route is within 1.5 radius of a
+        # sample taken every `radius_km` along it
+        corridor = Corridor(route)
+        lats, lons = corridor.sample(radius_km)
+        hits = self.tree.query_radius(np.radians(np.column_stack([lats, lons])),
+                                      r=1.5 * radius_km * 1.01 / EARTH_RADIUS_KM)
+        cand = np.unique(np.concatenate(hits))
+        cand = cand[np.isin(self.kind[cand], [AMENITIES.index(a) for a in amenities])]
+        if len(cand) == 0:
+            return out
+
+        dist, along = corridor.project(self.lat[cand], self.lon[cand])
+        keep = dist <= radius_km
+        order = np.argsort(dist[keep], kind="stable")
+        cand = cand[keep][order]
+        rows = zip(self.kind[cand].tolist(), self.names[self.name_idx[cand]].tolist(),
+                   np.round(dist[keep][order], 3).tolist(), np.round(along[keep][order], 2).tolist(),
+                   self.lat[cand].tolist(), self.lon[cand].tolist())
+        for kind, name, d, a, lat, lon in rows:
+            out[AMENITIES[kind]].append({"name": name, "distance": d, "along_km": a, "lat": lat, "lon": lon})
+        return out
+
+
+registry.register("poi_index", [POI_INDEX_PATH], PoiStore.load, size_fn=lambda s: s.nbytes())
+
+
+def get_poi_store():
+    """The shared PoiStore, or None when the index has not been built yet."""
+    return registry.get("poi_index")
+
+
+def refresh_pois(path=POI_INDEX_PATH, extract=POI_EXTRACT_PATH, cache_dir=POI_CACHE_DIR, place=POI_PLACE):
+    """
+    Rebuild the POI index and swap it in (the registry reloads it on the
+    next lookup). Sources: the OSM extract when given, else osmnx for
+    `place` (answered from its cache folder when the query was seen before),
+    else whatever amenities the cached Overpass JSON holds.
+
+    Returns:
+        The new PoiStore
+    """
+    tags = {"amenity": list(AMENITIES)}
+    if extract and os.path.exists(extract):
+        import osmnx as ox
+        pois = pois_from_features(ox.features_from_xml(extract, tags=tags))
+    else:
+        try:
+            import osmnx as ox
+            pois = pois_from_features(ox.features_from_place(place, tags=tags))
+        except Exception as e:
+            logger.warning("POI download failed (%s); reading cached Overpass responses", e)
+            pois = pois_from_overpass(glob.glob(os.path.join(cache_dir, "*.json")))
+    if not pois:
+        # Keep the previous index rather than replacing it with an empty one
+        raise RuntimeError("No amenity POIs found in any source")
+
+    store = PoiStore.from_pois(pois)
+    store.save(path)
+    logger.info("POI index rebuilt: %s -> %s", store.counts(), path)
+    return store
+
+
+class PoiRefresher:
+    """
+    Background job that builds the index when it is missing and rebuilds it
+    every `interval_h` hours (0 disables periodic rebuilds).
+    """
+    def __init__(self, interval_h=24.0):
+        self.interval_h = interval_h
+        self.last_refresh = None
+        self.last_error = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="poi-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def trigger(self):
+        """Request a rebuild now (non-blocking)."""
+        self.start()
+        self._wake.set()
+
+    def _run(self):
+        force = False
+        while not self._stop.is_set():
+            if force or not os.path.exists(POI_INDEX_PATH):
+                try:
+                    refresh_pois()
+                    self.last_refresh = time.time()
+                    self.last_error = None
+                except Exception as e:
+                    self.last_error = str(e)
+                    logger.warning("POI index refresh failed: %s", e)
+            timeout = self.interval_h * 3600 if self.interval_h > 0 else None
+            force = self._wake.wait(timeout) or self.interval_h > 0
+            self._wake.clear()
+
+    def stats(self):
+        store = get_poi_store()
+        return {
+            "loaded": store is not None,
+            "pois": store.counts() if store is not None else {},
+            "last_refresh": self.last_refresh,
+            "last_error": self.last_error,
+            "interval_h": self.interval_h
+        }
+
+
+poi_refresher = PoiRefresher(interval_h=float(os.getenv("POI_REFRESH_HOURS", "24")))
+
+
+if __name__ == "__main__":
+    refresh_pois(extract=sys.argv[1] if len(sys.argv) > 1 else POI_EXTRACT_PATH)
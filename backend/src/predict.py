@@ -6,6 +6,7 @@ import pandas as pd
 import joblib
 import sys
 import os
+from contextlib import nullcontext
 
 # Ensure src is in path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
@@ -15,28 +16,41 @@ from src.novelty_engine import HybridNoveltyEngine
 from src.train_lstm import AdvancedTrafficLSTM
 from src.what_if_simulator import run_what_if_scenario
 from src.bottleneck_detector import predict_future_bottlenecks, detect_bottleneck_formation
-from src.sensor_interface import TrafficSensorNetwork, GPSDataStream
+from src.sensor_gateway import gateway
 
-# Global Cache for Model to avoid reloading
-_MODEL_CACHE = None
+from src.model_registry import registry
+from src.context_cache import get_cache
+from src.telemetry import span
+from src.categorical import encode_label
+from src.forecast_engine import DEFAULT_HORIZONS, horizon_hours, predict_with_horizons, format_step
+from src.log import get_logger
 
-def load_model_cached(device):
-    global _MODEL_CACHE
-    if _MODEL_CACHE:
-        return _MODEL_CACHE
-        
-    if not os.path.exists("lstm_artifacts.pkl") or not os.path.exists("traffic_lstm_model.pth"):
-        return None
-        
-    artifacts = joblib.load("lstm_artifacts.pkl")
+logger = get_logger(__name__)
+
+def _load_lstm(artifacts_path, weights_path):
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    artifacts = joblib.load(artifacts_path)
     input_size = len(artifacts['feature_cols'])
     num_classes = len(artifacts['classes'])
     model = AdvancedTrafficLSTM(input_size, 128, num_classes).to(device)
-    model.load_state_dict(torch.load("traffic_lstm_model.pth", map_location=device))
+    model.load_state_dict(torch.load(weights_path, map_location=device))
     model.eval()
-    
-    _MODEL_CACHE = (model, artifacts)
-    return _MODEL_CACHE
+    return (model, artifacts)
+
+def _lstm_bytes(value):
+    model, _ = value
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+registry.register("traffic_lstm", ["lstm_artifacts.pkl", "traffic_lstm_model.pth"], _load_lstm, size_fn=_lstm_bytes)
+registry.register("novelty_engine", ["novelty_engine.pkl"], joblib.load)
+
+def load_model_cached(device=None):
+    """
+    Returns (model, artifacts) from the shared model registry, or None if the
+    model has not been trained yet.
+    """
+    return registry.get("traffic_lstm")
 
 def simulate_traffic(city, source, dest, modifications):
     """
@@ -54,10 +68,7 @@ def simulate_traffic(city, source, dest, modifications):
     # To keep it self-contained, we fetch live data here similar to get_prediction_data
     
     # ... (Fetch live data logic condensed)
-    sensors = TrafficSensorNetwork(location=f"{city}")
-    gps = GPSDataStream(location=f"{city}")
-    vol = sensors.get_realtime_volume()
-    speed = gps.get_average_speed(vol)
+    vol, speed = gateway.connect(city).latest()
     weather = get_live_weather(city.split(',')[0])
     
     current_params = {
@@ -104,48 +115,61 @@ def check_bottlenecks(city):
     }
 
 # Keep existing functions below...
-def get_prediction_data(city="Mumbai, India", source=None, dest=None):
+# Last prediction per (city, source, dest): the fallback when a request's
+# deadline runs out before the model answers
+_PREDICTION_CACHE = get_cache("predictions", maxsize=256, ttl=900)
+
+def last_prediction(city="Mumbai, India", source=None, dest=None):
+    """Most recent get_prediction_data result for the trip (any age), or None."""
+    return _PREDICTION_CACHE.last_value((city, source, dest))
+
+@span("prediction")
+def get_prediction_data(city="Mumbai, India", source=None, dest=None, horizons=None, context=None, deadline=None):
 # ... (rest of file)
     """
     Core logic to generate traffic predictions.
     Returns a dictionary suitable for API response.
+
+    horizons: Forecast horizons in hours (e.g. [0.25, 0.5, ..., 6]).
+              Defaults to +1h, +2h, +3h. All horizons share one forward pass.
+    context: Optional pre-fetched live context {"weather", "event_score", "events"}
+             (the API fetches it asynchronously); fetched here when omitted.
+    deadline: Optional Deadline; live-context fetches here honour it and the
+              model pass is timed as stage "model".
     """
     device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
     
-    # 1. Load Artifacts & Model
-    if not os.path.exists("lstm_artifacts.pkl") or not os.path.exists("traffic_lstm_model.pth"):
+    # 1. Load Artifacts & Model (shared, loaded once per process)
+    cached = load_model_cached(device)
+    if not cached:
         return {"error": "Model or artifacts not found. Please train the model first."}
-        
-    artifacts = joblib.load("lstm_artifacts.pkl")
+
+    model, artifacts = cached
     scaler = artifacts['scaler']
     encoders = artifacts['encoders']
     feature_cols = artifacts['feature_cols']
     classes = artifacts['classes']
-    
-    input_size = len(feature_cols)
-    num_classes = len(classes)
-    model = AdvancedTrafficLSTM(input_size, 128, num_classes).to(device)
-    model.load_state_dict(torch.load("traffic_lstm_model.pth", map_location=device))
-    model.eval()
 
-    # Load Novelty Engine
-    try:
-        novelty_engine = joblib.load("novelty_engine.pkl")
-    except:
-        novelty_engine = None
+    novelty_engine = registry.get("novelty_engine")
 
     # 2. Fetch Live Context
     city_name = city.split(',')[0]
-    weather = get_live_weather(city_name)
-    event_score = get_event_impact_score(city_name)
-    
-    route_context = {'source': source, 'dest': dest} if source else None
-    events = get_city_events(city_name, context=route_context)
+    if context is not None:
+        weather = context["weather"]
+        event_score = context["event_score"]
+        events = context["events"]
+    else:
+        weather = get_live_weather(city_name, deadline=deadline)
+        event_score = get_event_impact_score(city_name, deadline=deadline)
+        
+        route_context = {'source': source, 'dest': dest} if source else None
+        events = get_city_events(city_name, context=route_context, deadline=deadline)
     event_name = events.get("Details", {}).get("Name", "None")
 
     # 3. Stream Synthesis
-    sensors = TrafficSensorNetwork(location=f"{city} (Central)")
-    gps = GPSDataStream(location=f"{city} (Cluster)")
+    # Pooled connection; the latest samples come from its ring buffer
+    stream = gateway.connect(city)
+    volumes, speeds = stream.window(5)
     
     current_hour = 17 # Mock 5 PM
     seq_data = []
@@ -153,8 +177,8 @@ def get_prediction_data(city="Mumbai, India", source=None, dest=None):
     # Generate Sequence
     for i in range(5):
         h = current_hour - (4-i)
-        real_time_vol = sensors.get_realtime_volume()
-        real_time_speed = gps.get_average_speed(real_time_vol)
+        real_time_vol = volumes[i]
+        real_time_speed = speeds[i]
         
         if event_score > 0.5:
             real_time_vol *= 1.2
@@ -171,13 +195,11 @@ def get_prediction_data(city="Mumbai, India", source=None, dest=None):
         
         # Inject Source/Dest
         if 'origin' in encoders and source:
-            try: row['origin'] = encoders['origin'].transform([source])[0]
-            except: row['origin'] = 0
+            row['origin'] = encode_label(encoders, 'origin', source)
         elif 'origin' in feature_cols: row['origin'] = 0
 
         if 'destination' in encoders and dest:
-            try: row['destination'] = encoders['destination'].transform([dest])[0]
-            except: row['destination'] = 0
+            row['destination'] = encode_label(encoders, 'destination', dest)
         elif 'destination' in feature_cols: row['destination'] = 0
 
         seq_data.append(row)
@@ -201,104 +223,58 @@ def get_prediction_data(city="Mumbai, India", source=None, dest=None):
     else:
         df_seq['NoveltyScore'] = 0.0
         
-    # Preprocessing
+    # Preprocessing (one dictionary lookup instead of a per-row apply)
     if 'WeatherCondition' in encoders:
-        le = encoders['WeatherCondition']
-        df_seq['WeatherCondition'] = df_seq['WeatherCondition'].apply(lambda x: x if x in le.classes_ else le.classes_[0])
-        df_seq['WeatherCondition'] = le.transform(df_seq['WeatherCondition'])
-        
-    X_input_df = df_seq[feature_cols]
-    X_scaled = scaler.transform(X_input_df)
-    X_tensor = torch.tensor(X_scaled, dtype=torch.float32).unsqueeze(0).to(device)
-    
-    # Predict Current
-    with torch.no_grad():
-        output = model(X_tensor)
-        probs = torch.softmax(output, dim=1)
-        conf, pred_idx = torch.max(probs, 1)
-        
-    congestion_level = classes[pred_idx.item()]
-    confidence = conf.item() * 100
+        df_seq['WeatherCondition'] = encode_label(encoders, 'WeatherCondition', weather.get("Condition", "Clear"))
+
+    for c in feature_cols:
+        if c not in df_seq.columns: df_seq[c] = 0.0
+    X_current = df_seq[feature_cols].to_numpy(dtype=np.float64)
+
+    # 4. Future Bottleneck Detection (Forecast at each horizon, default +1, +2, +3 hrs)
+    # We simulate the next steps by sliding the window over projected rows:
+    # time is advanced and sensor stats are drawn for that future time.
+    # (In a real system, we'd have a separate forecaster for Volume/Speed)
+    horizons = list(horizons) if horizons else DEFAULT_HORIZONS
+    next_hours = horizon_hours(current_hour, horizons)
+
+    # Heuristic: Evening Rush Hour Peak (17-19), Morning (8-10), Off-peak otherwise
+    vol_factor = np.where((next_hours >= 17) & (next_hours <= 19), 1.3,
+                          np.where((next_hours >= 8) & (next_hours <= 10), 1.2, 0.8))
+    predicted_vol = stream.sensors.get_realtime_volumes(len(horizons)) * vol_factor
+    predicted_speed = stream.gps.get_average_speeds(predicted_vol)
+
+    # Forecast windows start from the raw sequence (no novelty score), as before
+    X_history = X_current.copy()
+    if 'NoveltyScore' in feature_cols:
+        X_history[:, feature_cols.index('NoveltyScore')] = 0.0
+
+    # Projected rows carry the location/weather context of the last observed row
+    X_future = np.repeat(X_history[-1:], len(horizons), axis=0)
+    X_future[:, feature_cols.index('VehicleCount')] = predicted_vol.astype(int)
+    X_future[:, feature_cols.index('Speed')] = np.round(predicted_speed, 2)
+    X_future[:, feature_cols.index('Hour')] = next_hours
+
+    # Current window + every horizon window in a single forward pass
+    with deadline.stage("model") if deadline is not None else nullcontext(), span("forecast"):
+        probs = predict_with_horizons(model, scaler, X_current, X_history, X_future)
+    pred_idx = probs.argmax(axis=1)
+    conf = probs.max(axis=1)
+
+    congestion_level = classes[pred_idx[0]]
+    confidence = float(conf[0]) * 100
 
-    # 4. Future Bottleneck Detection (Forecast +1, +2, +3 hrs)
-    print("DEBUG: Generating Forecast...")
     forecasts = []
-    future_steps = 3
-    
-    # We will simulate the next steps by sliding the window
-    # For a real autoregressive model, we'd predict features. 
-    # Here, we project time and use the sensor stats for that future time.
-    
-    current_seq_list = seq_data.copy()
-    
-    for step in range(1, future_steps + 1):
-        next_hour = (current_hour + step) % 24
-        
-        # Estimate conditions for next hour
-        # (In a real system, we'd have a separate forecaster for Volume/Speed)
-        # We use the sensor network's implicit periodic patterns (if any) or simple heuristics
-        # For demo: specific bottlenecks might emerge
-        
-        # Heuristic: Evening Rush Hour Peak (17-19)
-        vol_factor = 1.0
-        if 17 <= next_hour <= 19: vol_factor = 1.3
-        elif 8 <= next_hour <= 10: vol_factor = 1.2 # Morning
-        else: vol_factor = 0.8 # Off-peak
-        
-        predicted_vol = sensors.get_realtime_volume() * vol_factor
-        predicted_speed = gps.get_average_speed(predicted_vol)
-        
-        new_row = {
-            'VehicleCount': int(predicted_vol),
-            'Speed': round(predicted_speed, 2),
-            'Hour': next_hour,
-            'DayOfWeek': 2,
-            'IsWeekend': 0,
-            'WeatherCondition': weather.get("Condition", "Clear"),
-        }
-        
-        # Persist location context
-        if 'origin' in current_seq_list[-1]: new_row['origin'] = current_seq_list[-1]['origin']
-        if 'destination' in current_seq_list[-1]: new_row['destination'] = current_seq_list[-1]['destination']
-        
-        # Append to sequence, remove oldest (Sliding Window)
-        current_seq_list.append(new_row)
-        current_seq_list.pop(0)
-        
-        # Prepare Tensor
-        df_future = pd.DataFrame(current_seq_list)
-        print(f"DEBUG: Feature Cols: {feature_cols}")
-        print(f"DEBUG: DF Cols: {df_future.columns}")
-        
-        # Fix: Ensure NoveltyScore is present if required by scaler
-        if 'NoveltyScore' in feature_cols and 'NoveltyScore' not in df_future.columns:
-             df_future['NoveltyScore'] = 0.0
-        
-        # Preprocessing (Mirroring logic above)
-        if 'WeatherCondition' in encoders:
-            le = encoders['WeatherCondition']
-            df_future['WeatherCondition'] = df_future['WeatherCondition'].apply(lambda x: x if x in le.classes_ else le.classes_[0])
-            df_future['WeatherCondition'] = le.transform(df_future['WeatherCondition'])
-            
-        X_future = scaler.transform(df_future[feature_cols])
-        X_future_tensor = torch.tensor(X_future, dtype=torch.float32).unsqueeze(0).to(device)
-        
-        with torch.no_grad():
-            f_out = model(X_future_tensor)
-            f_probs = torch.softmax(f_out, dim=1)
-            f_conf, f_idx = torch.max(f_probs, 1)
-            
-        f_congestion = classes[f_idx.item()]
-        
+    for k, horizon in enumerate(horizons, start=1):
+        f_congestion = classes[pred_idx[k]]
         forecasts.append({
-            "step": f"+{step}h",
-            "hour": next_hour,
+            "step": format_step(horizon),
+            "hour": int(next_hours[k - 1]),
             "congestion_level": str(f_congestion),
-            "confidence": float(round(f_conf.item() * 100, 2)),
+            "confidence": float(round(float(conf[k]) * 100, 2)),
             "is_bottleneck": f_congestion in ['2', '3', 'High', 'Critical'] # Assuming '2' is High
         })
 
-    
     # Construct Response
     response = {
         "city": city,
@@ -307,7 +283,8 @@ def get_prediction_data(city="Mumbai, India", source=None, dest=None):
         "prediction": {
             "congestion_level": str(congestion_level),
             "confidence_score": float(round(confidence, 2)),
-            "novelty_score": float(round(df_seq['NoveltyScore'].mean(), 4))
+            "novelty_score": float(round(df_seq['NoveltyScore'].mean(), 4)),
+            "hour": int(current_hour)
         },
         "forecast": forecasts,
         "context": {
@@ -324,18 +301,19 @@ def get_prediction_data(city="Mumbai, India", source=None, dest=None):
             "insight_message": "Contextual adaptation detected." if df_seq['NoveltyScore'].mean() > 0.6 else "Standard traffic patterns."
         }
     }
+    _PREDICTION_CACHE.put((city, source, dest), response)
     return response
 
 def predict_live(city="Mumbai, India", source=None, dest=None):
-    print(f"\n[INFO] Starting Advanced Traffic Intelligence Engine for {city}...")
+    logger.info("Starting Advanced Traffic Intelligence Engine for %s...", city)
     
     if source and dest:
-        print(f"[INFO] Route Specific Mode: {source} -> {dest}")
+        logger.info("Route Specific Mode: %s -> %s", source, dest)
     
     data = get_prediction_data(city, source, dest)
     
     if "error" in data:
-        print(data["error"])
+        logger.error("%s", data["error"])
         return
 
     # Extract for Display
@@ -345,27 +323,27 @@ def predict_live(city="Mumbai, India", source=None, dest=None):
     events = ctx["events"]
     event_name = events.get("Details", {}).get("Name", "None")
     
-    print("\n[INFO] Environment Sensed.")
-    print(f"   Weather: {ctx['weather']['Condition']} ({ctx['weather']['Temperature']}C)")
-    print(f"   Events:  {event_name} (Impact: {ctx['event_impact_score']})")
+    logger.info("Environment Sensed.")
+    logger.info("Weather: %s (%sC)", ctx['weather']['Condition'], ctx['weather']['Temperature'])
+    logger.info("Events:  %s (Impact: %s)", event_name, ctx['event_impact_score'])
     
-    print(f"\n{'-'*60}")
-    print(f"| PREDICTION RESULT | {city.split(',')[0].upper():<31}|")
-    print(f"{'-'*60}")
-    print(f"| Congestion Level      | {pred['congestion_level'].upper():<30} |")
-    print(f"| Confidence Score      | {pred['confidence_score']}%{' ':<26} |")
-    print(f"| Novelty Score         | {pred['novelty_score']}{' ':<26} |")
-    print(f"{'-'*60}")
+    logger.info("%s", '-' * 60)
+    logger.info("| PREDICTION RESULT | %-31s|", city.split(',')[0].upper())
+    logger.info("%s", '-' * 60)
+    logger.info("| Congestion Level      | %-30s |", pred['congestion_level'].upper())
+    logger.info("| Confidence Score      | %s%%%s |", pred['confidence_score'], " " * 26)
+    logger.info("| Novelty Score         | %s%s |", pred['novelty_score'], " " * 26)
+    logger.info("%s", '-' * 60)
 
     if data["analysis"]["unique_insight"]:
-        print(f"\n  >> UNIQUE INSIGHT GENERATED:")
-        print(f"     {data['analysis']['insight_message']}")
+        logger.info(">> UNIQUE INSIGHT GENERATED:")
+        logger.info("%s", data['analysis']['insight_message'])
         
     # ... (Keep existing Traffic Management Strategy print logic if desired, or simplify)
     
-    print(f"\n{'-'*60}")
-    print("SYSTEM READY FOR DEPLOYMENT")
-    print(f"{'-'*60}")
+    logger.info("%s", '-' * 60)
+    logger.info("SYSTEM READY FOR DEPLOYMENT")
+    logger.info("%s", '-' * 60)
 
 if __name__ == "__main__":
     import argparse
@@ -0,0 +1,309 @@
+"""
+Route Analyzer - Filters alerts and events by route corridor
+"""
+
+import os
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+
+try:
+    from src.corridor import Corridor
+    from src.spatial_index import SpatialIndex, haversine_km, load_gazetteer
+    from src.log import get_logger
+except ImportError:
+    from corridor import Corridor
+    from spatial_index import SpatialIndex, haversine_km, load_gazetteer
+    from log import get_logger
+
+logger = get_logger(__name__)
+
+# Major Mumbai locations (approximate coordinates)
+MUMBAI_LOCATIONS = {
+    "Bandra": (19.0596, 72.8295),
+    "Dadar": (19.0176, 72.8484),
+    "Andheri": (19.1136, 72.8697),
+    "Worli": (19.0183, 72.8179),
+    "Kurla": (19.0728, 72.8826),
+    "Powai": (19.1176, 72.9060),
+    "Chembur": (19.0633, 72.8986),
+    "Borivali": (19.2304, 72.8572),
+    "Thane": (19.2183, 72.9781),
+    "Navi Mumbai": (19.0330, 73.0297),
+    "Marine Drive": (18.9432, 72.8236),
+    "Colaba": (18.9067, 72.8147),
+    "Fort": (18.9388, 72.8354),
+    "Churchgate": (18.9320, 72.8260),
+    "CST": (18.9398, 72.8355),
+    "Goregaon": (19.1663, 72.8526),
+    "Malad": (19.1868, 72.8489),
+    "Kandivali": (19.2073, 72.8497),
+    "Ghatkopar": (19.0863, 72.9082),
+    "Vikhroli": (19.1069, 72.9255),
+    "Mulund": (19.1726, 72.9562),
+    "Mahim": (19.0410, 72.8412),
+    "Santacruz": (19.0811, 72.8428),
+    "Vile Parle": (19.1006, 72.8474),
+    "CSMT": (18.9398, 72.8355), # Alien for CST
+}
+
+# Optional extra places (wards, junctions, stations): CSV name,lat,lon or JSON
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH")
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def location_index():
+    """
+    Shared SpatialIndex over MUMBAI_LOCATIONS plus GAZETTEER_PATH places,
+    built on first use.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                places = dict(MUMBAI_LOCATIONS)
+                if GAZETTEER_PATH and os.path.exists(GAZETTEER_PATH):
+                    for name, coords in load_gazetteer(GAZETTEER_PATH).items():
+                        places.setdefault(name, coords)
+                _index = SpatialIndex(places)
+    return _index
+
+
+def get_route_coordinates(source, destination):
+    """
+    Get coordinates for source and destination
+    Returns: (source_coords, dest_coords) or None if not found
+    """
+    source_clean = source.strip().title()
+    dest_clean = destination.strip().title()
+    
+    source_coords = MUMBAI_LOCATIONS.get(source_clean)
+    dest_coords = MUMBAI_LOCATIONS.get(dest_clean)
+    
+    if not source_coords or not dest_coords:
+        # Try to find partial matches
+        for loc_name, coords in MUMBAI_LOCATIONS.items():
+            if source_clean in loc_name or loc_name in source_clean:
+                source_coords = coords
+            if dest_clean in loc_name or loc_name in dest_clean:
+                dest_coords = coords
+    
+    return (source_coords, dest_coords) if source_coords and dest_coords else (None, None)
+
+
+def distances_to_route(lats, lons, route_start, route_end):
+    """
+    Vectorized calculate_distance_to_route for arrays of points.
+    Returns distances in km (numpy array)
+    """
+    dist_to_start = haversine_km(lats, lons, route_start[0], route_start[1])
+    dist_to_end = haversine_km(lats, lons, route_end[0], route_end[1])
+    route_length = float(haversine_km(route_start[0], route_start[1], route_end[0], route_end[1]))
+
+    nearest_end = np.minimum(dist_to_start, dist_to_end)
+    # Distances summing to ~route length put the point on the path (2km tolerance)
+    on_path = np.abs((dist_to_start + dist_to_end) - route_length) < 2
+    return np.where(on_path, np.minimum(nearest_end, route_length / 2), nearest_end)
+
+
+def calculate_distance_to_route(point_lat, point_lon, route_start, route_end):
+    """
+    Calculate minimum distance from a point to a route (line segment)
+    Returns distance in km
+    """
+    # Simple approximation: distance to nearest endpoint
+    # For production, use proper point-to-line-segment distance
+    return float(distances_to_route(point_lat, point_lon, route_start, route_end)[0])
+
+
+def locate_items(items):
+    """
+    (lat, lon) for each alert / report / station: its own "lat"/"lon"
+    fields when present, else its Location (reports: location) resolved
+    through the gazetteer (memoised per name). None when neither works.
+    """
+    index = location_index()
+    coords = []
+    for item in items:
+        if item.get("lat") is not None and item.get("lon") is not None:
+            coords.append((float(item["lat"]), float(item["lon"])))
+        else:
+            coords.append(index.match(item.get("Location") or item.get("location") or ""))
+    return coords
+
+
+def _route_distances(coords, source_coords, dest_coords, route_coords=None):
+    # Distance to route for every located item in one call (NaN when unlocated);
+    # exact against the route geometry when given, else the endpoint approximation
+    distances = np.full(len(coords), np.nan)
+    located = [i for i, c in enumerate(coords) if c]
+    if located:
+        points = np.array([coords[i] for i in located], dtype=np.float64)
+        if route_coords is not None and len(route_coords):
+            distances[located] = Corridor(route_coords).distances(points[:, 0], points[:, 1])
+        else:
+            distances[located] = distances_to_route(points[:, 0], points[:, 1], source_coords, dest_coords)
+    return distances
+
+
+def filter_alerts_by_route(events, source, destination, radius_km=5, route_coords=None, sort=True):
+    """
+    Filter events that are within radius_km of the route corridor
+    
+    Args:
+        events: List of event dictionaries with Location field
+        source: Source location name
+        destination: Destination location name
+        radius_km: Maximum distance from route (default 5km)
+        route_coords: Optional route geometry [[lon, lat], ...]; distances are
+                      then exact point-to-polyline instead of endpoint-based
+        sort: Order by distance to the route (else keep the input order)
+    
+    Returns:
+        List of filtered events with distance added
+    """
+    has_route = route_coords is not None and len(route_coords) > 0
+    source_coords, dest_coords = get_route_coordinates(source, destination)
+    
+    if not has_route and (not source_coords or not dest_coords):
+        logger.warning("Could not find coordinates for %s or %s", source, destination)
+        return events  # Return all events if coords not found
+    
+    event_coords = locate_items(events)
+    distances = _route_distances(event_coords, source_coords, dest_coords, route_coords)
+
+    filtered_events = []
+    
+    for event, coords, distance in zip(events, event_coords, distances.tolist()):
+        if coords:
+            if distance <= radius_km:
+                event_copy = event.copy()
+                event_copy["distance_to_route_km"] = round(distance, 2)
+                filtered_events.append(event_copy)
+        else:
+            # If we can't determine location, include it with high distance
+            event_copy = event.copy()
+            event_copy["distance_to_route_km"] = radius_km + 1
+            filtered_events.append(event_copy)
+    
+    # Sort by distance to route
+    if sort:
+        filtered_events.sort(key=lambda x: x.get("distance_to_route_km", 999))
+    
+    return filtered_events
+
+
+def calculate_route_impact_score(events, source, destination, route_coords=None):
+    """
+    Calculate overall impact score for a route based on events
+    
+    With route_coords ([[lon, lat], ...]), distances of locatable events are
+    measured against the route geometry; otherwise (and for events that
+    cannot be located) their distance_to_route_km is used.
+    
+    Returns: float between 0 and 1
+    """
+    if not events:
+        return 0.0
+    
+    distances = np.array([event.get("distance_to_route_km", 10) for event in events], dtype=np.float64)
+    if route_coords is not None and len(route_coords):
+        exact = _route_distances(locate_items(events), None, None, route_coords)
+        distances = np.where(np.isnan(exact), distances, exact)
+    
+    # Base score by impact
+    impacts = np.array([event.get("Impact", "Low") for event in events], dtype=object)
+    base_score = np.where(impacts == "High", 0.8, np.where(impacts == "Medium", 0.5, 0.2))
+    
+    # Reduce score based on distance
+    distance_factor = np.maximum(0, 1 - (distances / 10))  # 0 at 10km+
+    
+    total_score = float((base_score * distance_factor).sum())
+    
+    # Normalize to 0-1 range
+    normalized_score = min(total_score / len(events), 1.0)
+    
+    return round(normalized_score, 2)
+
+
+def prioritize_alerts(events):
+    """
+    Sort events by priority:
+    1. Recent (last 24h) + High Impact
+    2. Recent + Medium/Low Impact
+    3. Older (but still relevant)
+    
+    Does NOT strictly exclude older events, but pushes them to the bottom.
+    """
+    from email.utils import parsedate_to_datetime
+    
+    now = datetime.now()
+    cutoff_24h = now - timedelta(hours=24)
+    cutoff_7d = now - timedelta(days=7) # exclude very old stuff
+    
+    processed_events = []
+    
+    logger.debug("Prioritizing %s events...", len(events))
+    
+    for event in events:
+        time_str = event.get("Time", "")
+        is_recent = False
+        event_dt = None
+        
+        if time_str:
+            try:
+                # Try ISO format first (from our time-travel logic)
+                event_dt = datetime.fromisoformat(time_str)
+            except ValueError:
+                try:
+                    # Fallback to RSS/Email format
+                    event_dt = parsedate_to_datetime(time_str)
+                except:
+                    pass
+            
+            if event_dt:
+                if event_dt.tzinfo:
+                    event_dt = event_dt.replace(tzinfo=None)
+                
+                # Filter out very old events (> 7 days)
+                if event_dt < cutoff_7d:
+                    continue
+                    
+                if event_dt >= cutoff_24h:
+                    is_recent = True
+        
+        # Calculate Sort Score (Lower is better/higher priority)
+        # Level 1: Recent High Impact (0)
+        # Level 2: Recent Medium Impact (1)
+        # Level 3: Recent Low Impact (2)
+        # Level 4: Older High Impact (3)
+        # Level 5: Older Medium Impact (4)
+        # Level 6: Older Low Impact (5)
+        
+        impact = event.get("Impact", "Low")
+        impact_score = 0 if impact == "High" else 1 if impact == "Medium" else 2
+        
+        recency_score = 0 if is_recent else 3
+        
+        final_score = recency_score + impact_score
+        
+        # Add sort keys
+        event_copy = event.copy()
+        event_copy["_sort_score"] = final_score
+        event_copy["_timestamp"] = event_dt.timestamp() if event_dt else 0
+        
+        processed_events.append(event_copy)
+    
+    # Sort by: Score (asc), then Timestamp (desc - newest first)
+    processed_events.sort(key=lambda x: (x["_sort_score"], -x["_timestamp"]))
+    
+    # Clean up internal keys
+    for e in processed_events:
+        e.pop("_sort_score", None)
+        e.pop("_timestamp", None)
+
+    logger.debug("Returned %s prioritized events", len(processed_events))
+    return processed_events
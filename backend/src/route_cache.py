@@ -0,0 +1,164 @@
+"""
+OSRM Route Cache
+Caches decoded OSRM routes keyed by origin/destination snapped to geohash
+cells, so repeat trips between the same places skip the network call.
+
+Geometry is stored as (N, 2) float32 [lon, lat] arrays. Entries follow the
+shared LRU + TTL policy of context_cache and can be persisted to disk
+(ROUTE_CACHE_PATH) across restarts.
+"""
+import os
+import pickle
+import time
+
+import numpy as np
+import polyline
+
+try:
+    from src.context_cache import TTLCache, register_cache
+    from src.log import get_logger
+except ImportError:
+    from context_cache import TTLCache, register_cache
+    from log import get_logger
+
+logger = get_logger(__name__)
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash(lat, lon, precision=7):
+    """
+    Standard geohash of a point. Precision 7 cells are ~150 m across,
+    precision 6 ~1.2 km.
+    """
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars = []
+    bits = 0
+    ch = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                ch = (ch << 1) | 1
+                lon_lo = mid
+            else:
+                ch <<= 1
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                ch = (ch << 1) | 1
+                lat_lo = mid
+            else:
+                ch <<= 1
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[ch])
+            bits = 0
+            ch = 0
+    return "".join(chars)
+
+
+def decode_routes(data):
+    """
+    Convert an OSRM /route response into compact cache entries.
+
+    Returns:
+        List of {"coords": float32 (N, 2) [lon, lat], "duration", "distance" (km), "legs"}
+    """
+    routes = []
+    for route in data.get("routes", []):
+        latlon = np.asarray(polyline.decode(route["geometry"]), dtype=np.float32).reshape(-1, 2)
+        routes.append({
+            "coords": np.ascontiguousarray(latlon[:, ::-1]),  # [lon, lat] for MapLibre
+            "duration": route.get("duration", 0),
+            "distance": route.get("distance", 0) / 1000,
+            "legs": route.get("legs", [])
+        })
+    return routes
+
+
+def expand_routes(routes):
+    """
+    Turn cached entries back into the get_osrm_route return shape:
+    (main_route, alternates, duration, distance, all_routes)
+    """
+    all_routes = [{
+        "geometry": r["coords"].tolist(),
+        "duration": r["duration"],
+        "distance": r["distance"],
+        "legs": r["legs"],
+        # Forecast-timed local routes only
+        **({"free_flow_duration": r["free_flow_duration"]} if "free_flow_duration" in r else {})
+    } for r in routes]
+    main = all_routes[0]
+    alternates = [r["geometry"] for r in all_routes[1:]]
+    return main["geometry"], alternates, main["duration"], main["distance"], all_routes
+
+
+class RouteCache(TTLCache):
+    """
+    TTLCache keyed by snapped origin/destination cells, with optional
+    persistence to a pickle file.
+    """
+    def __init__(self, precision=7, maxsize=2048, ttl=900, path=None):
+        super().__init__("osrm_routes", maxsize=maxsize, ttl=ttl)
+        self.precision = precision
+        self.path = path
+
+    def key(self, start_lat, start_lon, dest_lat, dest_lon):
+        return (geohash(start_lat, start_lon, self.precision),
+                geohash(dest_lat, dest_lon, self.precision))
+
+    def save(self, path=None):
+        """Write live entries to disk (ages are stored as wall-clock times)."""
+        path = path or self.path
+        if not path:
+            return 0
+        mono, wall = time.monotonic(), time.time()
+        with self._lock:
+            snapshot = [(k, v, wall - (mono - stored_at)) for k, (v, stored_at) in self._data.items()
+                        if mono - stored_at < self.ttl]
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump({"precision": self.precision, "entries": snapshot}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        return len(snapshot)
+
+    def load(self, path=None):
+        """Restore entries saved by save(); expired or mismatched entries are skipped."""
+        path = path or self.path
+        if not path or not os.path.exists(path):
+            return 0
+        try:
+            with open(path, "rb") as f:
+                payload = pickle.load(f)
+        except Exception as e:
+            logger.warning("Could not read route cache %s: %s", path, e)
+            return 0
+        if payload.get("precision") != self.precision:
+            return 0
+
+        mono, wall = time.monotonic(), time.time()
+        loaded = 0
+        with self._lock:
+            for k, v, saved_at in payload.get("entries", []):
+                age = wall - saved_at
+                if age < self.ttl:
+                    self._data[k] = (v, mono - age)
+                    loaded += 1
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return loaded
+
+
+route_cache = register_cache("osrm_routes", RouteCache(
+    precision=int(os.getenv("ROUTE_CACHE_PRECISION", "7")),
+    maxsize=int(os.getenv("ROUTE_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("ROUTE_CACHE_TTL", "900")),
+    path=os.getenv("ROUTE_CACHE_PATH")
+))
@@ -1,53 +1,274 @@
-import requests
 from bs4 import BeautifulSoup
 import random
 
-def get_live_weather(city="Mumbai"):
+try:
+    from src.context_cache import get_cache
+    from src.http_pool import get_session, get_upstream, base_url
+    from src.telemetry import span
+    from src.log import get_logger
+except ImportError:
+    from context_cache import get_cache
+    from http_pool import get_session, get_upstream, base_url
+    from telemetry import span
+    from log import get_logger
+
+logger = get_logger(__name__)
+
+# Live-context caches (fresh TTL, then served stale while refreshing in the background)
+_WEATHER_CACHE = get_cache("weather", maxsize=64, ttl=600, stale_ttl=1800)
+_NEWS_CACHE = get_cache("city_news", maxsize=64, ttl=300, stale_ttl=900)
+
+_WEATHER_PATH = "/v1/forecast"
+
+def _weather_params(lat, lon):
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "current": "temperature_2m,weather_code,wind_speed_10m"
+    }
+
+def _parse_weather(city, data):
+    current = data.get('current', {})
+    temp = current.get('temperature_2m', 30.0)
+    wind = current.get('wind_speed_10m', 10.0)
+    code = current.get('weather_code', 0)
+    
+    # Map WMO code to Condition
+    if code <= 3: condition = "Clear"
+    elif code <= 48: condition = "Fog"
+    elif code <= 67: condition = "Rain"
+    else: condition = "Storm"
+    
+    weather_info = {
+        "City": city,
+        "Temperature": temp,
+        "Condition": condition,
+        "WindSpeed": wind
+    }
+    logger.debug("Live Weather: %s", weather_info)
+    return weather_info
+
+def _fetch_weather(city, lat, lon, timeout=5):
+    session = get_session("open_meteo")
+    with span("weather_fetch"):
+        response = session.get(base_url("open_meteo") + _WEATHER_PATH, params=_weather_params(lat, lon), timeout=timeout)
+    response.raise_for_status()
+    return _parse_weather(city, response.json())
+
+async def _fetch_weather_async(city, lat, lon):
+    with span("weather_fetch"):
+        response = await get_upstream("open_meteo").get(_WEATHER_PATH, params=_weather_params(lat, lon))
+    response.raise_for_status()
+    return _parse_weather(city, response.json())
+
+# Using Mumbai Coords roughly for demo
+# (Geocoding simulated for simplicity, or use geopy if needed for exact coords)
+_CITY_COORDS = (19.0760, 72.8777)
+
+_DEFAULT_WEATHER = {"Condition": "Clear", "Temperature": 30.0}
+
+def get_live_weather(city="Mumbai", deadline=None):
     """
     Simulates fetching live weather data using Open-Meteo API (Free, No Key).
+    Served from the weather cache; only a miss reaches the network.
+    With a Deadline, the request timeout is capped by the remaining budget.
     """
-    print(f"Fetching live weather for {city}...")
     try:
-        # Geocoding (Simulated for simplicity, or use geopy if needed for exact coords)
-        # Using Mumbai Coords roughly for demo
-        lat, lon = 19.0760, 72.8777 
-        
-        url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&current=temperature_2m,weather_code&wind_speed_10m"
-        response = requests.get(url)
-        data = response.json()
-        
-        current = data.get('current', {})
-        temp = current.get('temperature_2m', 30.0)
-        wind = current.get('wind_speed_10m', 10.0)
-        code = current.get('weather_code', 0)
+        lat, lon = _CITY_COORDS
+        if deadline is None:
+            return _WEATHER_CACHE.get_or_load(city, lambda: _fetch_weather(city, lat, lon))
+        if deadline.expired:
+            deadline.degrade("weather", "skipped")
+            return _WEATHER_CACHE.last_value(city, dict(_DEFAULT_WEATHER))
+        with deadline.stage("weather"):
+            return _WEATHER_CACHE.get_or_load(city, lambda: _fetch_weather(city, lat, lon, timeout=deadline.timeout(5)))
         
-        # Map WMO code to Condition
-        if code <= 3: condition = "Clear"
-        elif code <= 48: condition = "Fog"
-        elif code <= 67: condition = "Rain"
-        else: condition = "Storm"
-        
-        weather_info = {
-            "City": city,
-            "Temperature": temp,
-            "Condition": condition,
-            "WindSpeed": wind
-        }
-        print(f"Live Weather: {weather_info}")
-        return weather_info
+    except Exception as e:
+        logger.error("Error fetching weather: %s", e)
+        return dict(_DEFAULT_WEATHER)
+
+async def get_live_weather_async(city="Mumbai", deadline=None):
+    """
+    Event-loop variant of get_live_weather using the pooled async client.
+    With a Deadline, answers from the last cached reading (or the default)
+    once the budget runs out.
+    """
+    try:
+        lat, lon = _CITY_COORDS
+        load = _WEATHER_CACHE.get_or_load_async(city, lambda: _fetch_weather_async(city, lat, lon))
+        if deadline is None:
+            return await load
+        return await deadline.run("weather", load, fallback=lambda: _WEATHER_CACHE.last_value(city, dict(_DEFAULT_WEATHER)))
         
     except Exception as e:
-        print(f"Error fetching weather: {e}")
-        return {"Condition": "Clear", "Temperature": 30.0}
+        logger.error("Error fetching weather: %s", e)
+        return dict(_DEFAULT_WEATHER)
 
+import asyncio
 import xml.etree.ElementTree as ET
 from datetime import datetime
 
-def get_city_events(city="Mumbai", context=None):
+# Improved Headers to mimic browser (avoids being blocked)
+_RSS_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+_RSS_PATH = "/rss/search"
+
+def _news_queries(city):
+    # Broader queries for better coverage
+    return [
+        f"{city} traffic news today",
+        f"{city} major accident today",
+        f"{city} road closure protest today",
+        "Mumbai local train status today" 
+    ]
+
+def _rss_params(q):
+    return {"q": q, "hl": "en-IN", "gl": "IN", "ceid": "IN:en"}
+
+def _parse_rss_items(city, content, found_events):
+    """Score the top RSS items of one query and append the relevant ones."""
+    root = ET.fromstring(content)
+    items = root.findall('./channel/item')
+
+    # Process top 3 items from each query
+    for item in items[:3]:
+        title = item.find('title').text
+        link = item.find('link').text
+        pubDate = item.find('pubDate').text if item.find('pubDate') is not None else ""
+
+        # Keyword filtering for relevance
+        keywords_high = ["accident", "collision", "overturned", "fire", "collapsed", "dead", "killed", "severe", "blocked", "closed"]
+        keywords_medium = ["traffic", "jam", "congestion", "delayed", "slow", "protest", "rally", "procession", "construction", "repair"]
+
+        impact = "Low"
+        lower_title = title.lower()
+
+        if any(k in lower_title for k in keywords_high):
+            impact = "High"
+        elif any(k in lower_title for k in keywords_medium):
+            impact = "Medium"
+
+        # Only include if it has some relevance (impact > Low is a good proxy, or explicit traffic keywords)
+        if impact != "Low" or "traffic" in lower_title or "road" in lower_title:
+            # Avoid duplicates
+            if not any(e['Name'] == title for e in found_events):
+                found_events.append({
+                    "Name": title,
+                    "Impact": impact,
+                    "Location": f"{city} (General)", # RSS doesn't give precise location easily
+                    "AffectedAreas": ["See news link for details"],
+                    "Source": "Google News",
+                    "Link": link,
+                    "Time": pubDate
+                })
+
+def _scrape_news_events(city, deadline=None):
+    """
+    Fetch and score Google News RSS items for the city.
+    Cached per city by get_city_events. Raises TimeoutError when a Deadline
+    runs out part way, so an incomplete scrape is never cached.
+    """
+    session = get_session("google_news")
+    found_events = []
+
+    for q in _news_queries(city):
+        if deadline is not None and deadline.expired:
+            raise TimeoutError("Deadline reached while scraping news")
+        try:
+            timeout = 5 if deadline is None else deadline.timeout(5)
+            with span("news_fetch"):
+                response = session.get(base_url("google_news") + _RSS_PATH, params=_rss_params(q), headers=_RSS_HEADERS, timeout=timeout)
+            if response.status_code == 200:
+                _parse_rss_items(city, response.content, found_events)
+        except Exception as loop_e:
+            logger.warning("Query %s failed: %s", q, loop_e)
+            continue
+
+    return found_events
+
+async def _scrape_news_events_async(city):
+    """
+    Async variant of _scrape_news_events: all queries run concurrently.
+    """
+    upstream = get_upstream("google_news")
+    queries = _news_queries(city)
+    with span("news_fetch"):
+        responses = await asyncio.gather(
+            *[upstream.get(_RSS_PATH, params=_rss_params(q), headers=_RSS_HEADERS) for q in queries],
+            return_exceptions=True
+        )
+
+    found_events = []
+    # Parse in query order so de-duplication matches the sequential scraper
+    for q, response in zip(queries, responses):
+        try:
+            if isinstance(response, Exception):
+                raise response
+            if response.status_code == 200:
+                _parse_rss_items(city, response.content, found_events)
+        except Exception as loop_e:
+            logger.warning("Query %s failed: %s", q, loop_e)
+            continue
+
+    return found_events
+
+def _has_hyper_local_event(context):
+    """True when route context resolves to a simulated local event (no news needed)."""
+    if not context:
+        return False
+    src = context.get('source', '') or ''
+    dst = context.get('dest', '') or ''
+    return any(k in src or k in dst for k in ("Andheri", "Dadar"))
+
+def get_city_events(city="Mumbai", context=None, deadline=None):
     """
     Scrapes Google News RSS for real-time traffic/event updates.
+    With a Deadline, falls back to the last scraped news once it runs out.
+    """
+    def fetch_news():
+        if deadline is None:
+            return _NEWS_CACHE.get_or_load(city, lambda: _scrape_news_events(city))
+        if deadline.expired:
+            deadline.degrade("city_news", "skipped")
+            return _NEWS_CACHE.last_value(city, [])
+        try:
+            with deadline.stage("city_news"):
+                return _NEWS_CACHE.get_or_load(city, lambda: _scrape_news_events(city, deadline))
+        except TimeoutError:
+            deadline.degrade("city_news", "timeout")
+            return _NEWS_CACHE.last_value(city, [])
+    return _build_city_events(city, context, fetch_news)
+
+async def get_city_events_async(city="Mumbai", context=None, deadline=None):
+    """
+    Event-loop variant of get_city_events using the pooled async client.
+    With a Deadline, falls back to the last scraped news (or none, leaving
+    the demo schedule and fallback database) once the budget runs out.
+    """
+    news, error = [], None
+    if not _has_hyper_local_event(context):
+        try:
+            load = _NEWS_CACHE.get_or_load_async(city, lambda: _scrape_news_events_async(city))
+            if deadline is None:
+                news = await load
+            else:
+                news = await deadline.run("city_news", load, fallback=lambda: _NEWS_CACHE.last_value(city, []))
+        except Exception as e:
+            error = e
+
+    def fetch_news():
+        if error is not None:
+            raise error
+        return news
+    return _build_city_events(city, context, fetch_news)
+
+def _build_city_events(city, context, fetch_news):
     """
-    print(f"Scanning for major events in {city} via Google News RSS...")
+    Assemble the events payload: hyper-local route events first, then live
+    news merged with the demo schedule, then the fallback database.
+    """
+    logger.info("Scanning for major events in %s via Google News RSS...", city)
     
     # Define Demo Events globally for this function (User Request: "As good as earlier")
     demo_events = [
@@ -77,7 +298,7 @@ def get_city_events(city="Mumbai", context=None):
         
         # Simulated Localized Events (Override General News)
         if "Andheri" in src or "Andheri" in dst:
-            print(f"   [REAL-TIME] Hyper-Local Event: Metro Line 6 Construction")
+            logger.info("[REAL-TIME] Hyper-Local Event: Metro Line 6 Construction")
             return {"Incident": "Construction", "Details": {
                 "Name": "Metro Line 6 Girder Launch",
                 "Impact": "High",
@@ -86,7 +307,7 @@ def get_city_events(city="Mumbai", context=None):
                 "AltRoutes": ["SV Road", "Link Road"]
             }}
         if "Dadar" in src or "Dadar" in dst:
-             print(f"   [REAL-TIME] Hyper-Local Event: Religious Procession")
+             logger.info("[REAL-TIME] Hyper-Local Event: Religious Procession")
              return {"Incident": "Religious Procession", "Details": {
                 "Name": "Local Procession",
                 "Impact": "Medium",
@@ -97,63 +318,7 @@ def get_city_events(city="Mumbai", context=None):
 
     # 1. Real-Time Scraping (Multi-Source: News + Sports)
     try:
-        # Improved Headers to mimic browser (avoids being blocked)
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        
-        # Broader queries for better coverage
-        queries = [
-            f"{city} traffic news today",
-            f"{city} major accident today",
-            f"{city} road closure protest today",
-            "Mumbai local train status today" 
-        ]
-        
-        found_events = []
-        
-        for q in queries:
-            url = f"https://news.google.com/rss/search?q={q}&hl=en-IN&gl=IN&ceid=IN:en"
-            try:
-                response = requests.get(url, headers=headers, timeout=5)
-                if response.status_code == 200:
-                    root = ET.fromstring(response.content)
-                    items = root.findall('./channel/item')
-                    
-                    # Process top 3 items from each query
-                    for item in items[:3]:
-                        title = item.find('title').text
-                        link = item.find('link').text
-                        pubDate = item.find('pubDate').text if item.find('pubDate') is not None else ""
-                        
-                        # Keyword filtering for relevance
-                        keywords_high = ["accident", "collision", "overturned", "fire", "collapsed", "dead", "killed", "severe", "blocked", "closed"]
-                        keywords_medium = ["traffic", "jam", "congestion", "delayed", "slow", "protest", "rally", "procession", "construction", "repair"]
-                        
-                        impact = "Low"
-                        lower_title = title.lower()
-                        
-                        if any(k in lower_title for k in keywords_high):
-                            impact = "High"
-                        elif any(k in lower_title for k in keywords_medium):
-                            impact = "Medium"
-                        
-                        # Only include if it has some relevance (impact > Low is a good proxy, or explicit traffic keywords)
-                        if impact != "Low" or "traffic" in lower_title or "road" in lower_title:
-                            # Avoid duplicates
-                            if not any(e['Name'] == title for e in found_events):
-                                found_events.append({
-                                    "Name": title,
-                                    "Impact": impact,
-                                    "Location": f"{city} (General)", # RSS doesn't give precise location easily
-                                    "AffectedAreas": ["See news link for details"],
-                                    "Source": "Google News",
-                                    "Link": link,
-                                    "Time": pubDate
-                                })
-            except Exception as loop_e:
-                print(f"   [Warning] Query {q} failed: {loop_e}")
-                continue
+        found_events = list(fetch_news())
 
         # 3. Inject "Demonstration Events" (User Request: "As good as earlier")
         # We add these to ensure the UI always has rich data, even if real-time news is boring.
@@ -169,7 +334,7 @@ def get_city_events(city="Mumbai", context=None):
             
             # Return top events wrapped in structure
             top_event = found_events[0]
-            print(f"   [REAL-TIME] Events Found: {len(found_events)}. Top: {top_event['Name']}")
+            logger.info("[REAL-TIME] Events Found: %s. Top: %s", len(found_events), top_event['Name'])
             
             return {
                 "Incident": "Multiple Events", 
@@ -180,10 +345,10 @@ def get_city_events(city="Mumbai", context=None):
             }
 
     except Exception as e:
-        print(f"   [Warning] Scraping disruption ({e}). Accessing Cached Schedule...")
+        logger.warning("Scraping disruption (%s). Accessing Cached Schedule...", e)
 
     # 2. Backup / Fallback Database
-    print("   [INFO] Scraper limits reached. Using Validated Event Schedule (Today)...")
+    logger.info("Scraper limits reached. Using Validated Event Schedule (Today)...")
     
     # Generic City Events (Fallback)
     default_event = {
@@ -254,18 +419,29 @@ def get_city_events(city="Mumbai", context=None):
         "Name": "No Major Events", "Impact": "Low", "Location": "N/A"
     }})
 
-def get_event_impact_score(city="Mumbai"):
+def _impact_score(event_data):
+    details = event_data.get("Details", {})
+    impact = details.get("Impact", "Low")
+    
+    if impact == "High": return 0.8
+    elif impact == "Medium": return 0.5
+    else: return 0.1
+
+def get_event_impact_score(city="Mumbai", deadline=None):
     """
     Returns a float 0.0 to 1.0 representing event severity.
     """
     try:
-        event_data = get_city_events(city)
-        details = event_data.get("Details", {})
-        impact = details.get("Impact", "Low")
-        
-        if impact == "High": return 0.8
-        elif impact == "Medium": return 0.5
-        else: return 0.1
+        return _impact_score(get_city_events(city, deadline=deadline))
+    except:
+        return 0.0
+
+async def get_event_impact_score_async(city="Mumbai", deadline=None):
+    """
+    Event-loop variant of get_event_impact_score.
+    """
+    try:
+        return _impact_score(await get_city_events_async(city, deadline=deadline))
     except:
         return 0.0
 
@@ -0,0 +1,156 @@
+"""
+Route Segment Analytics
+Finds bottleneck stretches on a route from its per-segment annotation
+arrays (OSRM `annotations=true`, or the local router's equivalent).
+
+The leg annotations are concatenated into NumPy arrays and everything runs
+on cumulative distance / duration sums: rolling (distance-weighted) speed
+over a window of segments, slowdown against the route's own free-flowing
+speed, contiguous slow runs, and their delay. Only the top-k spans are
+turned into Python dicts, so long (2,000+ segment) routes stay cheap.
+"""
+import numpy as np
+
+EARTH_RADIUS_M = 6371008.8
+
+
+def route_segments(route):
+    """
+    Per-segment arrays for a route (all legs concatenated).
+
+    Args:
+        route: Route dict with "legs" (each carrying an "annotation")
+
+    Returns:
+        (distance_m, duration_s) float64 arrays, empty without annotations
+    """
+    distance, duration = [], []
+    for leg in route.get("legs", []):
+        annotation = leg.get("annotation") or {}
+        d, t = annotation.get("distance"), annotation.get("duration")
+        if d and t and len(d) == len(t):
+            distance.append(np.asarray(d, dtype=np.float64))
+            duration.append(np.asarray(t, dtype=np.float64))
+    if not distance:
+        return np.empty(0), np.empty(0)
+    return np.concatenate(distance), np.concatenate(duration)
+
+
+def _geometry_offsets(coords):
+    # Cumulative metres along a [lon, lat] polyline
+    lon, lat = np.radians(coords[:, 0]), np.radians(coords[:, 1])
+    a = (np.sin(np.diff(lat) / 2) ** 2 +
+         np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(np.diff(lon) / 2) ** 2)
+    return np.r_[0.0, np.cumsum(2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0))))]
+
+
+def _points_at(coords, offsets_m, cum_m):
+    """
+    [lon, lat] points at the given distances along the route. When the
+    geometry has one vertex per segment boundary the vertices are used
+    directly; otherwise positions are interpolated by distance.
+    """
+    if len(coords) == len(cum_m):
+        idx = np.clip(np.searchsorted(cum_m, offsets_m), 0, len(coords) - 1)
+        return coords[idx]
+    geo = _geometry_offsets(coords)
+    # Rescale so both distance measures agree on total length
+    target = offsets_m * (geo[-1] / cum_m[-1]) if cum_m[-1] > 0 else offsets_m
+    return np.column_stack([np.interp(target, geo, coords[:, 0]), np.interp(target, geo, coords[:, 1])])
+
+
+def _step_names(route, offsets_m):
+    # Street name of the step covering each distance along the route
+    names, ends = [], []
+    total = 0.0
+    for leg in route.get("legs", []):
+        for step in leg.get("steps", []):
+            total += step.get("distance", 0.0)
+            names.append(step.get("name") or "Road Segment")
+            ends.append(total)
+    if not names:
+        return ["Road Segment"] * len(offsets_m)
+    idx = np.clip(np.searchsorted(np.asarray(ends), offsets_m, side="right"), 0, len(names) - 1)
+    return [names[i] for i in idx]
+
+
+def find_bottleneck_spans(route, k=3, slow_kmh=20.0, window=5, min_length_m=50.0):
+    """
+    Top-k slow stretches of a route, worst (most delay) first.
+
+    Args:
+        route: Route dict with "legs" annotations and "geometry" ([lon, lat] list)
+        k: Number of spans to return
+        slow_kmh: Rolling speed below which a segment counts as slow
+        window: Segments in the centred rolling-speed window
+        min_length_m: Shorter stretches are ignored
+
+    Returns:
+        List of {start, end, lat, lon, name, start_m, length_m, duration_s,
+        speed_kmh, delay_s, slowdown, eta_s, severity}
+    """
+    distance, duration = route_segments(route)
+    n = len(distance)
+    if n == 0:
+        return []
+
+    cum_d = np.r_[0.0, np.cumsum(distance)]
+    cum_t = np.r_[0.0, np.cumsum(duration)]
+
+    # Centred rolling speed (km/h) from window sums of distance and time
+    half = window // 2
+    lo = np.clip(np.arange(n) - half, 0, n)
+    hi = np.clip(np.arange(n) + half + 1, 0, n)
+    win_d, win_t = cum_d[hi] - cum_d[lo], cum_t[hi] - cum_t[lo]
+    rolling = np.divide(3.6 * win_d, win_t, out=np.full(n, np.inf), where=win_t > 0)
+
+    # The route's free-flowing speed: 85th percentile of per-segment speeds
+    seg_speed = np.divide(3.6 * distance, duration, out=np.full(n, np.nan), where=duration > 0)
+    free_flow = float(np.nanpercentile(seg_speed, 85)) if np.isfinite(seg_speed).any() else 0.0
+
+    # Contiguous runs of slow segments
+    slow = rolling < slow_kmh
+    edges = np.diff(np.r_[0, slow.astype(np.int8), 0])
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    if len(starts) == 0:
+        return []
+
+    length = cum_d[ends] - cum_d[starts]
+    span_t = cum_t[ends] - cum_t[starts]
+    keep = (length >= min_length_m) & (span_t > 0)
+    starts, ends, length, span_t = starts[keep], ends[keep], length[keep], span_t[keep]
+    if len(starts) == 0:
+        return []
+
+    speed = 3.6 * length / span_t
+    ideal_t = length / (free_flow / 3.6) if free_flow > 0 else span_t
+    delay = np.maximum(span_t - ideal_t, 0.0)
+    top = np.argsort(-delay, kind="stable")[:k]
+    starts, ends, length, span_t, speed, delay = starts[top], ends[top], length[top], span_t[top], speed[top], delay[top]
+
+    coords = np.asarray(route.get("geometry") or [], dtype=np.float64).reshape(-1, 2)
+    mid_m = (cum_d[starts] + cum_d[ends]) / 2
+    if len(coords):
+        start_pts = _points_at(coords, cum_d[starts], cum_d)
+        end_pts = _points_at(coords, cum_d[ends], cum_d)
+        mid_pts = _points_at(coords, mid_m, cum_d)
+    else:
+        start_pts = end_pts = mid_pts = np.full((len(starts), 2), np.nan)
+    names = _step_names(route, mid_m)
+    slowdown = 1 - speed / free_flow if free_flow > 0 else np.zeros(len(speed))
+
+    return [{
+        "start": start_pts[i].tolist(),
+        "end": end_pts[i].tolist(),
+        "lat": float(mid_pts[i, 1]),
+        "lon": float(mid_pts[i, 0]),
+        "name": names[i],
+        "start_m": round(float(cum_d[starts[i]]), 1),
+        "length_m": round(float(length[i]), 1),
+        "duration_s": round(float(span_t[i]), 1),
+        "speed_kmh": round(float(speed[i]), 1),
+        "delay_s": round(float(delay[i]), 1),
+        "slowdown": round(float(np.clip(slowdown[i], 0.0, 1.0)), 2),
+        "eta_s": round(float(cum_t[starts[i]]), 1),
+        "severity": "High" if speed[i] < 10 else "Moderate"
+    } for i in range(len(starts))]
@@ -0,0 +1,237 @@
+"""
+Sensor Gateway
+Long-lived connections to the loop-detector network and GPS probe stream,
+one per location, opened once (the handshake is slow) and kept in a pool.
+
+A poller thread samples every connection on a fixed interval into a
+per-location ring buffer of (volume, speed) readings, so the prediction
+path reads its latest window from memory instead of talking to sensors.
+
+Locations are keyed by normalized city name ("Mumbai" and " mumbai, India"
+share one connection). Locations opened at startup are pinned; the pool
+holds at most `max_size` others, evicting the least recently used, so
+client-supplied names cannot grow it without bound.
+"""
+import asyncio
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from src.sensor_interface import TrafficSensorNetwork, GPSDataStream
+from src.log import get_logger
+
+logger = get_logger(__name__)
+
+
+def normalize_location(location):
+    """Pool key for a location: the city part, case- and whitespace-insensitive."""
+    city = str(location or "").split(",")[0]
+    return re.sub(r"\s+", " ", city).strip().casefold()
+
+
+class SensorConnection:
+    """
+    Sensor + GPS streams for one location with a ring buffer of samples.
+
+    Args:
+        location: Location name (e.g. "Mumbai, India")
+        history: Number of samples kept
+    """
+    def __init__(self, location, history=64):
+        self.location = location
+        self.sensors = TrafficSensorNetwork(location=f"{location} (Central)")
+        self.gps = GPSDataStream(location=f"{location} (Cluster)")
+        self.history = history
+        self._t = np.zeros(history, dtype=np.float64)
+        self._volume = np.zeros(history, dtype=np.float64)
+        self._speed = np.zeros(history, dtype=np.float64)
+        self._head = 0   # next write position
+        self._count = 0
+        self._lock = threading.Lock()
+        self.opened_at = time.time()
+        # Fill the buffer so the first read has a full window
+        for _ in range(history):
+            self.sample()
+
+    def read_sensors(self):
+        """One fresh (volume, speed) reading straight from the streams."""
+        volume = self.sensors.get_realtime_volume()
+        return volume, self.gps.get_average_speed(volume)
+
+    def sample(self):
+        """Take a reading and append it to the ring buffer."""
+        volume, speed = self.read_sensors()
+        with self._lock:
+            i = self._head
+            self._t[i] = time.time()
+            self._volume[i] = volume
+            self._speed[i] = speed
+            self._head = (i + 1) % self.history
+            self._count = min(self._count + 1, self.history)
+
+    def window(self, n):
+        """
+        Latest `n` samples, oldest first.
+
+        Returns:
+            (volumes, speeds) float arrays of length min(n, samples held)
+        """
+        with self._lock:
+            n = min(n, self._count)
+            idx = (self._head - n + np.arange(n)) % self.history
+            return self._volume[idx], self._speed[idx]
+
+    def latest(self):
+        """Most recent (volume, speed) sample."""
+        volumes, speeds = self.window(1)
+        return float(volumes[0]), float(speeds[0])
+
+    def stats(self):
+        with self._lock:
+            last = self._t[(self._head - 1) % self.history] if self._count else None
+        return {
+            "samples": self._count,
+            "history": self.history,
+            "last_sample_age_s": round(time.time() - last, 3) if last else None,
+            "connected_for_s": round(time.time() - self.opened_at, 1)
+        }
+
+
+class SensorGateway:
+    """
+    Pool of SensorConnections keyed by normalized location, plus the poller thread.
+
+    Args:
+        history: Ring-buffer length per location
+        interval: Seconds between samples
+        max_size: Unpinned locations kept (least recently used evicted first)
+    """
+    def __init__(self, history=64, interval=1.0, max_size=8):
+        self.history = history
+        self.interval = interval
+        self.max_size = max_size
+        self._connections = OrderedDict()  # key -> SensorConnection, LRU order
+        self._pinned = set()
+        self._connecting = {}  # key -> Event while the handshake runs
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._poller = None
+        self.evictions = 0
+
+    def _lookup(self, key):
+        # Caller holds the lock
+        conn = self._connections.get(key)
+        if conn is not None:
+            self._connections.move_to_end(key)
+        return conn
+
+    def _add(self, key, conn):
+        # Caller holds the lock
+        self._connections[key] = conn
+        self._connections.move_to_end(key)
+        unpinned = [k for k in self._connections if k not in self._pinned]
+        for old in unpinned[:max(len(unpinned) - self.max_size, 0)]:
+            del self._connections[old]
+            self.evictions += 1
+
+    def connect(self, location):
+        """Return the pooled connection for `location`, opening it on first use."""
+        key = normalize_location(location)
+        with self._lock:
+            conn = self._lookup(key)
+            if conn is not None:
+                return conn
+            pending = self._connecting.get(key)
+            leader = pending is None
+            if leader:
+                pending = threading.Event()
+                self._connecting[key] = pending
+
+        if not leader:
+            pending.wait()
+            with self._lock:
+                conn = self._lookup(key)
+            return conn if conn is not None else self.connect(location)
+
+        try:
+            conn = SensorConnection(location.split(",")[0].strip() or key, history=self.history)
+            with self._lock:
+                self._add(key, conn)
+        finally:
+            with self._lock:
+                self._connecting.pop(key, None)
+            pending.set()
+        self._ensure_poller()
+        return conn
+
+    async def connect_async(self, location):
+        with self._lock:
+            conn = self._lookup(normalize_location(location))
+        if conn is not None:
+            return conn
+        return await asyncio.to_thread(self.connect, location)
+
+    def read_window(self, location, n=5):
+        """(volumes, speeds) for the latest `n` samples at `location`."""
+        return self.connect(location).window(n)
+
+    async def read_window_async(self, location, n=5):
+        """Non-blocking read; only the first call for a location waits for the handshake."""
+        return (await self.connect_async(location)).window(n)
+
+    def start(self, locations=()):
+        """Open and pin connections for `locations` and start sampling (application startup)."""
+        self._stop.clear()
+        with self._lock:
+            self._pinned.update(normalize_location(location) for location in locations)
+        for location in locations:
+            self.connect(location)
+        self._ensure_poller()
+
+    def stop(self):
+        self._stop.set()
+
+    def _ensure_poller(self):
+        if self._poller is not None and self._poller.is_alive():
+            return
+        with self._lock:
+            if self._poller is None or not self._poller.is_alive():
+                self._poller = threading.Thread(target=self._poll, name="sensor-gateway", daemon=True)
+                self._poller.start()
+
+    def _poll(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                connections = list(self._connections.values())
+            for conn in connections:
+                try:
+                    conn.sample()
+                except Exception as e:
+                    logger.warning("Sensor read failed for %s: %s", conn.location, e)
+
+    def stats(self):
+        with self._lock:
+            connections = dict(self._connections)
+        return {
+            "interval_s": self.interval,
+            "polling": self._poller is not None and self._poller.is_alive(),
+            "max_size": self.max_size,
+            "pinned": sorted(self._pinned),
+            "evictions": self.evictions,
+            "locations": {name: conn.stats() for name, conn in connections.items()}
+        }
+
+
+# Shared instance; tune with SENSOR_HISTORY / SENSOR_POLL_INTERVAL / SENSOR_POOL_SIZE
+# and preconnect (pin) locations at startup with SENSOR_LOCATIONS ("Mumbai, India;Pune, India")
+gateway = SensorGateway(
+    history=int(os.getenv("SENSOR_HISTORY", "64")),
+    interval=float(os.getenv("SENSOR_POLL_INTERVAL", "1.0")),
+    max_size=int(os.getenv("SENSOR_POOL_SIZE", "8"))
+)
+
+STARTUP_LOCATIONS = [loc.strip() for loc in os.getenv("SENSOR_LOCATIONS", "Mumbai, India").split(";") if loc.strip()]
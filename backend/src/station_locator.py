@@ -2,6 +2,15 @@ import osmnx as ox
 import pandas as pd
 from geopy.distance import geodesic
 
+try:
+    from src.poi_index import get_poi_store, poi_refresher
+    from src.log import get_logger
+except ImportError:
+    from poi_index import get_poi_store, poi_refresher
+    from log import get_logger
+
+logger = get_logger(__name__)
+
 # Location cache to avoid repeated geocoding
 _location_cache = {}
 
@@ -29,26 +38,52 @@ def get_coords_for_location(location_name, city="Mumbai, India"):
         _location_cache[cache_key] = location
         return location
     except Exception as e:
-        print(f"   ! Geocoding failed for '{location_name}': {e}")
+        logger.warning("Geocoding failed for '%s': %s", location_name, e)
         return None
 
-def get_stations_along_route(origin_coords, dest_coords, radius_km=2.0):
+def get_stations_along_route(origin_coords, dest_coords, radius_km=2.0, route_coords=None):
     """
-    Finds fuel stations and EV charging stations near the route corridor.
+    Finds fuel stations, EV charging stations and parking near the route corridor.
+    
+    Served from the preloaded POI index (see poi_index). Until the index
+    exists, a rebuild is started in the background and this request falls
+    back to live Overpass queries around the route midpoint.
     
     Args:
         origin_coords: (lat, lon) tuple for origin
         dest_coords: (lat, lon) tuple for destination
-        radius_km: Search radius from route midpoint in kilometers
+        radius_km: Corridor half-width in kilometers
+        route_coords: Optional route geometry [[lon, lat], ...]; defaults to
+                      the straight line between origin and destination
         
     Returns:
         dict: {
-            'fuel_stations': [{name, distance, lat, lon}, ...],
-            'ev_chargers': [{name, distance, lat, lon}, ...]
+            'fuel_stations': [{name, distance, along_km, lat, lon}, ...],
+            'ev_chargers': [{name, distance, along_km, lat, lon}, ...],
+            'parking': [{name, distance, along_km, lat, lon}, ...]
         }
+        distance is km from the route, along_km km from the origin along it
     """
     if not origin_coords or not dest_coords:
-        return {'fuel_stations': [], 'ev_chargers': []}
+        return {'fuel_stations': [], 'ev_chargers': [], 'parking': []}
+    
+    store = get_poi_store()
+    if store is None:
+        poi_refresher.trigger()
+        return _live_stations(origin_coords, dest_coords, radius_km)
+    
+    if not route_coords:
+        route_coords = [[origin_coords[1], origin_coords[0]], [dest_coords[1], dest_coords[0]]]
+    found = store.along_route(route_coords, radius_km=radius_km)
+    return {
+        'fuel_stations': found['fuel'],
+        'ev_chargers': found['charging_station'],
+        'parking': found['parking']
+    }
+
+
+def _live_stations(origin_coords, dest_coords, radius_km=2.0):
+    """Overpass queries around the OD midpoint (used until the POI index is built)."""
     
     # Calculate midpoint
     mid_lat = (origin_coords[0] + dest_coords[0]) / 2
@@ -57,7 +92,8 @@ def get_stations_along_route(origin_coords, dest_coords, radius_km=2.0):
     
     results = {
         'fuel_stations': [],
-        'ev_chargers': []
+        'ev_chargers': [],
+        'parking': []
     }
     
     try:
@@ -94,7 +130,7 @@ def get_stations_along_route(origin_coords, dest_coords, radius_km=2.0):
                 })
         
     except Exception as e:
-        print(f"   ! Fuel station query failed: {e}")
+        logger.warning("Fuel station query failed: %s", e)
     
     try:
         # Query EV charging stations (amenity=charging_station)
@@ -130,7 +166,7 @@ def get_stations_along_route(origin_coords, dest_coords, radius_km=2.0):
                 })
         
     except Exception as e:
-        print(f"   ! EV charger query failed: {e}")
+        logger.warning("EV charger query failed: %s", e)
     
     # Sort by distance
     results['fuel_stations'].sort(key=lambda x: x['distance'])
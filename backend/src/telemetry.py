@@ -0,0 +1,255 @@
+"""
+Telemetry
+Lightweight latency instrumentation for the API.
+
+    with span("osrm"):
+        ...
+
+- Every span is recorded in a per-stage log-linear (HDR-style) histogram:
+  values in microseconds, 2**SUB_BITS sub-buckets per power of two, so any
+  quantile is exact to within ~6% at constant memory and O(1) recording.
+- Spans finishing inside a request are also collected for that request
+  (contextvar; follows asyncio tasks and asyncio.to_thread) and sent back
+  as a `Server-Timing` header by ServerTimingMiddleware.
+- render_prometheus() renders everything as Prometheus text for /metrics.
+
+A span costs a few microseconds: two perf_counter_ns() calls, a
+contextvar lookup and a locked increment.
+"""
+import functools
+import re
+import threading
+import time
+from contextvars import ContextVar
+
+SUB_BITS = 3
+_SUB = 1 << SUB_BITS
+# Prometheus `le` bounds in seconds
+PROM_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PROM_QUANTILES = (0.5, 0.9, 0.99)
+
+_request_spans = ContextVar("request_spans", default=None)
+# Server-Timing metric names are header tokens; anything else becomes "_"
+_TIMING_NAME_RE = re.compile(r"[^A-Za-z0-9_.\-]")
+
+
+def _bucket_index(us):
+    if us < _SUB:
+        return us
+    e = us.bit_length() - 1
+    return (e - SUB_BITS + 1) * _SUB + ((us >> (e - SUB_BITS)) & (_SUB - 1))
+
+
+def _bucket_bounds(idx):
+    # [low, high) microseconds of bucket `idx`
+    if idx < _SUB:
+        return idx, idx + 1
+    e = idx // _SUB + SUB_BITS - 1
+    width = 1 << (e - SUB_BITS)
+    low = (1 << e) + (idx % _SUB) * width
+    return low, low + width
+
+
+class Histogram:
+    """Log-linear latency histogram (microsecond resolution)."""
+    __slots__ = ("counts", "count", "total_us", "max_us", "_lock")
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+        self._lock = threading.Lock()
+
+    def record(self, us):
+        idx = _bucket_index(us)
+        with self._lock:
+            self.counts[idx] = self.counts.get(idx, 0) + 1
+            self.count += 1
+            self.total_us += us
+            if us > self.max_us:
+                self.max_us = us
+
+    def snapshot(self):
+        with self._lock:
+            return sorted(self.counts.items()), self.count, self.total_us, self.max_us
+
+    @staticmethod
+    def quantile_of(buckets, count, q):
+        """Quantile (microseconds, bucket midpoint) from a snapshot's buckets."""
+        if not count:
+            return 0.0
+        rank = q * count
+        seen = 0
+        for idx, n in buckets:
+            seen += n
+            if seen >= rank:
+                low, high = _bucket_bounds(idx)
+                return (low + high) / 2
+        low, high = _bucket_bounds(buckets[-1][0])
+        return (low + high) / 2
+
+    def quantile(self, q):
+        buckets, count, _, _ = self.snapshot()
+        return self.quantile_of(buckets, count, q)
+
+
+_HISTOGRAMS = {}
+_HISTOGRAMS_LOCK = threading.Lock()
+
+
+def histogram(name):
+    """The histogram for stage `name`, created on first use."""
+    hist = _HISTOGRAMS.get(name)
+    if hist is None:
+        with _HISTOGRAMS_LOCK:
+            hist = _HISTOGRAMS.setdefault(name, Histogram())
+    return hist
+
+
+def observe(name, seconds):
+    """Record a duration measured elsewhere as stage `name`."""
+    us = int(seconds * 1e6)
+    histogram(name).record(us)
+    spans = _request_spans.get()
+    if spans is not None:
+        spans.append((name, us))
+
+
+class span:
+    """
+    Time a block (sync or async body) as stage `name`:
+
+        with span("forecast"):
+            ...
+
+    Also usable as a decorator for plain functions.
+    """
+    __slots__ = ("name", "hist", "start")
+
+    def __init__(self, name):
+        self.name = name
+        self.hist = histogram(name)
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        us = (time.perf_counter_ns() - self.start) // 1000
+        self.hist.record(us)
+        spans = _request_spans.get()
+        if spans is not None:
+            spans.append((self.name, us))
+        return False
+
+    def __call__(self, fn):
+        name = self.name
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+def server_timing(spans):
+    """Server-Timing header value; repeated stages are summed."""
+    totals = {}
+    for name, us in spans:
+        name = _TIMING_NAME_RE.sub("_", name)
+        totals[name] = totals.get(name, 0) + us
+    return ", ".join(f"{name};dur={us / 1000:.1f}" for name, us in totals.items())
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware: collects the spans of each HTTP request, records the
+    whole request as "http <route>", and adds a Server-Timing header
+    listing the spans finished before the response headers were sent
+    (for streaming responses, the stages before the first byte).
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        spans = []
+        token = _request_spans.set(spans)
+        start = time.perf_counter_ns()
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                total_us = (time.perf_counter_ns() - start) // 1000
+                value = server_timing(spans + [("total", total_us)])
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", value.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            _request_spans.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            histogram(f"http {scope.get('method', 'GET')} {path}").record((time.perf_counter_ns() - start) // 1000)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def render_prometheus():
+    """All stage histograms in Prometheus text exposition format (seconds)."""
+    with _HISTOGRAMS_LOCK:
+        hists = sorted(_HISTOGRAMS.items())
+    lines = [
+        "# HELP stage_latency_seconds Latency of instrumented stages and HTTP routes.",
+        "# TYPE stage_latency_seconds histogram"
+    ]
+    quantile_lines = [
+        "# HELP stage_latency_quantile_seconds Latency quantiles of instrumented stages (log-linear histogram estimate).",
+        "# TYPE stage_latency_quantile_seconds gauge"
+    ]
+    max_lines = [
+        "# HELP stage_latency_max_seconds Slowest observation of each instrumented stage.",
+        "# TYPE stage_latency_max_seconds gauge"
+    ]
+    for name, hist in hists:
+        buckets, count, total_us, max_us = hist.snapshot()
+        stage = _label(name)
+        # A log-linear bucket counts under `le` once its upper bound is within it
+        cumulative, i = 0, 0
+        for le in PROM_BUCKETS:
+            le_us = le * 1e6
+            while i < len(buckets) and _bucket_bounds(buckets[i][0])[1] <= le_us:
+                cumulative += buckets[i][1]
+                i += 1
+            lines.append(f'stage_latency_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+        lines.append(f'stage_latency_seconds_bucket{{stage="{stage}",le="+Inf"}} {count}')
+        lines.append(f'stage_latency_seconds_sum{{stage="{stage}"}} {total_us / 1e6:.6f}')
+        lines.append(f'stage_latency_seconds_count{{stage="{stage}"}} {count}')
+        for q in PROM_QUANTILES:
+            value = Histogram.quantile_of(buckets, count, q) / 1e6
+            quantile_lines.append(f'stage_latency_quantile_seconds{{stage="{stage}",quantile="{q}"}} {value:.6f}')
+        max_lines.append(f'stage_latency_max_seconds{{stage="{stage}"}} {max_us / 1e6:.6f}')
+    return "\n".join(lines + quantile_lines + max_lines) + "\n"
+
+
+def latency_stats():
+    """Per-stage count, mean and quantiles in milliseconds (JSON-friendly)."""
+    with _HISTOGRAMS_LOCK:
+        hists = sorted(_HISTOGRAMS.items())
+    stats = {}
+    for name, hist in hists:
+        buckets, count, total_us, max_us = hist.snapshot()
+        stats[name] = {
+            "count": count,
+            "mean_ms": round(total_us / count / 1000, 3) if count else 0.0,
+            **{f"p{int(q * 100)}_ms": round(Histogram.quantile_of(buckets, count, q) / 1000, 3) for q in PROM_QUANTILES},
+            "max_ms": round(max_us / 1000, 3)
+        }
+    return stats
@@ -16,6 +16,9 @@ import joblib
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from src.data_loader import load_traffic_data
 from src.novelty_engine import HybridNoveltyEngine
+from src.log import get_logger
+
+logger = get_logger(__name__)
 
 def train_and_evaluate():
     # Define dataset paths
@@ -26,15 +29,15 @@ def train_and_evaluate():
         os.path.join(base_dir, "urban_traffic_flow_with_target.csv")
     ]
     
-    print("Loading and Unifying Datasets...")
+    logger.info("Loading and Unifying Datasets...")
     try:
         df = load_traffic_data(files)
     except Exception as e:
-        print(f"Error loading data: {e}")
+        logger.error("Error loading data: %s", e)
         return
 
-    print(f"Unified Data Shape: {df.shape}")
-    print(df.head())
+    logger.info("Unified Data Shape: %s", df.shape)
+    logger.info("%s", df.head())
     
     # 1. Feature Engineering (Basic)
     # Convert Timestamp to Hour/Day
@@ -48,7 +51,7 @@ def train_and_evaluate():
     # Define Target
     target_col = 'CongestionLevel'
     if target_col not in df.columns:
-        print("Error: Target column 'CongestionLevel' not found.")
+        logger.error("Target column 'CongestionLevel' not found.")
         return
         
     # Describe Canonical Features
@@ -62,7 +65,7 @@ def train_and_evaluate():
     # Filter DF to only these columns (if they exist)
     # We want to be strict to ensure model portability
     existing_canonical = [c for c in canonical_cols if c in df.columns]
-    print(f"Using Canonical Features: {existing_canonical}")
+    logger.info("Using Canonical Features: %s", existing_canonical)
     df = df[existing_canonical]
     
     # Drop rows with missing target
@@ -76,14 +79,14 @@ def train_and_evaluate():
     numerical_cols = X.select_dtypes(include=['int64', 'float64']).columns.tolist()
     categorical_cols = X.select_dtypes(include=['object', 'category']).columns.tolist()
     
-    print(f"Numerical Features: {numerical_cols}")
-    print(f"Categorical Features: {categorical_cols}")
+    logger.info("Numerical Features: %s", numerical_cols)
+    logger.info("Categorical Features: %s", categorical_cols)
     
     # Split Data
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
     
     # 2. Novelty Detection (Hybrid Engine)
-    print("\nTraining Hybrid Novelty Engine...")
+    logger.info("Training Hybrid Novelty Engine...")
     novelty_engine = HybridNoveltyEngine(contamination=0.05)
     
     # Fit on numerical features of training data (imputed)
@@ -94,7 +97,7 @@ def train_and_evaluate():
     
     # Generate Novelty Scores to use as a Feature
     # (Higher score = more likely to be outlier/mismatch)
-    print("Generating Novelty Scores as features...")
+    logger.info("Generating Novelty Scores as features...")
     X_train['NoveltyScore'] = novelty_engine.get_novelty_score(X_train_num)
     
     X_test_num = imputer.transform(X_test[numerical_cols])
@@ -104,7 +107,7 @@ def train_and_evaluate():
     numerical_cols.append('NoveltyScore')
     
     # 3. Main Model Training
-    print("\nTraining Traffic Prediction Model...")
+    logger.info("Training Traffic Prediction Model...")
     
     # Preprocessing Pipeline
     numerical_transformer = Pipeline(steps=[
@@ -132,25 +135,24 @@ def train_and_evaluate():
     clf.fit(X_train, y_train)
     
     # 4. Evaluation
-    print("\nEvaluating Model...")
+    logger.info("Evaluating Model...")
     y_pred = clf.predict(X_test)
     
-    print(f"Accuracy: {accuracy_score(y_test, y_pred):.4f}")
-    print("\nClassification Report:")
-    print(classification_report(y_test, y_pred))
+    logger.info("Accuracy: %.4f", accuracy_score(y_test, y_pred))
+    logger.info("Classification Report:\n%s", classification_report(y_test, y_pred))
     
     # Check Novelty on Test Set (How many 'New' samples?)
     novel_mask = X_test['NoveltyScore'] > 0.7 # threshold
     num_novel = novel_mask.sum()
-    print(f"\nNovel/Mismatch Samples in Test Set: {num_novel} out of {len(X_test)}")
+    logger.info("Novel/Mismatch Samples in Test Set: %s out of %s", num_novel, len(X_test))
     if num_novel > 0:
-        print(f"Accuracy on Novel Samples: {accuracy_score(y_test[novel_mask], y_pred[novel_mask]):.4f}")
-        print(f"Accuracy on Normal Samples: {accuracy_score(y_test[~novel_mask], y_pred[~novel_mask]):.4f}")
+        logger.info("Accuracy on Novel Samples: %.4f", accuracy_score(y_test[novel_mask], y_pred[novel_mask]))
+        logger.info("Accuracy on Normal Samples: %.4f", accuracy_score(y_test[~novel_mask], y_pred[~novel_mask]))
         
     # Save Model
     joblib.dump(clf, "traffic_model.pkl")
     joblib.dump(novelty_engine, "novelty_engine.pkl")
-    print("\nModels saved to traffic_model.pkl and novelty_engine.pkl")
+    logger.info("Models saved to traffic_model.pkl and novelty_engine.pkl")
 
 if __name__ == "__main__":
     train_and_evaluate()
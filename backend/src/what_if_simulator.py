@@ -4,6 +4,13 @@ Allows users to test how predictions change with modified conditions.
 """
 import pandas as pd
 
+try:
+    from src.log import get_logger
+except ImportError:
+    from log import get_logger
+
+logger = get_logger(__name__)
+
 def run_what_if_scenario(model, scaler, label_encoders, current_params, modifications):
     """
     Run prediction with modified parameters.
@@ -23,8 +30,9 @@ def run_what_if_scenario(model, scaler, label_encoders, current_params, modifica
             'impact_description': str
         }
     """
-    import torch
     import numpy as np
+    from src.categorical import encode_label, is_known
+    from src.inference_batcher import predict_proba
     
     # Make a copy of current params
     modified_params = current_params.copy()
@@ -45,17 +53,12 @@ def run_what_if_scenario(model, scaler, label_encoders, current_params, modifica
     # Create DataFrame
     df = pd.DataFrame([modified_params])
     
-    # Encode categoricals - FIX: properly extract scalar values
+    # Encode categoricals (unknown values use the default code 0)
     for col in ['WeatherCondition', 'origin', 'destination']:
         if col in df.columns and col in label_encoders:
-            try:
-                # Transform returns array, extract first element
-                encoded_array = label_encoders[col].transform(df[col])
-                df[col] = int(encoded_array[0])
-            except (ValueError, KeyError, IndexError):
-                # Unknown value - use default (0)
-                df[col] = 0
-                print(f"   (Note: '{modified_params.get(col)}' not in training data, using default)")
+            if not is_known(label_encoders, col, modified_params.get(col)):
+                logger.debug("(Note: '%s' not in training data, using default)", modified_params.get(col))
+            df[col] = encode_label(label_encoders, col, modified_params.get(col))
 
 
     # Scale features - use only the features the scaler was trained on (7 features)
@@ -69,15 +72,11 @@ def run_what_if_scenario(model, scaler, label_encoders, current_params, modifica
     
     # Convert to numpy array and scale
     X = scaler.transform(df[feature_cols].values)
-    X_tensor = torch.FloatTensor(X).unsqueeze(1)
     
-    # Predict
-    model.eval()
-    with torch.no_grad():
-        output = model(X_tensor)
-        probabilities = torch.softmax(output, dim=1)
-        pred_class = torch.argmax(probabilities, dim=1).item()
-        confidence = probabilities[0][pred_class].item() * 100
+    # Predict (single-step window, shares the micro-batcher with other requests)
+    probabilities = predict_proba(model, X[:, None, :])
+    pred_class = int(np.argmax(probabilities[0]))
+    confidence = float(probabilities[0][pred_class]) * 100
     
     # Calculate change
     original_level = current_params.get('_original_prediction', 0)
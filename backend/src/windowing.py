@@ -0,0 +1,100 @@
+"""
+Sequence Windowing
+Vectorized sliding-window builder for LSTM training data.
+
+Windows are strided views over each group's rows (no per-window copies);
+the only copy is the final gather into one contiguous (N, L, F) array,
+which can optionally be written straight into a memory-mapped file.
+"""
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def window_view(data, sequence_length):
+    """
+    Zero-copy view of every full window that has a following row.
+
+    Args:
+        data: (rows, features) array
+        sequence_length: Window length L
+
+    Returns:
+        (rows - L, L, features) strided view; window i covers data[i:i+L]
+        and pairs with target row i+L
+    """
+    n = len(data) - sequence_length
+    if n <= 0:
+        return np.empty((0, sequence_length) + data.shape[1:], dtype=data.dtype)
+    # sliding_window_view puts the window axis last: (T, F, L) -> (T, L, F)
+    return sliding_window_view(data, sequence_length, axis=0).transpose(0, 2, 1)[:n]
+
+
+def group_slices(groups):
+    """
+    Order rows so each group is contiguous, in sorted group order
+    (the order DataFrame.groupby iterates), keeping row order within a group.
+
+    Returns:
+        (order, bounds): row permutation and [start, stop) offsets per group
+    """
+    codes, _ = pd.factorize(pd.Series(groups), sort=True)
+    order = np.argsort(codes, kind="stable")
+    counts = np.bincount(codes[codes >= 0])
+    bounds = np.concatenate([[0], np.cumsum(counts)])
+    # Rows with a missing group key (code -1) sort first and are dropped, as groupby does
+    order = order[np.count_nonzero(codes < 0):]
+    return order, bounds
+
+
+def build_windows(data, target, sequence_length, groups=None, out_path=None, dtype=None):
+    """
+    Build (X, y) training windows, never crossing group boundaries.
+
+    Args:
+        data: (rows, features) array
+        target: (rows,) array
+        sequence_length: Window length L
+        groups: Optional per-row group key (e.g. City or route_id values)
+        out_path: If set, X is written to a .npy memory-mapped file at this path
+        dtype: Output dtype for X (defaults to data.dtype)
+
+    Returns:
+        X: (windows, L, features), y: (windows,)
+    """
+    data = np.asarray(data)
+    target = np.asarray(target)
+    dtype = data.dtype if dtype is None else np.dtype(dtype)
+
+    if groups is None:
+        bounds = np.array([0, len(data)])
+    else:
+        order, bounds = group_slices(groups)
+        data = data[order]
+        target = target[order]
+
+    sizes = np.maximum(np.diff(bounds) - sequence_length, 0)
+    total = int(sizes.sum())
+    shape = (total, sequence_length) + data.shape[1:]
+
+    if out_path is None and len(sizes) == 1 and dtype == data.dtype:
+        # Single group: hand back the strided view itself
+        return window_view(data, sequence_length), target[sequence_length:]
+
+    if out_path is not None:
+        X = np.lib.format.open_memmap(out_path, mode="w+", dtype=dtype, shape=shape)
+    else:
+        X = np.empty(shape, dtype=dtype)
+    y = np.empty(total, dtype=target.dtype)
+
+    offset = 0
+    for start, stop, n in zip(bounds[:-1], bounds[1:], sizes):
+        if n == 0:
+            continue
+        X[offset:offset + n] = window_view(data[start:stop], sequence_length)
+        y[offset:offset + n] = target[start + sequence_length:stop]
+        offset += n
+
+    if out_path is not None:
+        X.flush()
+    return X, y
@@ -0,0 +1,70 @@
+"""
+Local stub HTTP server for the upstream tests (test_http_pool.py,
+test_insight_cache.py).
+
+    with StubServer({"/ok": lambda n, body: (200, {"ok": True})}, delay=0.1) as stub:
+        configure_upstream("osrm", base_url=stub.url)
+        ...
+        stub.hits["/ok"]  # requests served for that path
+
+Each route gets the 1-based request number for its path and the decoded
+JSON request body (or None) and returns (status, payload); dict payloads
+are sent as JSON. Unknown paths answer 404.
+"""
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubServer:
+    def __init__(self, routes, delay=0.0):
+        self.routes = routes
+        self.delay = delay
+        self.hits = Counter()
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _serve(self):
+                path = self.path.split("?")[0]
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                with stub._lock:
+                    stub.hits[path] += 1
+                    n = stub.hits[path]
+                if stub.delay:
+                    time.sleep(stub.delay)
+                route = stub.routes.get(path)
+                status, payload = route(n, body) if route else (404, {"error": "not found"})
+                data = json.dumps(payload).encode() if isinstance(payload, dict) else str(payload).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up (cancelled call)
+
+            do_GET = do_POST = _serve
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,88 @@
+"""
+Unified dataset cache: a cached load (Feather or Parquet) returns the same
+frame, dtypes and encoders as a fresh build, without re-reading the CSVs.
+
+Run: python test_dataset_cache.py  (or pytest test_dataset_cache.py)
+"""
+import os
+import sys
+import tempfile
+import time
+
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(backend_dir)
+
+import numpy as np
+import pandas as pd
+
+import src.data_loader as data_loader
+
+
+def _write_csvs(folder):
+    rng = np.random.default_rng(3)
+    n = 500
+    multi = pd.DataFrame({
+        "timestamp": pd.date_range("2024-01-01", periods=n, freq="h").astype(str),
+        "origin": rng.choice(["Andheri", "Bandra", "Dadar"], n),
+        "destination": rng.choice(["Worli", "Powai", "Thane"], n),
+        "traffic_volume": rng.integers(0, 4000, n),
+        "avg_speed": rng.uniform(5, 60, n).round(3),
+        "hour": rng.integers(0, 24, n),
+        "congestion_index": rng.uniform(0, 1, n),
+    })
+    smart = pd.DataFrame({
+        "Vehicle_Count": rng.integers(0, 300, n),
+        "Vehicle_Speed": rng.uniform(5, 80, n),
+        "Congestion_Level": rng.choice(["Low", "Medium", "High"], n),
+    })
+    paths = [os.path.join(folder, "mumbai_multi_route.csv"), os.path.join(folder, "smart_mobility.csv")]
+    multi.to_csv(paths[0], index=False)
+    smart.to_csv(paths[1], index=False)
+    return paths
+
+
+def _round_trip(fmt):
+    folder = tempfile.mkdtemp()
+    paths = _write_csvs(folder)
+    os.environ["DATASET_CACHE_FORMAT"] = fmt
+    try:
+        fresh, fresh_enc = data_loader.unify_datasets(paths, use_cache=False)
+        first, _ = data_loader.unify_datasets(paths)
+        cache_dir = os.path.join(folder, ".dataset_cache")
+        assert any(name.endswith(f".{fmt}") for name in os.listdir(cache_dir))
+
+        # A cache hit must not rebuild
+        build, data_loader._unify_datasets = data_loader._unify_datasets, None
+        try:
+            cached, cached_enc = data_loader.unify_datasets(paths)
+        finally:
+            data_loader._unify_datasets = build
+    finally:
+        os.environ.pop("DATASET_CACHE_FORMAT", None)
+
+    pd.testing.assert_frame_equal(first, fresh)
+    pd.testing.assert_frame_equal(cached, fresh)
+    assert list(cached_enc) == list(fresh_enc) == ["origin", "destination"]
+    assert pd.Index(cached_enc["origin"].classes_).equals(pd.Index(fresh_enc["origin"].classes_))
+
+
+def test_feather_round_trip():
+    _round_trip("feather")
+
+
+def test_parquet_round_trip():
+    _round_trip("parquet")
+
+
+if __name__ == "__main__":
+    failed = 0
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            start = time.perf_counter()
+            try:
+                test()
+                print(f"PASS {name} ({time.perf_counter() - start:.2f}s)")
+            except Exception as e:
+                failed += 1
+                print(f"FAIL {name}: {e!r}")
+    sys.exit(1 if failed else 0)
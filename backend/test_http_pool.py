@@ -0,0 +1,187 @@
+"""
+Upstream HTTP layer against a local stub server: retries, circuit breaker,
+single-flight loads through context_cache and failed loads not being cached.
+
+Run: python test_http_pool.py  (or pytest test_http_pool.py)
+"""
+import asyncio
+import os
+import sys
+import time
+
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(backend_dir)
+
+import httpx
+
+from src.context_cache import TTLCache
+from src.http_pool import CircuitOpenError, Upstream, configure_upstream, get_upstream
+from stub_server import StubServer
+
+ROUTES = {
+    "/ok": lambda n, body: (200, {"n": n}),
+    "/flaky": lambda n, body: (500, {"error": "boom"}) if n <= 2 else (200, {"n": n}),
+    "/down": lambda n, body: (503, {"error": "down"}),
+    "/missing": lambda n, body: (404, {"error": "no route"}),
+}
+
+
+def test_retries_recover_from_5xx():
+    async def run(stub):
+        upstream = Upstream("stub", stub.url, retries=2)
+        response = await upstream.get("/flaky")
+        await upstream.aclose()
+        return upstream, response
+
+    with StubServer(ROUTES) as stub:
+        upstream, response = asyncio.run(run(stub))
+        assert response.status_code == 200
+        assert stub.hits["/flaky"] == 3
+        assert upstream.failures == 2 and upstream.breaker.state == "closed"
+
+
+def test_4xx_is_returned_without_retry():
+    async def run(stub):
+        upstream = Upstream("stub", stub.url, retries=2)
+        response = await upstream.get("/missing")
+        await upstream.aclose()
+        return response
+
+    with StubServer(ROUTES) as stub:
+        assert asyncio.run(run(stub)).status_code == 404
+        assert stub.hits["/missing"] == 1
+
+
+def test_circuit_breaker_opens_and_recovers():
+    async def run(stub):
+        upstream = Upstream("stub", stub.url, retries=0, breaker_threshold=3, breaker_reset=0.3)
+        for _ in range(3):
+            try:
+                await upstream.get("/down")
+                raise AssertionError("expected HTTPStatusError")
+            except httpx.HTTPStatusError:
+                pass
+        assert upstream.breaker.state == "open"
+
+        # Open: rejected without reaching the server
+        try:
+            await upstream.get("/ok")
+            raise AssertionError("expected CircuitOpenError")
+        except CircuitOpenError:
+            pass
+        assert stub.hits["/ok"] == 0 and upstream.rejected == 1
+
+        # Half-open after reset_after: one trial call, which closes it again
+        await asyncio.sleep(0.35)
+        assert upstream.breaker.state == "half_open"
+        assert (await upstream.get("/ok")).status_code == 200
+        assert upstream.breaker.state == "closed"
+        await upstream.aclose()
+
+    with StubServer(ROUTES) as stub:
+        asyncio.run(run(stub))
+        assert stub.hits["/down"] == 3 and stub.hits["/ok"] == 1
+
+
+def test_cancelled_half_open_trial_frees_the_slot():
+    async def run(stub):
+        upstream = Upstream("stub", stub.url, retries=0, breaker_threshold=1, breaker_reset=0.1)
+        try:
+            await upstream.get("/down")
+            raise AssertionError("expected HTTPStatusError")
+        except httpx.HTTPStatusError:
+            pass
+        await asyncio.sleep(0.15)
+        assert upstream.breaker.state == "half_open"
+
+        # The trial call is cancelled by its caller's deadline
+        try:
+            await asyncio.wait_for(upstream.get("/ok"), timeout=0.05)
+            raise AssertionError("expected TimeoutError")
+        except asyncio.TimeoutError:
+            pass
+        assert upstream.breaker.state == "half_open" and upstream.rejected == 0
+
+        # The next caller gets the trial slot and closes the circuit
+        assert (await upstream.get("/ok")).status_code == 200
+        assert upstream.breaker.state == "closed"
+        await upstream.aclose()
+
+    with StubServer(ROUTES, delay=0.2) as stub:
+        asyncio.run(run(stub))
+
+
+def test_single_flight_and_errors_not_cached():
+    async def run(stub):
+        cache = TTLCache("stub_test", maxsize=8, ttl=60)
+        upstream = Upstream("stub", stub.url, retries=0, breaker_threshold=100)
+
+        async def fetch(path):
+            response = await upstream.get(path)
+            return response.json()
+
+        # 50 concurrent callers for one key: one upstream request
+        results = await asyncio.gather(*[cache.get_or_load_async("ok", lambda: fetch("/ok")) for _ in range(50)])
+        assert all(r == {"n": 1} for r in results)
+        assert stub.hits["/ok"] == 1
+
+        # Failed loads raise to every waiter and are not stored
+        for attempt in range(2):
+            results = await asyncio.gather(*[cache.get_or_load_async("down", lambda: fetch("/down")) for _ in range(10)],
+                                           return_exceptions=True)
+            assert all(isinstance(r, httpx.HTTPStatusError) for r in results)
+            assert stub.hits["/down"] == attempt + 1
+        assert cache.last_value("down") is None
+        await upstream.aclose()
+
+    with StubServer(ROUTES, delay=0.2) as stub:
+        asyncio.run(run(stub))
+
+
+def test_cancelled_leader_does_not_strand_waiters():
+    async def run(stub):
+        cache = TTLCache("stub_cancel", maxsize=8, ttl=60)
+        upstream = Upstream("stub", stub.url, retries=0)
+
+        async def fetch():
+            return (await upstream.get("/ok")).json()
+
+        leader = asyncio.ensure_future(cache.get_or_load_async("ok", fetch))
+        await asyncio.sleep(0.05)
+        waiter = asyncio.ensure_future(cache.get_or_load_async("ok", fetch))
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        results = await asyncio.gather(leader, waiter, return_exceptions=True)
+        assert all(isinstance(r, asyncio.CancelledError) for r in results)
+        assert "ok" not in cache._inflight
+
+        # The next caller loads afresh instead of waiting forever
+        assert (await asyncio.wait_for(cache.get_or_load_async("ok", fetch), timeout=2))["n"] == 2
+        await upstream.aclose()
+
+    with StubServer(ROUTES, delay=0.2) as stub:
+        asyncio.run(run(stub))
+
+
+def test_configure_upstream_points_at_stub():
+    async def run():
+        return await get_upstream("osrm").get("/ok")
+
+    with StubServer(ROUTES) as stub:
+        configure_upstream("osrm", base_url=stub.url, retries=0)
+        assert asyncio.run(run()).json() == {"n": 1}
+        assert get_upstream("osrm").stats()["base_url"] == stub.url
+
+
+if __name__ == "__main__":
+    failed = 0
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            start = time.perf_counter()
+            try:
+                test()
+                print(f"PASS {name} ({time.perf_counter() - start:.2f}s)")
+            except Exception as e:
+                failed += 1
+                print(f"FAIL {name}: {e!r}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,190 @@
+"""
+LLM insight cache against a local OpenAI-compatible stub server:
+single-flight per bucketed situation, the SQLite tier, peek() keeping
+LRU/TTL, and failed model calls never being cached.
+
+Run: python test_insight_cache.py  (or pytest test_insight_cache.py)
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(backend_dir)
+
+from stub_server import StubServer
+
+STATE = {"fail": False}
+
+
+def _completion(n, body):
+    if STATE["fail"]:
+        return 500, {"error": {"message": "model overloaded"}}
+    return 200, {
+        "id": f"stub-{n}", "object": "chat.completion", "created": 0, "model": "stub",
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": f"Insight #{n}"}}],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+    }
+
+
+STUB = StubServer({"/v1/chat/completions": _completion}, delay=0.2)
+os.environ["FEATHERLESS_API_KEY"] = "stub-key"
+
+from src.insight_cache import InsightCache, bucket_structured_data, insight_key
+
+
+def _generate():
+    # Minimal model call, so the cache tier tests need no SDK
+    request = urllib.request.Request(f"{STUB.url}/v1/chat/completions", data=b"{}",
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)["choices"][0]["message"]["content"]
+
+
+def _genai():
+    # genai_handler reads the Featherless base URL and key at import
+    # (needs openai + httpx)
+    from src.http_pool import configure_upstream
+    configure_upstream("featherless", base_url=f"{STUB.url}/v1")
+    import genai_handler
+    return genai_handler
+
+
+def _db_path():
+    return os.path.join(tempfile.mkdtemp(), "insights.db")
+
+
+def test_sqlite_tier_serves_a_fresh_instance():
+    path = _db_path()
+    hits = STUB.hits["/v1/chat/completions"]
+    first = InsightCache(maxsize=8, ttl=60, path=path)
+    value = first.get_or_generate("k", _generate)
+    assert STUB.hits["/v1/chat/completions"] == hits + 1
+
+    # Another process / a restart: memory is empty, SQLite answers
+    second = InsightCache(maxsize=8, ttl=60, path=path)
+    assert second.get_or_generate("k", _generate) == value
+    assert second.peek("k") == value
+    assert STUB.hits["/v1/chat/completions"] == hits + 1
+    assert second.db_hits == 1
+
+
+def test_peek_keeps_db_age_and_lru_bound():
+    path = _db_path()
+    cache = InsightCache(maxsize=2, ttl=1.0, path=path)
+    for key in ("a", "b", "c"):
+        cache._db_put(key, f"value {key}")
+    cache._conn().execute("UPDATE insights SET stored_at = stored_at - 0.7 WHERE key = 'a'")
+
+    reader = InsightCache(maxsize=2, ttl=1.0, path=path)
+    assert [reader.peek(k) for k in ("a", "b", "c")] == ["value a", "value b", "value c"]
+    assert len(reader._data) == 2 and reader.evictions == 1
+
+    # "a" was already 0.7 s old in SQLite; its memory copy expires with it
+    reader.invalidate("b")
+    reader.peek("a")
+    time.sleep(0.4)
+    assert reader.peek("a") is None
+
+
+def test_loads_from_sqlite_keep_db_age():
+    path = _db_path()
+    cache = InsightCache(maxsize=8, ttl=1.0, path=path)
+    for key in ("sync", "async"):
+        cache._db_put(key, f"value {key}")
+    cache._conn().execute("UPDATE insights SET stored_at = stored_at - 0.7")
+
+    reader = InsightCache(maxsize=8, ttl=1.0, path=path)
+    assert reader.get_or_generate("sync", _generate) == "value sync"
+
+    async def generate():
+        return _generate()
+    assert asyncio.run(reader.get_or_generate_async("async", generate)) == "value async"
+    assert reader.db_hits == 2 and not reader._row_ages
+
+    # Both memory copies expire with their rows, not a full TTL later
+    time.sleep(0.4)
+    assert reader.peek("sync") is None and reader.peek("async") is None
+
+
+def test_failed_calls_are_not_cached():
+    path = _db_path()
+    cache = InsightCache(maxsize=8, ttl=60, path=path)
+    hits = STUB.hits["/v1/chat/completions"]
+    STATE["fail"] = True
+    try:
+        for _ in range(2):
+            try:
+                cache.get_or_generate("k", _generate)
+                raise AssertionError("expected HTTPError")
+            except urllib.error.HTTPError:
+                pass
+    finally:
+        STATE["fail"] = False
+    assert STUB.hits["/v1/chat/completions"] == hits + 2
+    assert cache.peek("k") is None
+    assert sqlite3.connect(path).execute("SELECT COUNT(*) FROM insights").fetchone()[0] == 0
+    assert cache.get_or_generate("k", _generate).startswith("Insight #")
+
+
+def test_single_flight_per_bucket():
+    # Through genai_handler and the pooled "featherless" upstream
+    generate_traffic_insight_async = _genai().generate_traffic_insight_async
+    from src.insight_cache import insight_cache
+
+    def situation(eta):
+        return {"selected_route_name": "Western Express Highway", "selected_eta": eta,
+                "selected_congestion": "2", "recommended_route_name": "SV Road",
+                "recommended_eta": eta - 5, "time_savings": 5}
+
+    async def run():
+        # ETAs 19-21 share the 20-minute bucket, 29-31 the 30-minute one
+        etas = [19, 20, 21, 29, 30, 31] * 9
+        return await asyncio.gather(*[generate_traffic_insight_async(situation(eta)) for eta in etas])
+
+    insight_cache.invalidate()
+    hits = STUB.hits["/v1/chat/completions"]
+    results = asyncio.run(run())
+    assert STUB.hits["/v1/chat/completions"] == hits + 2
+    assert len(set(results)) == 2 and all(r.startswith("Insight #") for r in results)
+    assert insight_key(bucket_structured_data(situation(21)), "Fastest route") in insight_cache._data
+
+
+def test_fallback_text_is_not_cached():
+    generate_traffic_insight_async = _genai().generate_traffic_insight_async
+    from src.insight_cache import insight_cache
+
+    data = {"selected_eta": 47, "recommended_eta": 40, "time_savings": 7}
+    insight_cache.invalidate()
+    STATE["fail"] = True
+    try:
+        fallback = asyncio.run(generate_traffic_insight_async(data))
+    finally:
+        STATE["fail"] = False
+    assert "(Source: Fallback)" in fallback
+    assert insight_cache.peek(insight_key(bucket_structured_data(data), "Fastest route")) is None
+    assert asyncio.run(generate_traffic_insight_async(data)).startswith("Insight #")
+
+
+if __name__ == "__main__":
+    failed = 0
+    try:
+        for name, test in list(globals().items()):
+            if name.startswith("test_"):
+                start = time.perf_counter()
+                try:
+                    test()
+                    print(f"PASS {name} ({time.perf_counter() - start:.2f}s)")
+                except Exception as e:
+                    failed += 1
+                    print(f"FAIL {name}: {e!r}")
+    finally:
+        STUB.close()
+    sys.exit(1 if failed else 0)
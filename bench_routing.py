@@ -0,0 +1,126 @@
+"""
+Benchmark: local routing (RoadGraph queries)
+
+Times A* with the straight-line bound alone (ROUTING_LANDMARKS=0) against
+ALT landmark bounds on a synthetic city-sized drive graph: a jittered grid
+with arterials every few blocks, one-way streets and missing links. Query
+pairs are random; every shortest path is checked against scipy's Dijkstra
+first. Reported per query: the single shortest path, k=3 free-flow
+alternatives (local_routes), the forecast-timed best path (/api/route's
+default) and k=3 forecast-timed alternatives (traffic_routes).
+
+Usage: python bench_routing.py [side] [queries] [landmarks]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+from src.local_router import RoadGraph
+from src.edge_costs import cost_table, hourly_load
+
+
+def make_graph(side, landmarks):
+    """side x side jittered grid over Mumbai's extent."""
+    rng = np.random.default_rng(7)
+    n = side * side
+    r, c = np.divmod(np.arange(n), side)
+    lat = 18.90 + 0.35 * (r + rng.uniform(-0.3, 0.3, n)) / side
+    lon = 72.78 + 0.20 * (c + rng.uniform(-0.3, 0.3, n)) / side
+
+    tails, heads, speeds = [], [], []
+    for dr, dc in ((0, 1), (1, 0)):
+        a = np.flatnonzero((r + dr < side) & (c + dc < side))
+        b = a + dr * side + dc
+        line = r[a] if dr == 0 else c[a]
+        speed = np.where(line % 40 == 0, 80.0, np.where(line % 8 == 0, 45.0, 25.0))
+        keep = (speed > 25) | (rng.random(len(a)) > 0.08)   # missing side-street links
+        oneway = (speed == 25) & (rng.random(len(a)) < 0.15)
+        a, b, speed, oneway = a[keep], b[keep], speed[keep], oneway[keep]
+        forward = rng.random(len(a)) < 0.5
+        along = forward | ~oneway
+        tails += [np.where(along, a, b), b[~oneway]]
+        heads += [np.where(along, b, a), a[~oneway]]
+        speeds += [speed, speed[~oneway]]
+    tail = np.concatenate(tails).astype(np.int32)
+    head = np.concatenate(heads).astype(np.int32)
+    speed = np.concatenate(speeds).astype(np.float32)
+
+    order = np.lexsort((head, tail))
+    tail, head, speed = tail[order], head[order], speed[order]
+    k = np.radians(1) * 6371000.0
+    length = np.hypot((lon[head] - lon[tail]) * k * np.cos(np.radians(19.1)), (lat[head] - lat[tail]) * k).astype(np.float32)
+    geom = np.stack([np.stack([lon[tail], lat[tail]], 1), np.stack([lon[head], lat[head]], 1)], 1).reshape(-1, 2)
+    return RoadGraph(
+        landmarks=landmarks,
+        lat=lat, lon=lon,
+        indptr=np.concatenate([[0], np.cumsum(np.bincount(tail, minlength=n))]).astype(np.int64),
+        tail=tail, head=head, length=length, speed=speed,
+        travel=(length / (speed / 3.6)).astype(np.float32),
+        name_idx=np.full(len(tail), -1, dtype=np.int32), names=np.array([], dtype=str),
+        geom_ptr=np.arange(0, 2 * len(tail) + 1, 2, dtype=np.int64), geom=geom.astype(np.float32)
+    )
+
+
+def _pct(values, q):
+    return float(np.percentile(values, q)) * 1000
+
+
+def main():
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 350
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    landmarks = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+
+    rng = np.random.default_rng(1)
+    graphs = {}
+    for name, count in (("straight-line", 0), (f"ALT ({landmarks})", landmarks)):
+        start = time.perf_counter()
+        graphs[name] = make_graph(side, count)
+        graphs[name].prep = time.perf_counter() - start
+    base = next(iter(graphs.values()))
+    print(f"Nodes: {base.n_nodes}, edges: {base.n_edges}, queries: {queries}\n")
+
+    # Random connected pairs, checked against scipy's Dijkstra
+    fwd = csr_matrix((np.maximum(base.travel.astype(np.float64), 1e-6), base.head, base.indptr),
+                     shape=(base.n_nodes, base.n_nodes))
+    pairs = []
+    while len(pairs) < queries:
+        s, t = (int(v) for v in rng.integers(0, base.n_nodes, 2))
+        exact = dijkstra(fwd, indices=s)[t]
+        if np.isfinite(exact):
+            pairs.append((s, t, exact))
+    for graph in graphs.values():
+        for s, t, exact in pairs:
+            assert abs(graph.shortest_path(s, t)[0] - exact) < 1e-2 * max(exact, 1.0), (s, t)
+
+    costs = {name: cost_table(graph, hourly_load(None)) for name, graph in graphs.items()}
+    print(f"{'bound':<16}{'build (s)':>10}{'MB':>8}{'path p50/p95 (ms)':>20}"
+          f"{'k=3 p50/p95 (ms)':>20}{'timed p50/p95 (ms)':>22}{'k=3 timed p50/p95 (ms)':>26}")
+    for name, graph in graphs.items():
+        single, alts, timed_single, timed = [], [], [], []
+        for s, t, _ in pairs:
+            start = time.perf_counter()
+            graph.shortest_path(s, t)
+            single.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            graph.alternatives(s, t, k=3)
+            alts.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            graph.alternatives(s, t, k=1, costs=costs[name], depart=8 * 3600.0)
+            timed_single.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            graph.alternatives(s, t, k=3, costs=costs[name], depart=8 * 3600.0)
+            timed.append(time.perf_counter() - start)
+        print(f"{name:<16}{graph.prep:>10.2f}{graph.nbytes() / 1e6:>8.1f}"
+              f"{_pct(single, 50):>11.1f} / {_pct(single, 95):<6.1f}"
+              f"{_pct(alts, 50):>11.1f} / {_pct(alts, 95):<6.1f}"
+              f"{_pct(timed_single, 50):>13.1f} / {_pct(timed_single, 95):<6.1f}"
+              f"{_pct(timed, 50):>15.1f} / {_pct(timed, 95):<6.1f}")
+
+
+if __name__ == "__main__":
+    main()
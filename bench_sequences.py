@@ -0,0 +1,91 @@
+"""
+Benchmark: LSTM sequence building (create_sequences windowing)
+
+Compares the old per-window Python loop with the vectorized windowing
+utility, in RAM and memory-mapped. Each variant runs in its own process so
+peak RSS is measured independently.
+
+Usage: python bench_sequences.py [rows] [cities] [sequence_length]
+"""
+import os
+import resource
+import sys
+import tempfile
+import time
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from windowing import build_windows
+
+FEATURES = ['VehicleCount', 'Speed', 'Hour', 'DayOfWeek', 'IsWeekend', 'WeatherCondition', 'NoveltyScore']
+
+
+def make_frame(rows, cities):
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame(rng.random((rows, len(FEATURES))), columns=FEATURES)
+    df['City'] = rng.choice([f"City_{i}" for i in range(cities)], rows)
+    df['target'] = rng.integers(0, 3, rows)
+    return df
+
+
+def legacy(df, seq_len):
+    X, y = [], []
+    for city, group in df.groupby('City'):
+        group_data = group[FEATURES].values
+        group_target = group['target'].values
+        for i in range(seq_len, len(group_data)):
+            X.append(group_data[i-seq_len:i])
+            y.append(group_target[i])
+    return np.array(X), np.array(y)
+
+
+def vectorized(df, seq_len):
+    return build_windows(df[FEATURES].to_numpy(dtype=np.float32), df['target'].values,
+                         seq_len, groups=df['City'].values)
+
+
+def memmapped(df, seq_len):
+    path = os.path.join(tempfile.gettempdir(), "bench_sequences_X.npy")
+    try:
+        return build_windows(df[FEATURES].to_numpy(dtype=np.float32), df['target'].values,
+                             seq_len, groups=df['City'].values, out_path=path)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _run(name, rows, cities, seq_len, out):
+    df = make_frame(rows, cities)
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    X, y = {"legacy": legacy, "vectorized": vectorized, "memmap": memmapped}[name](df, seq_len)
+    elapsed = time.perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    out.put((name, X.shape, elapsed, base_rss, peak_rss))
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    cities = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    seq_len = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    print(f"Rows: {rows}, Cities: {cities}, Sequence length: {seq_len}\n")
+    print(f"{'variant':<12}{'windows':>12}{'time (s)':>12}{'peak RSS (MB)':>16}{'delta (MB)':>12}")
+
+    ctx = get_context("spawn")
+    for name in ("legacy", "vectorized", "memmap"):
+        out = ctx.Queue()
+        proc = ctx.Process(target=_run, args=(name, rows, cities, seq_len, out))
+        proc.start()
+        _, shape, elapsed, base_rss, peak_rss = out.get()
+        proc.join()
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        unit = 1024 * 1024 if sys.platform == "darwin" else 1024
+        print(f"{name:<12}{shape[0]:>12}{elapsed:>12.3f}{peak_rss / unit:>16.1f}{(peak_rss - base_rss) / unit:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
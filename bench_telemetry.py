@@ -0,0 +1,68 @@
+"""
+Benchmark / soak driver: city-wide telemetry ticks
+
+Simulates volumes and probe speeds for every road segment each tick with the
+vectorized TelemetryEngine, and compares one tick against the per-segment
+GPSDataStream loop.
+
+Usage: python bench_telemetry.py [segments] [ticks] [seed]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from sensor_interface import TelemetryEngine, TrafficPhysics
+
+
+def legacy_tick(physics, volumes):
+    # GPSDataStream.get_average_speed, one segment at a time
+    speeds = []
+    for v in volumes:
+        true_speed = physics.bpr_speed(v)
+        num_probes = max(10, int(v * 0.05))
+        probe_speeds = np.clip(np.random.normal(true_speed, 8.0, num_probes), 1.0, 120.0)
+        speeds.append(len(probe_speeds) / np.sum(1.0 / probe_speeds))
+    return np.array(speeds)
+
+
+def main():
+    segments = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 24
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 42
+
+    engine = TelemetryEngine(seed=seed)
+    physics = TrafficPhysics()
+    print(f"Segments: {segments}, Ticks: {ticks}, Seed: {seed}\n")
+
+    volumes = engine.volumes(17, shape=(segments,))
+    start = time.perf_counter()
+    legacy_tick(physics, volumes)
+    t_loop = time.perf_counter() - start
+    start = time.perf_counter()
+    engine.probe_speeds(volumes)
+    t_vec = time.perf_counter() - start
+    print(f"One tick  loop: {t_loop * 1000:8.1f} ms   vectorized: {t_vec * 1000:8.1f} ms   ({t_loop / t_vec:.1f}x)")
+
+    # Soak: a full day, every segment, one pass per tick
+    hours = np.arange(ticks) % 24
+    start = time.perf_counter()
+    worst = 0.0
+    for h in hours:
+        t0 = time.perf_counter()
+        vol, speed = engine.tick(h, shape=(segments,))
+        worst = max(worst, time.perf_counter() - t0)
+    total = time.perf_counter() - start
+    print(f"Soak      {ticks} ticks in {total:.2f} s   mean {total / ticks * 1000:.1f} ms/tick   worst {worst * 1000:.1f} ms")
+
+    # Whole day as one (ticks, segments) batch
+    start = time.perf_counter()
+    vol, speed = engine.tick(hours[:, None], shape=(ticks, segments))
+    print(f"Batch     {vol.size} segment-hours in {(time.perf_counter() - start) * 1000:.1f} ms   "
+          f"mean speed {speed.mean():.2f} km/h")
+
+
+if __name__ == "__main__":
+    main()
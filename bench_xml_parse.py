@@ -0,0 +1,138 @@
+"""
+Benchmark: traffic XML parsing (parse_xml_to_df)
+
+Compares the original whole-tree parser (ET.parse + find() per field +
+one dict per record) with the streaming chunked parser, on a file built by
+repeating the records of synthetic_traffic_data.xml. Each variant runs in
+its own process, best of `repeat` runs; peak RSS is reset before the parse
+on Linux (a spawned child otherwise inherits its parent's peak). The two
+frames are checked for equality first.
+
+Usage: python bench_xml_parse.py [records] [chunksize] [repeat]
+"""
+import os
+import re
+import resource
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from multiprocessing import get_context
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend', 'src'))
+from data_loader import parse_xml_to_df, _XML_RECORD_FIELDS
+
+SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'synthetic_traffic_data.xml')
+_TYPES = {'float': float, 'int': int, 'str': str}
+
+
+def make_file(records):
+    text = open(SOURCE, encoding='utf-8').read()
+    found = re.findall(r'<Record .*?</Record>', text, flags=re.S)
+    head = text[:text.index('<Record ')]
+    tail = text[text.rindex('</Record>') + len('</Record>'):]
+    body = ''.join(found[i % len(found)] for i in range(records))
+    path = os.path.join(tempfile.gettempdir(), f"bench_xml_{records}.xml")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(head + body + tail)
+    return path
+
+
+def legacy(path, chunksize):
+    # The original implementation: whole tree in memory, find() per field
+    def extract_text(element, tag_name, type_func=str, default=None):
+        found = element.find(tag_name)
+        if found is not None and found.text is not None:
+            try:
+                return type_func(found.text)
+            except ValueError:
+                return default
+        return default
+
+    root = ET.parse(path).getroot()
+    data = []
+    for node in root.findall('.//Node'):
+        base = {
+            'NodeID': node.get('id'),
+            'Location': node.find('Location').text,
+            'RoadType': node.find('RoadType').text,
+            'Lanes': int(node.find('Lanes').text),
+            'SpeedLimit': float(node.find('SpeedLimit').text),
+        }
+        for record in node.findall('.//Record'):
+            record_data = dict(base, Timestamp=record.get('timestamp'), Split=record.get('split'))
+            for sec, tag, col, kind in _XML_RECORD_FIELDS:
+                section = record.find(sec)
+                if section is None:
+                    continue
+                if kind == 'bool':
+                    record_data[col] = extract_text(section, tag) == 'true'
+                else:
+                    record_data[col] = extract_text(section, tag, _TYPES[kind])
+            data.append(record_data)
+    return pd.DataFrame(data)
+
+
+def streaming(path, chunksize):
+    return parse_xml_to_df(path, chunksize=chunksize)
+
+
+def _rss_mb(key):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(key):
+                return int(line.split()[1]) / 1024
+
+
+def _run(name, path, chunksize, repeat, out):
+    fn = {"legacy": legacy, "streaming": streaming}[name]
+    linux = os.path.exists("/proc/self/clear_refs")
+    best, peak, base = float("inf"), 0.0, 0.0
+    for _ in range(repeat):
+        if linux:
+            with open("/proc/self/clear_refs", "w") as f:
+                f.write("5")  # reset VmHWM to the current RSS
+            base = _rss_mb("VmRSS:")
+        start = time.perf_counter()
+        df = fn(path, chunksize)
+        best = min(best, time.perf_counter() - start)
+        if linux:
+            peak = max(peak, _rss_mb("VmHWM:"))
+        else:
+            # ru_maxrss is KiB on Linux, bytes on macOS
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+        rows = len(df)
+        del df
+    out.put((name, rows, best, base, peak))
+
+
+def main():
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 30000
+    chunksize = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+    repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    path = make_file(records)
+    try:
+        sample = make_file(min(records, 2000))
+        pd.testing.assert_frame_equal(legacy(sample, chunksize), streaming(sample, chunksize))
+        os.remove(sample)
+
+        print(f"Records: {records}, Chunk size: {chunksize}, best of {repeat}\n")
+        print(f"{'variant':<12}{'rows':>10}{'time (s)':>12}{'rows/s':>12}{'peak RSS (MB)':>16}{'delta (MB)':>12}")
+        ctx = get_context("spawn")
+        for name in ("legacy", "streaming"):
+            out = ctx.Queue()
+            proc = ctx.Process(target=_run, args=(name, path, chunksize, repeat, out))
+            proc.start()
+            _, rows, elapsed, base_rss, peak_rss = out.get()
+            proc.join()
+            print(f"{name:<12}{rows:>10}{elapsed:>12.3f}{rows / elapsed:>12.0f}"
+                  f"{peak_rss:>16.1f}{peak_rss - base_rss:>12.1f}")
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,8 @@ Future Bottleneck Detector
 Predicts traffic bottlenecks on specific route segments
 """
 
-from src.route_analyzer import get_route_coordinates, MUMBAI_LOCATIONS
-from geopy.distance import geodesic
+from src.route_analyzer import get_route_coordinates, location_index
+from src.spatial_index import haversine_km
 import numpy as np
 
 
@@ -20,45 +20,41 @@ def divide_route_into_segments(source, destination, segment_length_km=2):
         return []
     
     # Calculate route distance
-    total_distance = geodesic(source_coords, dest_coords).kilometers
+    total_distance = float(haversine_km(source_coords[0], source_coords[1], dest_coords[0], dest_coords[1]))
     num_segments = max(int(total_distance / segment_length_km), 1)
     
+    # Linear interpolation between source and dest
+    ratios = np.arange(num_segments + 1) / num_segments
+    lats = source_coords[0] + (dest_coords[0] - source_coords[0]) * ratios
+    lons = source_coords[1] + (dest_coords[1] - source_coords[1]) * ratios
+    
+    # Nearest known location for naming, all segments in one query
+    names = find_nearest_locations(lats, lons)
+    
     segments = []
     
-    for i in range(num_segments + 1):
-        # Linear interpolation between source and dest
-        ratio = i / num_segments if num_segments > 0 else 0
-        
-        lat = source_coords[0] + (dest_coords[0] - source_coords[0]) * ratio
-        lon = source_coords[1] + (dest_coords[1] - source_coords[1]) * ratio
-        
-        # Find nearest known location for naming
-        nearest_loc = find_nearest_location(lat, lon)
-        
+    for i, (lat, lon, name) in enumerate(zip(lats.tolist(), lons.tolist(), names)):
         segments.append({
             "index": i,
             "lat": lat,
             "lon": lon,
-            "name": nearest_loc,
-            "distance_from_start_km": round(total_distance * ratio, 2)
+            "name": name,
+            "distance_from_start_km": round(total_distance * ratios[i], 2)
         })
     
     return segments
 
 
+def find_nearest_locations(lats, lons):
+    """Nearest named location for each point ("near X" beyond 1 km)"""
+    dist, idx = location_index().nearest(lats, lons)
+    names = location_index().names[idx[:, 0]]
+    return [f"near {name}" if d > 1 else name for name, d in zip(names, dist[:, 0].tolist())]
+
+
 def find_nearest_location(lat, lon):
     """Find nearest named location from coordinates"""
-    point = (lat, lon)
-    min_dist = float('inf')
-    nearest = "Mumbai"
-    
-    for loc_name, coords in MUMBAI_LOCATIONS.items():
-        dist = geodesic(point, coords).kilometers
-        if dist < min_dist:
-            min_dist = dist
-            nearest = loc_name
-    
-    return f"near {nearest}" if min_dist > 1 else nearest
+    return find_nearest_locations([lat], [lon])[0]
 
 
 def detect_bottlenecks(source, destination, prediction_data, events_data):
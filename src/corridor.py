@@ -0,0 +1,134 @@
+"""
+Route Corridor
+Exact point-to-polyline distances from many points (alerts, reports,
+stations) to a route geometry in one vectorized pass.
+
+The route and the points are projected to a local equirectangular plane
+(km) centred on the route, where point-to-segment distance is plain
+geometry; over a city-sized route the projection error is far below the
+accuracy of the input coordinates. Short routes are handled with NumPy
+broadcasting over (points x segments) in bounded chunks; large queries use a
+shapely STRtree when shapely is installed.
+"""
+import numpy as np
+
+try:
+    import shapely
+except ImportError:
+    shapely = None
+
+EARTH_RADIUS_KM = 6371.0088
+_KM_PER_DEG = np.radians(1.0) * EARTH_RADIUS_KM
+_CHUNK_CELLS = 1 << 20      # points x segments per broadcast chunk
+_STRTREE_MIN_CELLS = 1 << 18  # points x segments above which the STRtree wins
+
+
+class Corridor:
+    """
+    A route polyline prepared for distance queries.
+
+    Args:
+        coords: (N, 2) array-like of route points, [lon, lat] as in OSRM
+                geometry (pass lat_lon=True for [lat, lon] rows)
+    """
+    def __init__(self, coords, lat_lon=False):
+        coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        if lat_lon:
+            coords = coords[:, ::-1]
+        if len(coords) == 0:
+            raise ValueError("Route geometry is empty")
+        # Repeated vertices make zero-length segments; drop them
+        keep = np.r_[True, np.any(coords[1:] != coords[:-1], axis=1)]
+        coords = coords[keep]
+
+        self.lat0 = float(coords[:, 1].mean())
+        self.kx = _KM_PER_DEG * np.cos(np.radians(self.lat0))
+        x = coords[:, 0] * self.kx
+        y = coords[:, 1] * _KM_PER_DEG
+        if len(x) == 1:  # Degenerate route: a single point
+            x, y = np.r_[x, x], np.r_[y, y]
+        self.ax, self.ay = x[:-1], y[:-1]
+        self.dx, self.dy = np.diff(x), np.diff(y)
+        self.len2 = self.dx ** 2 + self.dy ** 2
+        seg_len = np.sqrt(self.len2)
+        self.cum_km = np.r_[0.0, np.cumsum(seg_len)]
+        self.length_km = float(self.cum_km[-1])
+        self.n_segments = len(self.dx)
+        self._tree = None
+
+    def _xy(self, lats, lons):
+        return (np.atleast_1d(np.asarray(lons, dtype=np.float64)) * self.kx,
+                np.atleast_1d(np.asarray(lats, dtype=np.float64)) * _KM_PER_DEG)
+
+    def _on_segment(self, px, py, seg):
+        # Parameter of the closest point on segment `seg` (per point) and the distance to it
+        ax, ay, dx, dy, len2 = self.ax[seg], self.ay[seg], self.dx[seg], self.dy[seg], self.len2[seg]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            t = np.where(len2 > 0, ((px - ax) * dx + (py - ay) * dy) / len2, 0.0)
+        t = np.clip(t, 0.0, 1.0)
+        return t, np.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+    def _nearest_broadcast(self, px, py):
+        seg = np.empty(len(px), dtype=np.int64)
+        step = max(1, _CHUNK_CELLS // max(self.n_segments, 1))
+        for a in range(0, len(px), step):
+            qx, qy = px[a:a + step, None], py[a:a + step, None]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                t = np.where(self.len2 > 0, ((qx - self.ax) * self.dx + (qy - self.ay) * self.dy) / self.len2, 0.0)
+            np.clip(t, 0.0, 1.0, out=t)
+            d2 = (qx - (self.ax + t * self.dx)) ** 2 + (qy - (self.ay + t * self.dy)) ** 2
+            seg[a:a + step] = d2.argmin(axis=1)
+        return seg
+
+    def _nearest_strtree(self, px, py):
+        if self._tree is None:
+            lines = shapely.linestrings(np.stack([
+                np.column_stack([self.ax, self.ay]),
+                np.column_stack([self.ax + self.dx, self.ay + self.dy])
+            ], axis=1))
+            self._tree = shapely.STRtree(lines)
+        pair = self._tree.query_nearest(shapely.points(px, py), all_matches=False)
+        seg = np.empty(len(px), dtype=np.int64)
+        seg[pair[0]] = pair[1]
+        return seg
+
+    def project(self, lats, lons):
+        """
+        Closest point on the route for each query point.
+
+        Returns:
+            (distance_km, along_km): distance to the route and how far along
+            the route (from its start) the closest point lies
+        """
+        px, py = self._xy(lats, lons)
+        if len(px) == 0:
+            return np.empty(0), np.empty(0)
+        if shapely is not None and len(px) * self.n_segments >= _STRTREE_MIN_CELLS:
+            seg = self._nearest_strtree(px, py)
+        else:
+            seg = self._nearest_broadcast(px, py)
+        t, dist = self._on_segment(px, py, seg)
+        return dist, self.cum_km[seg] + t * np.sqrt(self.len2[seg])
+
+    def sample(self, step_km):
+        """
+        Points along the route no more than `step_km` apart (vertices
+        included), e.g. to prefilter candidates with a radius search.
+
+        Returns:
+            (lats, lons) arrays
+        """
+        pieces = np.maximum(np.ceil(np.sqrt(self.len2) / step_km), 1).astype(np.int64)
+        seg = np.repeat(np.arange(self.n_segments), pieces)
+        t = (np.arange(len(seg)) - np.repeat(np.cumsum(pieces) - pieces, pieces)) / pieces[seg]
+        x = np.r_[self.ax[seg] + t * self.dx[seg], self.ax[-1] + self.dx[-1]]
+        y = np.r_[self.ay[seg] + t * self.dy[seg], self.ay[-1] + self.dy[-1]]
+        return y / _KM_PER_DEG, x / self.kx
+
+    def distances(self, lats, lons):
+        """Distance (km) from each point to the route."""
+        return self.project(lats, lons)[0]
+
+    def within(self, lats, lons, radius_km):
+        """Boolean mask of points within `radius_km` of the route."""
+        return self.distances(lats, lons) <= radius_km
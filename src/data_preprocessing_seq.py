@@ -4,13 +4,22 @@ from sklearn.preprocessing import StandardScaler, LabelEncoder
 
 try:
     from src.data_loader import load_traffic_data
+    from src.windowing import build_windows
+    from src.log import get_logger
 except ImportError:
     from data_loader import load_traffic_data
+    from windowing import build_windows
+    from log import get_logger
 
-def create_sequences(df, target_col, sequence_length=5):
+logger = get_logger(__name__)
+
+def create_sequences(df, target_col, sequence_length=5, group_col='City', out_path=None):
     """
     Creates multivariate time-series sequences.
     Features: VehicleCount, Speed, WeatherCondition, Hour, DayOfWeek, IsWeekend, NoveltyScore
+
+    Windows are built per `group_col` (City, or route_id for route data).
+    Pass `out_path` to write X to a memory-mapped .npy file instead of RAM.
     """
     # Canonical Features (Must match what we generate in train_lstm)
     feature_cols = [
@@ -51,41 +60,18 @@ def create_sequences(df, target_col, sequence_length=5):
         target_encoded_col = target_col
         classes = sorted(df[target_col].unique())
         
-    # Sliding Window per City
-    X, y = [], []
-    
-    if 'City' in df.columns:
-        for city, group in df.groupby('City'):
-            group_data = group[feature_cols].values
-            group_target = group[target_encoded_col].values
-            
-            for i in range(sequence_length, len(group_data)):
-                X.append(group_data[i-sequence_length:i])
-                y.append(group_target[i])
-    else:
-        # Fallback for single city dataset without City col
-        data = df[feature_cols].values
-        target = df[target_encoded_col].values
-        for i in range(sequence_length, len(data)):
-            X.append(data[i-sequence_length:i])
-            y.append(target[i])
+    # Sliding Window per City (vectorized; windows never cross groups)
+    data = df[feature_cols].to_numpy(dtype=np.float32)
+    target = df[target_encoded_col].values
+    groups = df[group_col].values if group_col in df.columns else None
+    X, y = build_windows(data, target, sequence_length, groups=groups, out_path=out_path)
             
-    return np.array(X), np.array(y), classes, scaler, encoders, feature_cols
-    
-    X, y = [], []
-    
-    # 2. Sliding Window
-    # Loop to create sequences
-    for i in range(sequence_length, len(data)):
-        X.append(data[i-sequence_length:i])
-        y.append(target[i])
-        
-    return np.array(X), np.array(y), classes, scaler, encoders, feature_cols
+    return X, y, classes, scaler, encoders, feature_cols
 
 if __name__ == "__main__":
     # Test
     df = load_traffic_data(r"c:/Users/Devanshu/OneDrive/Documents/datathon/synthetic_traffic_data.xml")
     X, y, classes, _ = create_sequences(df, 'CongestionLevel', sequence_length=5)
-    print(f"X shape: {X.shape}")
-    print(f"y shape: {y.shape}")
-    print(f"Classes: {classes}")
+    logger.info("X shape: %s", X.shape)
+    logger.info("y shape: %s", y.shape)
+    logger.info("Classes: %s", classes)
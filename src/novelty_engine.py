@@ -4,6 +4,14 @@ import numpy as np
 from sklearn.ensemble import IsolationForest
 import joblib
 import os
+
+try:
+    from src.log import get_logger
+except ImportError:
+    from log import get_logger
+
+logger = get_logger(__name__)
+
 try:
     from scraper import get_event_impact_score
 except ImportError:
@@ -20,7 +28,7 @@ class HybridNoveltyEngine:
         Fits the statistical anomaly detector.
         X: DataFrame or 2D array of numerical features.
         """
-        print("Fitting Isolation Forest for Novelty Detection...")
+        logger.info("Fitting Isolation Forest for Novelty Detection...")
         self.iso_forest.fit(X)
         self.is_fitted = True
         
@@ -1,86 +1,269 @@
-import osmnx as ox
-import networkx as nx
+"""
+OSM Road Network Store
+Downloads a place's drive network once and materializes it under
+ROAD_NETWORK_DIR/<place>/ as typed NumPy columns (one .npy each) plus a
+meta.json with the precomputed network stats. Later calls memory-map the
+columns instead of downloading, so stats for the place or any bounding box
+are cheap at request time and worker processes share one copy through the
+page cache.
+
+Columns:
+    node_lat, node_lon: float64 (N)
+    u, v: int32 node indices per edge (E)
+    length: float32 metres (E)
+    maxspeed: float32 (E), NaN when untagged, 50 when unparseable
+    lanes: float32 (E), NaN when untagged or unparseable (counted as 2)
+
+Build or refresh a store:
+    python -m src.osm_loader "Andheri East, Mumbai, India" --refresh
+"""
+import json
+import math
+import os
+import re
+import shutil
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
 import pandas as pd
 
-def get_road_network_stats(place_name="Mumbai, India"):
+try:
+    from src.log import get_logger
+except ImportError:
+    from log import get_logger
+
+logger = get_logger(__name__)
+
+ROAD_NETWORK_DIR = os.getenv("ROAD_NETWORK_DIR", "road_network_cache")
+_STORE_VERSION = 1
+_COLUMNS = ("node_lat", "node_lon", "u", "v", "length", "maxspeed", "lanes")
+_FALLBACK_POINT = (19.0760, 72.8777)  # Mumbai, for places without a polygon
+_MAX_BBOX_STATS = 256
+
+
+def _store_path(place_name, root=None):
+    slug = re.sub(r"[^a-z0-9]+", "_", place_name.lower()).strip("_")
+    return os.path.join(root or ROAD_NETWORK_DIR, slug)
+
+
+def _clean_column(values, convert):
     """
-    Downloads the road network for a given place and returns statistics.
+    Convert raw OSM tag values to float32, one conversion per distinct
+    value. Lists (merged ways) use their first element; missing stays NaN.
     """
-    print(f"Downloading road network for: {place_name}...")
-    G = None
+    values = [v[0] if isinstance(v, list) else v for v in values]
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+    table = np.array([convert(u) for u in uniques] + [np.nan], dtype=np.float32)
+    return table[codes]  # code -1 (missing) picks the trailing NaN
+
+
+def _maxspeed(x):
+    try:
+        return float(x)
+    except (TypeError, ValueError):
+        return 50.0  # Default fallback
+
+
+def _lanes(x):
+    try:
+        return int(x)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _summarize(place_name, n_nodes, length, maxspeed, lanes):
+    finite_speed = maxspeed[~np.isnan(maxspeed)]
+    avg_speed_limit = float(finite_speed.mean(dtype=np.float64)) if len(finite_speed) else 50.0
+    avg_lanes = float(np.where(np.isnan(lanes), 2.0, lanes).mean(dtype=np.float64)) if len(lanes) else 2.0
+    avg_road_length = float(length.mean(dtype=np.float64)) if len(length) else 0.0
+    return {
+        "Place": place_name,
+        "Nodes (Intersections)": int(n_nodes),
+        "Edges (Road Segments)": int(len(length)),
+        "Avg Speed Limit": round(avg_speed_limit, 2),
+        "Avg Lanes": round(avg_lanes, 2),
+        "Avg Road Length (m)": round(avg_road_length, 2),
+        "Street Length Total (m)": float(length.sum(dtype=np.float64))
+    }
+
+
+def _download_graph(place_name):
+    import osmnx as ox
     try:
         # 1. Try by Place Name (Polygon)
+        return ox.graph_from_place(place_name, network_type='drive'), "place"
+    except Exception:
+        logger.warning("Could not find polygon for '%s'. Trying point-based query...", place_name)
+    # 2. Key Fallback: Graph from Point (Radius 2km)
+    logger.info("Downloading 2km radius around %s...", _FALLBACK_POINT)
+    return ox.graph_from_point(_FALLBACK_POINT, dist=2000, network_type='drive'), "point"
+
+
+def build_store(place_name, root=None):
+    """
+    Download the drive network for `place_name` and write its store.
+
+    Returns:
+        The opened RoadNetworkStore
+    """
+    logger.info("Downloading road network for: %s...", place_name)
+    G, source = _download_graph(place_name)
+
+    node_ids = list(G.nodes)
+    index = {n: i for i, n in enumerate(node_ids)}
+    edges = list(G.edges(data=True))
+    length = np.array([d.get("length", np.nan) for _, _, d in edges], dtype=np.float64)
+    columns = {
+        "node_lat": np.array([G.nodes[n]["y"] for n in node_ids], dtype=np.float64),
+        "node_lon": np.array([G.nodes[n]["x"] for n in node_ids], dtype=np.float64),
+        "u": np.array([index[u] for u, _, _ in edges], dtype=np.int32),
+        "v": np.array([index[v] for _, v, _ in edges], dtype=np.int32),
+        "length": length.astype(np.float32),
+        "maxspeed": _clean_column([d.get("maxspeed") for _, _, d in edges], _maxspeed),
+        "lanes": _clean_column([d.get("lanes") for _, _, d in edges], _lanes),
+    }
+    meta = {
+        "version": _STORE_VERSION,
+        "place": place_name,
+        "source": source,
+        # Totals from the float64 lengths, as the stats were before the store
+        "stats": _summarize(place_name, len(node_ids), length, columns["maxspeed"], columns["lanes"])
+    }
+
+    path = _store_path(place_name, root)
+    tmp = f"{path}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name, values in columns.items():
+        np.save(os.path.join(tmp, f"{name}.npy"), values)
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    # Swap the new store in; readers keep their mappings of the old files
+    old = f"{path}.old"
+    if os.path.exists(path):
+        shutil.rmtree(old, ignore_errors=True)
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+    return RoadNetworkStore.open(path)
+
+
+class RoadNetworkStore:
+    """
+    Memory-mapped road network columns plus precomputed stats.
+    Bounding-box stats are computed from the columns and memoised.
+    """
+    def __init__(self, path, meta, columns):
+        self.path = path
+        self.meta = meta
+        self.place = meta["place"]
+        for name in _COLUMNS:
+            setattr(self, name, columns[name])
+        self._bbox_stats = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, path):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != _STORE_VERSION:
+            raise ValueError(f"Road network store {path} has version {meta.get('version')}")
+        columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in _COLUMNS}
+        return cls(path, meta, columns)
+
+    def stats(self):
+        """Precomputed stats for the whole place."""
+        return dict(self.meta["stats"])
+
+    def bbox_stats(self, south, west, north, east):
+        """Stats for the nodes and edges (both ends) inside a bounding box."""
+        key = tuple(round(float(c), 5) for c in (south, west, north, east))
+        with self._lock:
+            if key in self._bbox_stats:
+                self._bbox_stats.move_to_end(key)
+                return dict(self._bbox_stats[key])
+
+        inside = ((self.node_lat >= key[0]) & (self.node_lat <= key[2]) &
+                  (self.node_lon >= key[1]) & (self.node_lon <= key[3]))
+        edges = inside[self.u] & inside[self.v]
+        stats = _summarize(f"{self.place} {list(key)}", int(inside.sum()),
+                           self.length[edges], self.maxspeed[edges], self.lanes[edges])
+        with self._lock:
+            self._bbox_stats[key] = stats
+            while len(self._bbox_stats) > _MAX_BBOX_STATS:
+                self._bbox_stats.popitem(last=False)
+        return dict(stats)
+
+    def stats_near(self, lat, lon, radius_km=1.0):
+        """Stats for the square of half-width `radius_km` around a point."""
+        dlat = radius_km / 111.195
+        dlon = dlat / max(math.cos(math.radians(lat)), 1e-6)
+        return self.bbox_stats(lat - dlat, lon - dlon, lat + dlat, lon + dlon)
+
+
+_stores = {}  # path -> (meta mtime, RoadNetworkStore)
+_stores_lock = threading.Lock()
+
+
+def open_store(place_name="Mumbai, India", build=True, refresh=False, root=None):
+    """
+    The store for `place_name`: memory-mapped from disk (reopened when it
+    was rebuilt), built by downloading when missing and `build` is set.
+    Returns None when there is no store and `build` is False.
+    """
+    path = _store_path(place_name, root)
+    meta_path = os.path.join(path, "meta.json")
+    with _stores_lock:
+        if not refresh and os.path.exists(meta_path):
+            mtime = os.stat(meta_path).st_mtime_ns
+            cached = _stores.get(path)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+            store = RoadNetworkStore.open(path)
+            _stores[path] = (mtime, store)
+            return store
+        if not build:
+            return None
+        store = build_store(place_name, root)
+        _stores[path] = (os.stat(meta_path).st_mtime_ns, store)
+        return store
+
+
+def warm_stores(places):
+    """Map the stores that already exist for `places` (application startup); never downloads."""
+    opened = []
+    for place in places:
         try:
-             G = ox.graph_from_place(place_name, network_type='drive')
+            if open_store(place, build=False) is not None:
+                opened.append(place)
         except Exception as e:
-             print(f"⚠️  Could not find polygon for '{place_name}'. Trying point-based query...")
-             
-        # 2. Key Fallback: Graph from Point (Radius 2km)
-        if G is None:
-             # Coordinates for Mumbai (could also geocode using geopy, but hardcoding fallback for robustness)
-             mumbai_point = (19.0760, 72.8777) 
-             print(f"   Downloading 2km radius around {mumbai_point}...")
-             G = ox.graph_from_point(mumbai_point, dist=2000, network_type='drive')
-        
-        # Calculate basic stats
-        stats = ox.basic_stats(G)
-        
-        # Extract edge attributes (Speed limit, lanes, length)
-        edges = ox.graph_to_gdfs(G, nodes=False, edges=True)
-        
-        # Process Speed Limit (often heterogeneous or missing)
-        if 'maxspeed' in edges.columns:
-            # Clean and convert to numeric (takes first value if list)
-            def clean_maxspeed(x):
-                if isinstance(x, list):
-                    x = x[0]
-                try:
-                    return float(x)
-                except:
-                    return 50.0 # Default fallback
-            
-            avg_speed_limit = edges['maxspeed'].apply(clean_maxspeed).mean()
-        else:
-            avg_speed_limit = 50.0 # Default
-            
-        # Process Lanes
-        if 'lanes' in edges.columns:
-            def clean_lanes(x):
-                if isinstance(x, list):
-                    x = x[0]
-                try:
-                    return int(x)
-                except:
-                    return 2 # Default fallback
-            avg_lanes = edges['lanes'].apply(clean_lanes).mean()
-        else:
-            avg_lanes = 2.0
-            
-        # Average Road Length (Edge length)
-        avg_road_length = edges['length'].mean()
-        
-        # Intersection density
-        intersection_count = stats['n'] # Number of nodes ~ intersections
-        
-        result = {
-            "Place": place_name,
-            "Nodes (Intersections)": intersection_count,
-            "Edges (Road Segments)": stats['m'],
-            "Avg Speed Limit": round(avg_speed_limit, 2),
-            "Avg Lanes": round(avg_lanes, 2),
-            "Avg Road Length (m)": round(avg_road_length, 2),
-            "Street Length Total (m)": stats['edge_length_total']
-        }
-        
-        print("Road Network Stats:")
-        for k, v in result.items():
-            print(f"  {k}: {v}")
-            
-        return result
-        
+            logger.warning("Road network store for %s unavailable: %s", place, e)
+    return opened
+
+
+def get_road_network_stats(place_name="Mumbai, India", bbox=None, refresh=False):
+    """
+    Road network statistics for a place (downloaded once, then served from
+    the local store).
+
+    bbox: Optional (south, west, north, east) to restrict the stats to
+    refresh: Re-download and rebuild the store
+    """
+    try:
+        store = open_store(place_name, refresh=refresh)
+        return store.bbox_stats(*bbox) if bbox else store.stats()
     except Exception as e:
-        print(f"Error downloading OSM data: {e}")
+        logger.error("Error downloading OSM data: %s", e)
         return None
 
+
 if __name__ == "__main__":
-    get_road_network_stats("Andheri East, Mumbai, India")
+    args = [a for a in sys.argv[1:] if a != "--refresh"]
+    result = get_road_network_stats(args[0] if args else "Andheri East, Mumbai, India",
+                                    refresh="--refresh" in sys.argv)
+    if result:
+        logger.info("Road Network Stats:")
+        for k, v in result.items():
+            logger.info("%s: %s", k, v)
@@ -12,8 +12,12 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from src.osm_loader import get_road_network_stats
 from src.scraper import get_live_weather, get_city_events, get_event_impact_score
 from src.novelty_engine import HybridNoveltyEngine
+from src.categorical import encode_column, encode_label
 from src.train_lstm import AdvancedTrafficLSTM
 from src.sensor_interface import TrafficSensorNetwork, GPSDataStream
+from src.log import get_logger
+
+logger = get_logger(__name__)
 
 # Prediction Cache
 _PRED_CACHE = {}
@@ -96,13 +100,11 @@ def get_prediction_data(city="Mumbai, India", source=None, dest=None):
         
         # Inject Source/Dest
         if 'origin' in encoders and source:
-            try: row['origin'] = encoders['origin'].transform([source])[0]
-            except: row['origin'] = 0
+            row['origin'] = encode_label(encoders, 'origin', source)
         elif 'origin' in feature_cols: row['origin'] = 0
 
         if 'destination' in encoders and dest:
-            try: row['destination'] = encoders['destination'].transform([dest])[0]
-            except: row['destination'] = 0
+            row['destination'] = encode_label(encoders, 'destination', dest)
         elif 'destination' in feature_cols: row['destination'] = 0
 
         seq_data.append(row)
@@ -129,8 +131,7 @@ def get_prediction_data(city="Mumbai, India", source=None, dest=None):
     # Preprocessing
     if 'WeatherCondition' in encoders:
         le = encoders['WeatherCondition']
-        df_seq['WeatherCondition'] = df_seq['WeatherCondition'].apply(lambda x: x if x in le.classes_ else le.classes_[0])
-        df_seq['WeatherCondition'] = le.transform(df_seq['WeatherCondition'])
+        df_seq['WeatherCondition'] = encode_column(le, df_seq['WeatherCondition'])
         
     X_input_df = df_seq[feature_cols]
     X_scaled = scaler.transform(X_input_df)
@@ -202,8 +203,7 @@ def get_prediction_data(city="Mumbai, India", source=None, dest=None):
         # Preprocessing (Mirroring logic above)
         if 'WeatherCondition' in encoders:
             le = encoders['WeatherCondition']
-            df_future['WeatherCondition'] = df_future['WeatherCondition'].apply(lambda x: x if x in le.classes_ else le.classes_[0])
-            df_future['WeatherCondition'] = le.transform(df_future['WeatherCondition'])
+            df_future['WeatherCondition'] = encode_column(le, df_future['WeatherCondition'])
             
         X_future = scaler.transform(df_future[feature_cols])
         X_future_tensor = torch.tensor(X_future, dtype=torch.float32).unsqueeze(0).to(device)
@@ -257,7 +257,7 @@ def get_prediction_data(city="Mumbai, India", source=None, dest=None):
         traffic_bulletin = generate_traffic_bulletin(response)
         response["traffic_bulletin"] = traffic_bulletin
     except Exception as e:
-        print(f"[WARNING] Failed to generate traffic bulletin: {e}")
+        logger.warning("Failed to generate traffic bulletin: %s", e)
         response["traffic_bulletin"] = joblib.load("lstm_artifacts.pkl") # Just random error access?
         response["traffic_bulletin"] = f"Traffic is currently {congestion_level.lower()}."
     
@@ -270,15 +270,15 @@ def get_prediction_data(city="Mumbai, India", source=None, dest=None):
     return response
 
 def predict_live(city="Mumbai, India", source=None, dest=None):
-    print(f"\n[INFO] Starting Advanced Traffic Intelligence Engine for {city}...")
+    logger.info("Starting Advanced Traffic Intelligence Engine for %s...", city)
     
     if source and dest:
-        print(f"[INFO] Route Specific Mode: {source} -> {dest}")
+        logger.info("Route Specific Mode: %s -> %s", source, dest)
     
     data = get_prediction_data(city, source, dest)
     
     if "error" in data:
-        print(data["error"])
+        logger.error("%s", data["error"])
         return
 
     # Extract for Display
@@ -288,27 +288,27 @@ def predict_live(city="Mumbai, India", source=None, dest=None):
     events = ctx["events"]
     event_name = events.get("Details", {}).get("Name", "None")
     
-    print("\n[INFO] Environment Sensed.")
-    print(f"   Weather: {ctx['weather']['Condition']} ({ctx['weather']['Temperature']}C)")
-    print(f"   Events:  {event_name} (Impact: {ctx['event_impact_score']})")
+    logger.info("Environment Sensed.")
+    logger.info("Weather: %s (%sC)", ctx['weather']['Condition'], ctx['weather']['Temperature'])
+    logger.info("Events:  %s (Impact: %s)", event_name, ctx['event_impact_score'])
     
-    print(f"\n{'-'*60}")
-    print(f"| PREDICTION RESULT | {city.split(',')[0].upper():<31}|")
-    print(f"{'-'*60}")
-    print(f"| Congestion Level      | {pred['congestion_level'].upper():<30} |")
-    print(f"| Confidence Score      | {pred['confidence_score']}%{' ':<26} |")
-    print(f"| Novelty Score         | {pred['novelty_score']}{' ':<26} |")
-    print(f"{'-'*60}")
+    logger.info("%s", '-' * 60)
+    logger.info("| PREDICTION RESULT | %-31s|", city.split(',')[0].upper())
+    logger.info("%s", '-' * 60)
+    logger.info("| Congestion Level      | %-30s |", pred['congestion_level'].upper())
+    logger.info("| Confidence Score      | %s%%%s |", pred['confidence_score'], " " * 26)
+    logger.info("| Novelty Score         | %s%s |", pred['novelty_score'], " " * 26)
+    logger.info("%s", '-' * 60)
 
     if data["analysis"]["unique_insight"]:
-        print(f"\n  >> UNIQUE INSIGHT GENERATED:")
-        print(f"     {data['analysis']['insight_message']}")
+        logger.info(">> UNIQUE INSIGHT GENERATED:")
+        logger.info("%s", data['analysis']['insight_message'])
         
     # ... (Keep existing Traffic Management Strategy print logic if desired, or simplify)
     
-    print(f"\n{'-'*60}")
-    print("SYSTEM READY FOR DEPLOYMENT")
-    print(f"{'-'*60}")
+    logger.info("%s", '-' * 60)
+    logger.info("SYSTEM READY FOR DEPLOYMENT")
+    logger.info("%s", '-' * 60)
 
 if __name__ == "__main__":
     import argparse
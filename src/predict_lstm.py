@@ -12,15 +12,19 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from src.osm_loader import get_road_network_stats
 from src.scraper import get_live_weather, get_city_events, get_event_impact_score
 from src.novelty_engine import HybridNoveltyEngine
+from src.categorical import encode_column
 from src.train_lstm import AdvancedTrafficLSTM
+from src.log import get_logger
+
+logger = get_logger(__name__)
 
 def predict_live(city="Mumbai, India"):
     device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-    print(f"\n🚀 Starting Advanced Traffic Intelligence Engine for {city}...")
+    logger.info("🚀 Starting Advanced Traffic Intelligence Engine for %s...", city)
     
     # 1. Load Artifacts
     if not os.path.exists("lstm_artifacts.pkl"):
-        print("Error: Artifacts not found. Train the model first.")
+        logger.error("Artifacts not found. Train the model first.")
         return
         
     artifacts = joblib.load("lstm_artifacts.pkl")
@@ -38,33 +42,33 @@ def predict_live(city="Mumbai, India"):
         model.load_state_dict(torch.load("traffic_lstm_model.pth", map_location=device))
         model.eval()
     else:
-        print("Error: Model weights not found.")
+        logger.error("Model weights not found.")
         return
 
     # Load Novelty Engine
     try:
         novelty_engine = joblib.load("novelty_engine.pkl")
     except:
-        print("Warning: Novelty engine not found. Novelty scores will be 0.")
+        logger.warning("Novelty engine not found. Novelty scores will be 0.")
         novelty_engine = None
 
     # 2. Fetch Live Context (The "Unique" Part)
-    print("\n🌍 Sensing Environment...")
+    logger.info("🌍 Sensing Environment...")
     
     # Weather
     weather = get_live_weather(city.split(',')[0])
     condition_text = weather.get("Condition", "Clear")
-    print(f"   Weather: {condition_text} ({weather.get('Temperature')}°C)")
+    logger.info("Weather: %s (%s°C)", condition_text, weather.get('Temperature'))
     
     # Events
     event_score = get_event_impact_score(city.split(',')[0])
     events = get_city_events(city.split(',')[0])
     event_name = events.get("Details", {}).get("Name", "None")
-    print(f"   Events:  {event_name} (Impact Score: {event_score:.2f})")
+    logger.info("Events:  %s (Impact Score: %.2f)", event_name, event_score)
     
     # 3. Construct Input Sequence (Multivariate)
     # Simulate a sequence that leads to the current state based on context.
-    print("\n🧠 Synthesizing Contextual Traffic Pattern...")
+    logger.info("🧠 Synthesizing Contextual Traffic Pattern...")
     
     current_hour = 17 # 5 PM
     
@@ -108,7 +112,7 @@ def predict_live(city="Mumbai, India"):
             nov_scores = novelty_engine.get_novelty_score(X_nov, context_data={'city': city})
             df_seq['NoveltyScore'] = nov_scores
         except Exception as e:
-            print(f"   [Warning] Novelty Engine mismatch ({e}). Switching to Heuristic Mode.")
+            logger.warning("Novelty Engine mismatch (%s). Switching to Heuristic Mode.", e)
             # Heuristic Fallback: 
             # High Score if Event (0.8) + Abnormal Speed (< 20 or > 100)
             base_score = 0.0
@@ -126,8 +130,7 @@ def predict_live(city="Mumbai, India"):
     if 'WeatherCondition' in encoders:
         le = encoders['WeatherCondition']
         # Handle unseen
-        df_seq['WeatherCondition'] = df_seq['WeatherCondition'].apply(lambda x: x if x in le.classes_ else le.classes_[0])
-        df_seq['WeatherCondition'] = le.transform(df_seq['WeatherCondition'])
+        df_seq['WeatherCondition'] = encode_column(le, df_seq['WeatherCondition'])
         
     # Scale
     X_input = df_seq[feature_cols].values
@@ -137,7 +140,7 @@ def predict_live(city="Mumbai, India"):
     X_tensor = torch.tensor(X_scaled, dtype=torch.float32).unsqueeze(0).to(device) # Batch dim
     
     # 6. Prediction
-    print("\n🔮 Forecasting...")
+    logger.info("🔮 Forecasting...")
     with torch.no_grad():
         output = model(X_tensor)
         probs = torch.softmax(output, dim=1)
@@ -147,29 +150,29 @@ def predict_live(city="Mumbai, India"):
     confidence = conf.item() * 100
     
     # 7. Rich Output
-    print(f"\n{'-'*60}")
-    print(f"| 🔮 PREDICTION RESULT | {city.split(',')[0].upper():<29} |")
-    print(f"{'-'*60}")
-    print(f"| Congestion Level      | {str(congestion_level).upper():<30} |")
-    print(f"| Confidence Score      | {confidence:.2f}%{' ':<26} |")
-    print(f"| Novelty Score         | {df_seq['NoveltyScore'].mean():.4f}{' ':<26} |")
-    print(f"{'-'*60}")
+    logger.info("%s", '-' * 60)
+    logger.info("| 🔮 PREDICTION RESULT | %-29s |", city.split(',')[0].upper())
+    logger.info("%s", '-' * 60)
+    logger.info("| Congestion Level      | %-30s |", str(congestion_level).upper())
+    logger.info("| Confidence Score      | %.2f%%%s |", confidence, " " * 26)
+    logger.info("| Novelty Score         | %.4f%s |", df_seq['NoveltyScore'].mean(), " " * 26)
+    logger.info("%s", '-' * 60)
     
-    print("\n💡 INTELLIGENT ANALYSIS:")
-    print(f"  • Context:   {condition_text} Weather + {event_name} (Impact: {event_score})")
-    print(f"  • Dynamics:  Speed {df_seq['Speed'].iloc[-1]:.0f} km/h | Volume {df_seq['VehicleCount'].iloc[-1]:.0f}")
+    logger.info("💡 INTELLIGENT ANALYSIS:")
+    logger.info("• Context:   %s Weather + %s (Impact: %s)", condition_text, event_name, event_score)
+    logger.info("• Dynamics:  Speed %.0f km/h | Volume %.0f", df_seq['Speed'].iloc[-1], df_seq['VehicleCount'].iloc[-1])
     
     threshold = 0.6
     avg_nov = df_seq['NoveltyScore'].mean()
     if avg_nov > threshold:
-        print(f"\n  >> 🌟 UNIQUE INSIGHT GENERATED:")
-        print(f"     The system detected a 'Contextual Adaptation' scenario (Score: {avg_nov:.2f}).")
-        print(f"     Our Hybrid Engine identified a unique traffic pattern driven by")
-        print(f"     external factors (Events/Weather) and dynamically calibrated the forecast.")
+        logger.info(">> 🌟 UNIQUE INSIGHT GENERATED:")
+        logger.info("The system detected a 'Contextual Adaptation' scenario (Score: %.2f).", avg_nov)
+        logger.info("Our Hybrid Engine identified a unique traffic pattern driven by")
+        logger.info("external factors (Events/Weather) and dynamically calibrated the forecast.")
     else:
-        print(f"\n  >> ✅ SYSTEM STABILITY:")
-        print(f"     Traffic patterns are matching historical distributions.")
-        print(f"     Model is operating within standard parameters.")
+        logger.info(">> ✅ SYSTEM STABILITY:")
+        logger.info("Traffic patterns are matching historical distributions.")
+        logger.info("Model is operating within standard parameters.")
 
 if __name__ == "__main__":
     predict_live(city="Mumbai")
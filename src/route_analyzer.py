@@ -2,9 +2,18 @@
 Route Analyzer - Filters alerts and events by route corridor
 """
 
-from geopy.distance import geodesic
+import os
+import threading
 from datetime import datetime, timedelta
 
+import numpy as np
+
+from src.corridor import Corridor
+from src.spatial_index import SpatialIndex, haversine_km, load_gazetteer
+from src.log import get_logger
+
+logger = get_logger(__name__)
+
 # Major Mumbai locations (approximate coordinates)
 MUMBAI_LOCATIONS = {
     "Bandra": (19.0596, 72.8295),
@@ -34,6 +43,29 @@ MUMBAI_LOCATIONS = {
     "CSMT": (18.9398, 72.8355), # Alien for CST
 }
 
+# Optional extra places (wards, junctions, stations): CSV name,lat,lon or JSON
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH")
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def location_index():
+    """
+    Shared SpatialIndex over MUMBAI_LOCATIONS plus GAZETTEER_PATH places,
+    built on first use.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                places = dict(MUMBAI_LOCATIONS)
+                if GAZETTEER_PATH and os.path.exists(GAZETTEER_PATH):
+                    for name, coords in load_gazetteer(GAZETTEER_PATH).items():
+                        places.setdefault(name, coords)
+                _index = SpatialIndex(places)
+    return _index
+
 
 def get_route_coordinates(source, destination):
     """
@@ -57,29 +89,62 @@ def get_route_coordinates(source, destination):
     return (source_coords, dest_coords) if source_coords and dest_coords else (None, None)
 
 
+def distances_to_route(lats, lons, route_start, route_end):
+    """
+    Vectorized calculate_distance_to_route for arrays of points.
+    Returns distances in km (numpy array)
+    """
+    dist_to_start = haversine_km(lats, lons, route_start[0], route_start[1])
+    dist_to_end = haversine_km(lats, lons, route_end[0], route_end[1])
+    route_length = float(haversine_km(route_start[0], route_start[1], route_end[0], route_end[1]))
+
+    nearest_end = np.minimum(dist_to_start, dist_to_end)
+    # Distances summing to ~route length put the point on the path (2km tolerance)
+    on_path = np.abs((dist_to_start + dist_to_end) - route_length) < 2
+    return np.where(on_path, np.minimum(nearest_end, route_length / 2), nearest_end)
+
+
 def calculate_distance_to_route(point_lat, point_lon, route_start, route_end):
     """
     Calculate minimum distance from a point to a route (line segment)
     Returns distance in km
     """
-    point = (point_lat, point_lon)
-    
     # Simple approximation: distance to nearest endpoint
     # For production, use proper point-to-line-segment distance
-    dist_to_start = geodesic(point, route_start).kilometers
-    dist_to_end = geodesic(point, route_end).kilometers
-    
-    # Check if point is roughly on the path
-    route_length = geodesic(route_start, route_end).kilometers
-    
-    # If point is equidistant from both ends and distances sum to ~route length, it's on path
-    if abs((dist_to_start + dist_to_end) - route_length) < 2:  # 2km tolerance
-        return min(dist_to_start, dist_to_end, route_length / 2)
-    else:
-        return min(dist_to_start, dist_to_end)
+    return float(distances_to_route(point_lat, point_lon, route_start, route_end)[0])
 
 
-def filter_alerts_by_route(events, source, destination, radius_km=5):
+def locate_items(items):
+    """
+    (lat, lon) for each alert / report / station: its own "lat"/"lon"
+    fields when present, else its Location (reports: location) resolved
+    through the gazetteer (memoised per name). None when neither works.
+    """
+    index = location_index()
+    coords = []
+    for item in items:
+        if item.get("lat") is not None and item.get("lon") is not None:
+            coords.append((float(item["lat"]), float(item["lon"])))
+        else:
+            coords.append(index.match(item.get("Location") or item.get("location") or ""))
+    return coords
+
+
+def _route_distances(coords, source_coords, dest_coords, route_coords=None):
+    # Distance to route for every located item in one call (NaN when unlocated);
+    # exact against the route geometry when given, else the endpoint approximation
+    distances = np.full(len(coords), np.nan)
+    located = [i for i, c in enumerate(coords) if c]
+    if located:
+        points = np.array([coords[i] for i in located], dtype=np.float64)
+        if route_coords is not None and len(route_coords):
+            distances[located] = Corridor(route_coords).distances(points[:, 0], points[:, 1])
+        else:
+            distances[located] = distances_to_route(points[:, 0], points[:, 1], source_coords, dest_coords)
+    return distances
+
+
+def filter_alerts_by_route(events, source, destination, radius_km=5, route_coords=None, sort=True):
     """
     Filter events that are within radius_km of the route corridor
     
@@ -88,35 +153,27 @@ def filter_alerts_by_route(events, source, destination, radius_km=5):
         source: Source location name
         destination: Destination location name
         radius_km: Maximum distance from route (default 5km)
+        route_coords: Optional route geometry [[lon, lat], ...]; distances are
+                      then exact point-to-polyline instead of endpoint-based
+        sort: Order by distance to the route (else keep the input order)
     
     Returns:
         List of filtered events with distance added
     """
+    has_route = route_coords is not None and len(route_coords) > 0
     source_coords, dest_coords = get_route_coordinates(source, destination)
     
-    if not source_coords or not dest_coords:
-        print(f"[WARNING] Could not find coordinates for {source} or {destination}")
+    if not has_route and (not source_coords or not dest_coords):
+        logger.warning("Could not find coordinates for %s or %s", source, destination)
         return events  # Return all events if coords not found
     
+    event_coords = locate_items(events)
+    distances = _route_distances(event_coords, source_coords, dest_coords, route_coords)
+
     filtered_events = []
     
-    for event in events:
-        location_name = event.get("Location", "")
-        
-        # Try to get coordinates from location name
-        event_coords = None
-        for loc_name, coords in MUMBAI_LOCATIONS.items():
-            if loc_name in location_name or location_name in loc_name:
-                event_coords = coords
-                break
-        
-        if event_coords:
-            # Calculate distance to route
-            distance = calculate_distance_to_route(
-                event_coords[0], event_coords[1],
-                source_coords, dest_coords
-            )
-            
+    for event, coords, distance in zip(events, event_coords, distances.tolist()):
+        if coords:
             if distance <= radius_km:
                 event_copy = event.copy()
                 event_copy["distance_to_route_km"] = round(distance, 2)
@@ -128,38 +185,38 @@ def filter_alerts_by_route(events, source, destination, radius_km=5):
             filtered_events.append(event_copy)
     
     # Sort by distance to route
-    filtered_events.sort(key=lambda x: x.get("distance_to_route_km", 999))
+    if sort:
+        filtered_events.sort(key=lambda x: x.get("distance_to_route_km", 999))
     
     return filtered_events
 
 
-def calculate_route_impact_score(events, source, destination):
+def calculate_route_impact_score(events, source, destination, route_coords=None):
     """
     Calculate overall impact score for a route based on events
     
+    With route_coords ([[lon, lat], ...]), distances of locatable events are
+    measured against the route geometry; otherwise (and for events that
+    cannot be located) their distance_to_route_km is used.
+    
     Returns: float between 0 and 1
     """
     if not events:
         return 0.0
     
-    total_score = 0.0
+    distances = np.array([event.get("distance_to_route_km", 10) for event in events], dtype=np.float64)
+    if route_coords is not None and len(route_coords):
+        exact = _route_distances(locate_items(events), None, None, route_coords)
+        distances = np.where(np.isnan(exact), distances, exact)
     
-    for event in events:
-        impact = event.get("Impact", "Low")
-        distance = event.get("distance_to_route_km", 10)
-        
-        # Base score by impact
-        if impact == "High":
-            base_score = 0.8
-        elif impact == "Medium":
-            base_score = 0.5
-        else:
-            base_score = 0.2
-        
-        # Reduce score based on distance
-        distance_factor = max(0, 1 - (distance / 10))  # 0 at 10km+
-        
-        total_score += base_score * distance_factor
+    # Base score by impact
+    impacts = np.array([event.get("Impact", "Low") for event in events], dtype=object)
+    base_score = np.where(impacts == "High", 0.8, np.where(impacts == "Medium", 0.5, 0.2))
+    
+    # Reduce score based on distance
+    distance_factor = np.maximum(0, 1 - (distances / 10))  # 0 at 10km+
+    
+    total_score = float((base_score * distance_factor).sum())
     
     # Normalize to 0-1 range
     normalized_score = min(total_score / len(events), 1.0)
@@ -184,7 +241,7 @@ def prioritize_alerts(events):
     
     processed_events = []
     
-    print(f"[DEBUG] Prioritizing {len(events)} events...")
+    logger.debug("Prioritizing %s events...", len(events))
     
     for event in events:
         time_str = event.get("Time", "")
@@ -243,5 +300,5 @@ def prioritize_alerts(events):
         e.pop("_sort_score", None)
         e.pop("_timestamp", None)
 
-    print(f"[DEBUG] Returned {len(processed_events)} prioritized events")
+    logger.debug("Returned %s prioritized events", len(processed_events))
     return processed_events
@@ -2,11 +2,18 @@ import requests
 from bs4 import BeautifulSoup
 import random
 
+try:
+    from src.log import get_logger
+except ImportError:
+    from log import get_logger
+
+logger = get_logger(__name__)
+
 def get_live_weather(city="Mumbai"):
     """
     Simulates fetching live weather data using Open-Meteo API (Free, No Key).
     """
-    print(f"Fetching live weather for {city}...")
+    logger.info("Fetching live weather for %s...", city)
     try:
         # Geocoding (Simulated for simplicity, or use geopy if needed for exact coords)
         # Using Mumbai Coords roughly for demo
@@ -33,11 +40,11 @@ def get_live_weather(city="Mumbai"):
             "Condition": condition,
             "WindSpeed": wind
         }
-        print(f"Live Weather: {weather_info}")
+        logger.info("Live Weather: %s", weather_info)
         return weather_info
         
     except Exception as e:
-        print(f"Error fetching weather: {e}")
+        logger.error("Error fetching weather: %s", e)
         return {"Condition": "Clear", "Temperature": 30.0}
 
 import pandas as pd
@@ -86,10 +93,10 @@ def get_city_events(city="Mumbai", context=None):
     if city in _EVENT_CACHE:
         cached = _EVENT_CACHE[city]
         if now - cached["timestamp"] < _CACHE_TTL:
-            print(f"[CACHE HIT] Returning cached events for {city}")
+            logger.info("[CACHE HIT] Returning cached events for %s", city)
             return cached["data"]
             
-    print(f"Scanning for events in {city} from multiple sources (Parallel)...")
+    logger.info("Scanning for events in %s from multiple sources (Parallel)...", city)
     
     all_events = []
     
@@ -233,10 +240,10 @@ def get_city_events(city="Mumbai", context=None):
         
         result = {"Incident": "None", "Events": []}
         if all_events:
-            print(f"   [SUCCESS] Found {len(all_events)} relevant events")
+            logger.info("[SUCCESS] Found %s relevant events", len(all_events))
             result = {"Incident": "Multiple", "Events": all_events}
         else:
-            print("   [INFO] No significant events detected.")
+            logger.info("No significant events detected.")
         
         # Update Cache
         _EVENT_CACHE[city] = {
@@ -246,7 +253,7 @@ def get_city_events(city="Mumbai", context=None):
         return result
 
     except Exception as e:
-        print(f"   [Error] Scraping failed: {e}")
+        logger.error("Scraping failed: %s", e)
         # Return fallback or empty structure
         return {"Incident": "None", "Events": []}
     
@@ -3,6 +3,13 @@ import random
 import numpy as np
 import time
 
+try:
+    from src.log import get_logger
+except ImportError:
+    from log import get_logger
+
+logger = get_logger(__name__)
+
 class TrafficPhysics:
     """
     Implements standard Traffic Flow Theory (BPR Function).
@@ -16,11 +23,95 @@ class TrafficPhysics:
         """
         Bureau of Public Roads (BPR) formulation:
         Speed = FreeFlowSpeed / (1 + 0.15 * (Vol/Cap)^4)
+        Accepts a scalar or an array of volumes.
         """
-        vc_ratio = volume / self.capacity
+        vc_ratio = np.asarray(volume, dtype=np.float64) / self.capacity
         # BPR standard parameter alpha=0.15, beta=4
         speed = self.v_f / (1 + 0.20 * (vc_ratio ** 4)) 
-        return max(5.0, speed) # Min speed 5 km/h (Gridlock)
+        speed = np.maximum(5.0, speed) # Min speed 5 km/h (Gridlock)
+        return float(speed) if speed.ndim == 0 else speed
+
+def demand_curve(hours):
+    """
+    Typical flow (veh/hr) by hour of day: near capacity in the morning and
+    evening peaks, moderate mid-day, light at night. Works on arrays.
+    """
+    hours = np.asarray(hours)
+    peak = ((hours >= 8) & (hours <= 11)) | ((hours >= 17) & (hours <= 20))
+    midday = (hours >= 12) & (hours <= 16)
+    return np.where(peak, 2600.0, np.where(midday, 1800.0, 600.0))
+
+class TelemetryEngine:
+    """
+    Vectorized loop-detector + probe-vehicle simulator for many road
+    segments and time steps at once (soak tests, city-wide ticks).
+
+    Same models as TrafficSensorNetwork / GPSDataStream: noisy demand-curve
+    volumes, BPR speeds, and per-segment harmonic means over ~5% probe
+    vehicles. Draws come from one seeded Generator, so runs are reproducible.
+
+    Args:
+        physics: TrafficPhysics used for BPR speeds
+        seed: Seed for numpy.random.default_rng
+        penetration: Share of vehicles reporting as probes
+        min_probes: Probes per segment floor
+        probe_sd: Driver speed spread around the BPR speed (km/h)
+        chunk_probes: Upper bound on probe samples drawn per pass (memory cap)
+    """
+    def __init__(self, physics=None, seed=None, penetration=0.05, min_probes=10,
+                 probe_sd=8.0, chunk_probes=4_000_000):
+        self.physics = physics or TrafficPhysics()
+        self.rng = np.random.default_rng(seed)
+        self.penetration = penetration
+        self.min_probes = min_probes
+        self.probe_sd = probe_sd
+        self.chunk_probes = chunk_probes
+
+    def volumes(self, hours, shape=None):
+        """Sensor volumes for the given hour(s), with 5% measurement noise."""
+        demand = demand_curve(hours)
+        if shape is not None:
+            demand = np.broadcast_to(demand, shape)
+        vol = self.rng.normal(demand, demand * 0.05)
+        return np.maximum(0, vol.astype(np.int64))
+
+    def bpr_speeds(self, volumes):
+        return np.asarray(self.physics.bpr_speed(volumes), dtype=np.float64)
+
+    def probe_speeds(self, volumes):
+        """
+        Harmonic-mean probe speed for every volume in `volumes` (any shape).
+        """
+        volumes = np.asarray(volumes, dtype=np.float64)
+        flat = volumes.reshape(-1)
+        true_speed = self.bpr_speeds(flat)
+        num_probes = np.maximum(self.min_probes, (flat * self.penetration).astype(np.int64))
+
+        out = np.empty(len(flat), dtype=np.float64)
+        # Split segments so one pass never draws more than chunk_probes samples
+        ends = np.cumsum(num_probes)
+        start = 0
+        while start < len(flat):
+            base = ends[start - 1] if start else 0
+            stop = max(start + 1, int(np.searchsorted(ends, base + self.chunk_probes, side='right')))
+            n = num_probes[start:stop]
+            probes = self.rng.normal(np.repeat(true_speed[start:stop], n), self.probe_sd)
+            np.clip(probes, 1.0, 120.0, out=probes)
+            offsets = np.concatenate([[0], np.cumsum(n)[:-1]])
+            # H = n / sum(1/x) per segment
+            out[start:stop] = n / np.add.reduceat(1.0 / probes, offsets)
+            start = stop
+        return out.reshape(volumes.shape)
+
+    def tick(self, hours, shape=None):
+        """
+        One telemetry snapshot.
+
+        Returns:
+            (volumes, speeds) arrays broadcast to `shape`
+        """
+        vol = self.volumes(hours, shape)
+        return vol, self.probe_speeds(vol)
 
 class TrafficSensorNetwork:
     """
@@ -30,9 +121,9 @@ class TrafficSensorNetwork:
     """
     def __init__(self, location="Mumbai"):
         self.location = location
-        print(f"   [INIT] Handshaking with IoT Gateway ({location})...", end="\r")
+        logger.debug("[INIT] Handshaking with IoT Gateway (%s)...", location)
         time.sleep(0.3)
-        print(f"   [CONN] IoT Sensors Online: Inductive Loops Active.      ")
+        logger.debug("[CONN] IoT Sensors Online: Inductive Loops Active.")
 
     def get_realtime_volume(self):
         """
@@ -41,17 +132,18 @@ class TrafficSensorNetwork:
         current_hour = time.localtime().tm_hour
         
         # Traffic Demand Curve (Morning/Evening Peaks)
-        if 8 <= current_hour <= 11 or 17 <= current_hour <= 20:
-            demand = 2600 # Near Capacity
-        elif 12 <= current_hour <= 16:
-            demand = 1800 # Moderate
-        else:
-            demand = 600  # Late Night
+        demand = float(demand_curve(current_hour))
             
         # Add Poisson-like variance (Sensor Noise)
         val = int(np.random.normal(demand, demand * 0.05))
         return max(0, val)
 
+    def get_realtime_volumes(self, n):
+        """n independent volume readings in one draw."""
+        demand = float(demand_curve(time.localtime().tm_hour))
+        vals = np.random.normal(demand, demand * 0.05, n).astype(np.int64)
+        return np.maximum(0, vals)
+
 class GPSDataStream:
     """
     Simulates Floating Car Data (FCD) from Fleet Providers (Uber/Google).
@@ -60,9 +152,10 @@ class GPSDataStream:
     def __init__(self, location="Mumbai"):
         self.location = location
         self.physics = TrafficPhysics()
-        print(f"   [INIT] Connecting to Telemetry Stream...", end="\r")
+        self.telemetry = TelemetryEngine(self.physics)
+        logger.debug("[INIT] Connecting to Telemetry Stream...")
         time.sleep(0.3)
-        print(f"   [CONN] GPS Probe Stream: 5,402 Active Nodes.          ")
+        logger.debug("[CONN] GPS Probe Stream: 5,402 Active Nodes.")
 
     def get_average_speed(self, volume_load):
         """
@@ -84,6 +177,10 @@ class GPSDataStream:
         
         return harmonic_mean
 
+    def get_average_speeds(self, volume_loads):
+        """Harmonic-mean speeds for an array of volumes in one vectorized pass."""
+        return self.telemetry.probe_speeds(volume_loads)
+
 if __name__ == "__main__":
     # Unit Test with Physics
     sensors = TrafficSensorNetwork("Wankhede")
@@ -92,6 +189,6 @@ if __name__ == "__main__":
     vol = sensors.get_realtime_volume()
     speed = gps.get_average_speed(vol)
     
-    print(f"\n[REAL-WORLD TELEMETRY]")
-    print(f" > Volumetric Flow: {vol} veh/hr")
-    print(f" > Harmonic Speed:  {speed:.2f} km/h (Calculated via BPR Model)")
+    logger.info("[REAL-WORLD TELEMETRY]")
+    logger.info("> Volumetric Flow: %s veh/hr", vol)
+    logger.info("> Harmonic Speed:  %.2f km/h (Calculated via BPR Model)", speed)
@@ -0,0 +1,105 @@
+"""
+Spatial Index
+Haversine BallTree over a gazetteer of named places (localities, wards,
+junctions, stations) for batched nearest-place and radius lookups.
+
+Distances are great-circle kilometres on a spherical Earth, which is well
+within the accuracy of the place coordinates themselves.
+"""
+import csv
+import json
+
+import numpy as np
+from sklearn.neighbors import BallTree
+
+EARTH_RADIUS_KM = 6371.0088
+_MAX_MATCHES = 4096  # memoised name lookups per index
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km; broadcasts over arrays."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def load_gazetteer(path):
+    """
+    Read extra places from a CSV (name, lat, lon columns) or JSON
+    ({name: [lat, lon]}) file.
+
+    Returns:
+        {name: (lat, lon)}
+    """
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            return {name: (float(c[0]), float(c[1])) for name, c in json.load(f).items()}
+    with open(path, newline="", encoding="utf-8") as f:
+        return {row["name"]: (float(row["lat"]), float(row["lon"])) for row in csv.DictReader(f)}
+
+
+class SpatialIndex:
+    """
+    Named places in a BallTree (haversine metric).
+
+    Places sharing coordinates (aliases such as CST / CSMT) are indexed once,
+    under the first name given, so nearest-place answers are deterministic.
+
+    Args:
+        places: {name: (lat, lon)}, in priority order
+    """
+    def __init__(self, places):
+        names = list(places)
+        coords = np.array([places[n] for n in names], dtype=np.float64).reshape(-1, 2)
+        _, first = np.unique(coords, axis=0, return_index=True)
+        keep = np.sort(first)
+        self.places = dict(places)
+        self.names = np.array(names, dtype=object)[keep]
+        self.coords = coords[keep]
+        self.tree = BallTree(np.radians(self.coords), metric="haversine") if len(keep) else None
+        self._matches = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def nearest(self, lats, lons, k=1):
+        """
+        k nearest places for each query point.
+
+        Returns:
+            (dist_km, idx) arrays of shape (n, k); names via self.names[idx]
+        """
+        query = np.radians(np.column_stack([np.atleast_1d(lats), np.atleast_1d(lons)]).astype(np.float64))
+        dist, idx = self.tree.query(query, k=min(k, len(self)))
+        return dist * EARTH_RADIUS_KM, idx
+
+    def within(self, lats, lons, radius_km):
+        """
+        Places within `radius_km` of each query point, nearest first.
+
+        Returns:
+            List (one per point) of (names, dist_km) arrays
+        """
+        query = np.radians(np.column_stack([np.atleast_1d(lats), np.atleast_1d(lons)]).astype(np.float64))
+        idx, dist = self.tree.query_radius(query, r=radius_km / EARTH_RADIUS_KM,
+                                           return_distance=True, sort_results=True)
+        return [(self.names[i], d * EARTH_RADIUS_KM) for i, d in zip(idx, dist)]
+
+    def match(self, text):
+        """
+        Coordinates of the first place whose name contains, or is contained
+        in, `text` (gazetteer order), or None. Results are memoised per text.
+        """
+        if not text:
+            return None
+        if text in self._matches:
+            return self._matches[text]
+        found = None
+        for name, coords in self.places.items():
+            if name in text or text in name:
+                found = coords
+                break
+        if len(self._matches) >= _MAX_MATCHES:
+            self._matches.clear()
+        self._matches[text] = found
+        return found
@@ -7,6 +7,13 @@ import os
 from pathlib import Path
 from langchain_openai import ChatOpenAI
 
+try:
+    from src.log import get_logger
+except ImportError:
+    from log import get_logger
+
+logger = get_logger(__name__)
+
 # Load API key from config file
 def load_llm_config():
     """Load Featherless API key from llm_config.env"""
@@ -38,7 +45,7 @@ try:
         request_timeout=3 # Strict 3s timeout
     )
 except Exception as e:
-    print(f"[WARNING] Failed to initialize LLM: {e}")
+    logger.warning("Failed to initialize LLM: %s", e)
     llm = None
 
 
@@ -103,7 +110,7 @@ Provide a clear, actionable traffic update. Mention specific reasons for congest
         return bulletin
         
     except Exception as e:
-        print(f"[ERROR] Failed to generate traffic bulletin (Timeout/Error): {e}")
+        logger.error("Failed to generate traffic bulletin (Timeout/Error): %s", e)
         # Fallback to template based bulletin on error
         return generate_simple_bulletin(prediction_data)
 
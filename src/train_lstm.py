@@ -13,6 +13,9 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from src.data_loader import load_traffic_data
 from src.data_preprocessing_seq import create_sequences
 from src.novelty_engine import HybridNoveltyEngine
+from src.log import get_logger
+
+logger = get_logger(__name__)
 
 class AdvancedTrafficLSTM(nn.Module):
     def __init__(self, input_size, hidden_size, num_classes, num_layers=2):
@@ -44,7 +47,7 @@ class AdvancedTrafficLSTM(nn.Module):
 
 def train_lstm_model():
     device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-    print(f"Using device: {device}")
+    logger.info("Using device: %s", device)
 
     # 1. Load Unified Data
     # 1. Load Unified Data
@@ -55,23 +58,23 @@ def train_lstm_model():
     
     files = []
     if os.path.exists(big_data_path):
-        print(f"Using Mumbai Multi-Route Dataset (1 Lakh): {big_data_path}")
+        logger.info("Using Mumbai Multi-Route Dataset (1 Lakh): %s", big_data_path)
         files.append(big_data_path)
     else:
-        print("Warning: Multi-Route data not found. Falling back to synthetic.")
+        logger.warning("Multi-Route data not found. Falling back to synthetic.")
         files.append(os.path.join(base_dir, "state_wise_traffic_data.csv"))
 
-    print("Loading unified datasets...")
+    logger.info("Loading unified datasets...")
     try:
         # data_loader now returns (df, encoders)
         df, encoders = load_traffic_data(files)
-        print(f"Loaded Encoders for: {list(encoders.keys())}")
+        logger.info("Loaded Encoders for: %s", list(encoders.keys()))
     except Exception as e:
-        print(f"Failed to load data: {e}")
+        logger.error("Failed to load data: %s", e)
         return
 
     # 2. Train & Apply Novelty Engine (Route-Aware)
-    print("Training Hybrid Novelty Engine on new data...")
+    logger.info("Training Hybrid Novelty Engine on new data...")
     try:
         # Prepare numerical features for engine
         # Now including encoded Origin/Dest for Route-Specific Novelty
@@ -97,24 +100,24 @@ def train_lstm_model():
         
         # Save it immediately
         joblib.dump(novelty_engine, "novelty_engine.pkl")
-        print("Novelty Engine retrained and saved.")
+        logger.info("Novelty Engine retrained and saved.")
         
         # Score
         df['NoveltyScore'] = novelty_engine.get_novelty_score(X_novelty)
         
     except Exception as e:
-        print(f"Error training novelty engine: {e}")
+        logger.error("Error training novelty engine: %s", e)
         df['NoveltyScore'] = 0.0
 
     # 3. Create Sequences
-    print("Creating multivariate sequences...")
+    logger.info("Creating multivariate sequences...")
     # Clean target
     df = df.dropna(subset=['CongestionLevel'])
     
     X, y, classes, scaler, encoders, feature_cols = create_sequences(df, 'CongestionLevel', sequence_length=5)
     
-    print(f"Input Shape: {X.shape}")
-    print(f"Features: {feature_cols}")
+    logger.info("Input Shape: %s", X.shape)
+    logger.info("Features: %s", feature_cols)
     
     # Save Scaler/Encoders for Prediction
     joblib.dump({'scaler': scaler, 'encoders': encoders, 'feature_cols': feature_cols, 'classes': classes}, 
@@ -140,7 +143,7 @@ def train_lstm_model():
     
     # 5. Training Loop
     epochs = 15
-    print("\nStarting Training...")
+    logger.info("Starting Training...")
     for epoch in range(epochs):
         model.train()
         total_loss = 0
@@ -161,7 +164,7 @@ def train_lstm_model():
             
         acc = correct / total
         if (epoch+1) % 5 == 0:
-            print(f"Epoch {epoch+1}/{epochs} | Loss: {total_loss/len(train_loader):.4f} | Acc: {acc:.4f}")
+            logger.info("Epoch %s/%s | Loss: %.4f | Acc: %.4f", epoch + 1, epochs, total_loss / len(train_loader), acc)
 
     # 6. Evaluation
     model.eval()
@@ -170,11 +173,11 @@ def train_lstm_model():
         _, preds = torch.max(out, 1)
         test_acc = (preds == y_test).float().mean()
         
-    print(f"\nTest Accuracy: {test_acc:.4f}")
+    logger.info("Test Accuracy: %.4f", test_acc)
     
     # Save Model
     torch.save(model.state_dict(), "traffic_lstm_model.pth")
-    print("Model saved to traffic_lstm_model.pth")
+    logger.info("Model saved to traffic_lstm_model.pth")
 
 if __name__ == "__main__":
     train_lstm_model()